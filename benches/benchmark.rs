@@ -1,12 +1,14 @@
-use std::path::Path;
+use std::{hint::black_box, path::Path};
 
-use criterion::{Criterion, criterion_group, criterion_main};
+use criterion::{Criterion, Throughput, criterion_group, criterion_main};
 
 use wty::{
     cli::{DictName, MainArgs, MainLangs, Options},
-    dict::{DMain, WriterFormat, make_dict_from_jsonl},
+    dict::{DMain, LangCodeProbe, WriterFormat, make_dict_from_jsonl},
+    find_tag_in_bank,
     lang::{Edition, Lang},
     path::PathManager,
+    sort_tags,
 };
 
 const BENCH_FIXTURES_DIR_100: &str = "benches/fixtures";
@@ -51,5 +53,77 @@ fn bench_de_de(c: &mut Criterion) {
     bench_monolingual(c, Edition::De, "main_dict_de_de");
 }
 
-criterion_group!(benches, bench_el_el, bench_de_de);
+// A mix of tags found at the start, middle and end of the tables, and of unknown ones.
+const BENCH_TAGS: [&str; 12] = [
+    "plural",
+    "genitive/dative",
+    "first-person",
+    "masculine",
+    "__sentinel",
+    "present",
+    "subjunctive",
+    "accusative",
+    "dated",
+    "singular",
+    "colloquial",
+    "noun",
+];
+
+fn bench_find_tag_in_bank(c: &mut Criterion) {
+    c.bench_function("find_tag_in_bank", |b| {
+        b.iter(|| {
+            for tag in BENCH_TAGS {
+                black_box(find_tag_in_bank(black_box(tag)));
+            }
+        });
+    });
+}
+
+fn bench_sort_tags(c: &mut Criterion) {
+    c.bench_function("sort_tags", |b| {
+        b.iter(|| {
+            let mut tags = BENCH_TAGS;
+            sort_tags(black_box(&mut tags));
+            tags
+        });
+    });
+}
+
+// Probing German lines for English entries: every line is skipped, as most lines are
+// when extracting a language from a big edition.
+fn bench_lang_code_probe(c: &mut Criterion) {
+    let path = Path::new(BENCH_FIXTURES_DIR_100).join("kaikki/de-de-extract.jsonl");
+    let text = std::fs::read(path).unwrap();
+    let lines: Vec<&[u8]> = text
+        .split(|&b| b == b'\n')
+        .filter(|l| !l.is_empty())
+        .collect();
+
+    let mut group = c.benchmark_group("lang_code_probe");
+    group.throughput(Throughput::Bytes(text.len() as u64));
+    group.bench_function("serde", |b| {
+        b.iter(|| {
+            for line in &lines {
+                black_box(LangCodeProbe::should_skip_serde(black_box(line), Lang::En).unwrap());
+            }
+        });
+    });
+    group.bench_function("memchr", |b| {
+        b.iter(|| {
+            for line in &lines {
+                black_box(LangCodeProbe::should_skip(black_box(line), Lang::En).unwrap());
+            }
+        });
+    });
+    group.finish();
+}
+
+criterion_group!(
+    benches,
+    bench_el_el,
+    bench_de_de,
+    bench_find_tag_in_bank,
+    bench_sort_tags,
+    bench_lang_code_probe
+);
 criterion_main!(benches);
@@ -4,13 +4,21 @@ Requires python 3.12+
 """
 
 import argparse
+import hashlib
+import io
 import json
+import os
 import re
 import sys
 from dataclasses import astuple, dataclass
 from pathlib import Path
 from typing import Any
 
+from profiling import add_profile_args, phase, profiled, request
+
+PATH_FINGERPRINT = Path("data") / "cache" / "build.json"
+"""Hash of every input and output of the last run, to skip no-op runs."""
+
 
 @dataclass
 class Lang:
@@ -100,6 +108,40 @@ def _check_valid_tag(tag: str, invalid_chars: str) -> None:
     )
 
 
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content to path, only if it differs from what is already there.
+
+    Unchanged files keep their mtime, so that cargo does not rebuild the crate. Writes
+    go through a temporary file so that an interrupted run never leaves half a file.
+    """
+    if path.exists() and path.read_text() == content:
+        return False
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def fingerprint(paths: list[Path]) -> str:
+    """Hash of the generator itself and of the content of every path."""
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    for path in sorted(paths):
+        h.update(str(path).encode())
+        h.update(path.read_bytes() if path.exists() else b"")
+    return h.hexdigest()
+
+
+def read_fingerprint() -> str | None:
+    if not PATH_FINGERPRINT.exists():
+        return None
+    return PATH_FINGERPRINT.read_text().strip()
+
+
+def write_fingerprint(value: str) -> None:
+    PATH_FINGERPRINT.parent.mkdir(parents=True, exist_ok=True)
+    PATH_FINGERPRINT.write_text(value)
+
+
 def write_warning(f) -> None:
     f.write("//! This file was generated and should not be edited directly.\n")
     f.write("//! The source code can be found at scripts/build.py\n\n")
@@ -155,6 +197,28 @@ def generate_tags_rs(
         )
     w("];\n\n")
 
+    # Sorted lookup tables, binary searched by find_tag_in_bank and sort_tags.
+    # Python sorts str by code point, which is the same order as Rust's &str (bytes).
+    # On duplicates, keep the first one, as TAG_ORDER.position and TAG_BANK.find_map do.
+    order_rank: dict[str, int] = {}
+    for rank, tag in enumerate(tag_order):
+        order_rank.setdefault(tag, rank)
+    w("/// `TAG_ORDER` sorted by tag, with the position of every tag in `TAG_ORDER`.\n")
+    w(f"pub static TAG_ORDER_RANK: [(&str, usize); {len(order_rank)}] = [\n")
+    for tag, rank in sorted(order_rank.items()):
+        w(f'{idt}("{tag}", {rank}),\n')
+    w("];\n\n")
+
+    bank_index: dict[str, int] = {}
+    for idx, wt in enumerate(whitelisted_tags):
+        for long in wt.longs_as_list():
+            bank_index.setdefault(long, idx)
+    w("/// Every long tag alias of `TAG_BANK`, sorted, with the index of its entry.\n")
+    w(f"pub static TAG_BANK_INDEX: [(&str, usize); {len(bank_index)}] = [\n")
+    for long, idx in sorted(bank_index.items()):
+        w(f'{idt}("{long}", {idx}),\n')
+    w("];\n\n")
+
     poses = [wt for wt in whitelisted_tags if wt.category == "partOfSpeech"]
 
     # Note that there is a difference between:
@@ -506,9 +570,60 @@ def generate_lang_rs(langs: list[Lang], f) -> None:
     w("}\n")
 
 
+type LocaleTable = list[tuple[str, str] | None]
+"""A localized (short_tag, long_tag) for every whitelisted tag, at the same index."""
+
+
+def locale_table(
+    translations: list[TagTranslation], whitelisted_tags: list[WhitelistedTag]
+) -> LocaleTable:
+    # Keyed by primary alias only. Secondary aliases are irrelevant.
+    # This is because we only translate short tags. Every alias converges to a short tag
+    # and it's that short tag that we will localize into: (trans.short_tag, trans.long_tag)
+    long_to_idx = {wt.long_tag(): idx for idx, wt in enumerate(whitelisted_tags)}
+    table: LocaleTable = [None] * len(whitelisted_tags)
+    for trans in translations:
+        # SAFETY: we already checked that long_tag_en is in long_to_idx
+        idx = long_to_idx[trans.long_tag_en]
+        if table[idx] is not None:
+            continue
+        # If the short tag was left empty, it means there is no short version
+        # and we default to showing the long one.
+        table[idx] = (trans.short_tag or trans.long_tag, trans.long_tag)
+    return table
+
+
+def tag_bank_path(folder: Path, iso: str | None) -> Path:
+    if iso is None:
+        return folder / "tag_bank_1.json"
+    return folder / f"tag_bank_1_{iso}.json"
+
+
+def generate_tag_bank_json(
+    table: LocaleTable | None, whitelisted_tags: list[WhitelistedTag]
+) -> str:
+    """The tag_bank_1.json of a dictionary, without aliases.
+
+    Same output as serde_json::to_vec_pretty of the TagInfo of every TAG_BANK entry,
+    where missing localizations fall back to the English version.
+    """
+    rows = []
+    for idx, wt in enumerate(whitelisted_tags):
+        short_tag, long_tag = wt.short_tag, wt.long_tag()
+        if table is not None and table[idx] is not None:
+            short_tag, long_tag = table[idx]
+        rows.append(
+            [short_tag, wt.category, wt.sort_order, long_tag, wt.popularity_score]
+        )
+    return json.dumps(rows, indent=2, ensure_ascii=False)
+
+
 # TODO: use idt here for indentation
 def generate_tags_localization_rs(
-    locale: Locale, whitelisted_tags: list[WhitelistedTag], f
+    locale: dict[str, LocaleTable],
+    whitelisted_tags: list[WhitelistedTag],
+    path_tag_bank_folder: Path,
+    f,
 ) -> None:
     w = f.write
 
@@ -517,6 +632,13 @@ def generate_tags_localization_rs(
     w("use crate::lang::Lang;\n")
     w("use crate::models::yomitan::TagInfo;\n\n")
 
+    w(
+        "/// A localized (short_tag, long_tag) for every entry of `TAG_BANK`, at the same index.\n"
+    )
+    w(
+        f"type LocaleTable = [Option<(&'static str, &'static str)>; {len(whitelisted_tags)}];\n\n"
+    )
+
     w("pub const fn has_locale(lang: Lang) -> bool {\n")
     w("    matches!(lang, ")
     for i, iso in enumerate(locale):
@@ -526,17 +648,29 @@ def generate_tags_localization_rs(
     w(")\n")
     w("}\n\n")
 
-    w(
-        "pub fn localize_tag(lang: Lang, short_tag: &str) -> Option<(&'static str, &'static str)> {\n"
-    )
+    w("const fn locale_table(lang: Lang) -> Option<&'static LocaleTable> {\n")
     w("    match lang {\n")
     for iso in locale:
-        w(f"        Lang::{iso.title()} => localize_tag_{iso}(short_tag),\n")
+        w(f"        Lang::{iso.title()} => Some(&TAG_LOCALE_{iso.upper()}),\n")
     w("        _ => None,\n")
     w("    }\n")
     w("}\n\n")
 
-    # This is similar to get_tag_bank_as_tag_info but not enough to merge them.
+    w("/// Index in `TAG_BANK` of a short tag.\n")
+    w("fn short_tag_index(short_tag: &str) -> Option<usize> {\n")
+    w("    TAG_BANK_SHORT_INDEX\n")
+    w("        .binary_search_by_key(&short_tag, |&(short, _)| short)\n")
+    w("        .ok()\n")
+    w("        .map(|i| TAG_BANK_SHORT_INDEX[i].1)\n")
+    w("}\n\n")
+
+    w(
+        "pub fn localize_tag(lang: Lang, short_tag: &str) -> Option<(&'static str, &'static str)> {\n"
+    )
+    w("    locale_table(lang)?[short_tag_index(short_tag)?]\n")
+    w("}\n\n")
+
+    # This is similar to tag_bank_json but not enough to merge them.
     w("pub fn localize_tag_info(lang: Lang, tag_info: &mut TagInfo) {\n")
     w(
         "    if let Some((short, long)) = localize_tag(lang, tag_info.short_tag.as_str()) {\n"
@@ -544,34 +678,47 @@ def generate_tags_localization_rs(
     w("        tag_info.short_tag = short.to_string();\n")
     w("        tag_info.long_tag = long.to_string();\n")
     w("    }\n")
-    w("}\n")
+    w("}\n\n")
 
-    # Keyed by primary alias only. Secondary aliases are irrelevant.
-    # This is because we only translate short tags. Every alias converges to a short tag
-    # and it's that short tag that we will localize into: (trans.short_tag, trans.long_tag)
-    long_to_short = {wt.long_tag(): wt.short_tag for wt in whitelisted_tags}
+    # The blobs are written next to the other tag assets by generate_tag_bank_json.
+    src_tags = Path("src") / "tags"
+    rel_folder = Path(os.path.relpath(path_tag_bank_folder, src_tags)).as_posix()
+    w(
+        "/// The (potentially localized) `tag_bank_1.json` of a dictionary, without aliases.\n"
+    )
+    w("///\n")
+    w("/// Serialized at build time, so that writers can copy it as is.\n")
+    w("pub const fn tag_bank_json(lang: Lang) -> &'static [u8] {\n")
+    w("    match lang {\n")
+    for iso in locale:
+        name = tag_bank_path(Path(rel_folder), iso).as_posix()
+        w(f'        Lang::{iso.title()} => include_bytes!("{name}"),\n')
+    name = tag_bank_path(Path(rel_folder), None).as_posix()
+    w(f'        _ => include_bytes!("{name}"),\n')
+    w("    }\n")
+    w("}\n\n")
+
+    short_index = sorted((wt.short_tag, idx) for idx, wt in enumerate(whitelisted_tags))
+    w("/// Every short tag of `TAG_BANK`, sorted, with the index of its entry.\n")
+    w(f"static TAG_BANK_SHORT_INDEX: [(&str, usize); {len(short_index)}] = [\n")
+    for short_tag, idx in short_index:
+        w(f'    ("{short_tag}", {idx}),\n')
+    w("];\n")
 
-    for iso, translations in locale.items():
-        ratio = len(translations) / len(long_to_short)
+    for iso, table in locale.items():
+        n_localized = sum(loc is not None for loc in table)
+        ratio = n_localized / len(table)
 
         w("\n")
-        w(
-            f"/// Coverage: {len(translations)}/{len(long_to_short)} tags ({ratio:.1%})\n"
-        )
-        w(
-            f"fn localize_tag_{iso}(short_tag: &str) -> Option<(&'static str, &'static str)> {{\n"
-        )
-        w("    match short_tag {\n")
-        for trans in translations:
-            # SAFETY: we already checked that long_tag_en is in long_to_short
-            short_key = long_to_short[trans.long_tag_en]
-            # If the short tag was left empty, it means there is no short version
-            # and we default to showing the long one.
-            short_tag = trans.short_tag or trans.long_tag
-            w(f'        "{short_key}" => Some(("{short_tag}", "{trans.long_tag}")),\n')
-        w("        _ => None,\n")
-        w("    }\n")
-        w("}\n")
+        w(f"/// Coverage: {n_localized}/{len(table)} tags ({ratio:.1%})\n")
+        w("#[rustfmt::skip]\n")
+        w(f"static TAG_LOCALE_{iso.upper()}: LocaleTable = [\n")
+        for wt, loc in zip(whitelisted_tags, table):
+            if loc is None:
+                w(f"    None, // {wt.short_tag}\n")
+            else:
+                w(f'    Some(("{loc[0]}", "{loc[1]}")), // {wt.short_tag}\n')
+        w("];\n")
 
 
 def load_lang(item: Any) -> Lang:
@@ -604,12 +751,13 @@ def sort_languages_json(path: Path) -> None:
     if langs == langs_sorted:
         return
 
-    with path.open("w") as f:
-        f.write("[\n")
-        for _, idx in langs_sorted:
-            f.write(lines[idx + 1])
-            f.write("\n")
-        f.write("]\n")
+    f = io.StringIO()
+    f.write("[\n")
+    for _, idx in langs_sorted:
+        f.write(lines[idx + 1])
+        f.write("\n")
+    f.write("]\n")
+    write_if_changed(path, f.getvalue())
 
 
 def check_yomitan_langs(langs: list[Lang]) -> None:
@@ -620,7 +768,8 @@ def check_yomitan_langs(langs: list[Lang]) -> None:
     import requests
 
     url = "https://raw.githubusercontent.com/yomidevs/yomitan/master/ext/js/language/language-descriptors.js"
-    response = requests.get(url)
+    with request(url):
+        response = requests.get(url)
     response.raise_for_status()
     js_text = response.text
 
@@ -692,7 +841,8 @@ def check_kaikki_langs(langs: list[Lang]) -> None:
 
     url = "https://kaikki.org/dictionary/"
     print(f"Checking for unsupported langs @ {url}")
-    response = requests.get(url)
+    with request(url):
+        response = requests.get(url)
     response.raise_for_status()
     response.encoding = "utf-8"
     text = response.text
@@ -735,8 +885,8 @@ def load_sort_dump_tags(path: Path) -> list[WhitelistedTag]:
         data = json.load(f)
     tags = sort_tags([WhitelistedTag(*row) for row in data])
     # Overwrite to ensure formatting and sort
-    with path.open("w") as f:
-        json.dump([astuple(wt) for wt in tags], f, indent=4, ensure_ascii=False)
+    content = json.dumps([astuple(wt) for wt in tags], indent=4, ensure_ascii=False)
+    write_if_changed(path, content)
     return tags
 
 
@@ -775,22 +925,17 @@ def load_sort_dump_localization(
     )
 
     # Overwrite to ensure formatting and sort
-    with path.open("w") as f:
-        json.dump(
-            {tr.long_tag_en: [tr.short_tag, tr.long_tag] for tr in translations},
-            f,
-            indent=4,
-            ensure_ascii=False,
-        )
+    content = json.dumps(
+        {tr.long_tag_en: [tr.short_tag, tr.long_tag] for tr in translations},
+        indent=4,
+        ensure_ascii=False,
+    )
+    write_if_changed(path, content)
 
     return translations
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--check-yomitan", action="store_true")
-    parser.add_argument("--check-kaikki", action="store_true")
-    args = parser.parse_args()
+def build(args: argparse.Namespace) -> None:
     check_yomitan = args.check_yomitan
     check_kaikki = args.check_kaikki
 
@@ -804,6 +949,7 @@ def main() -> None:
     path_tag_bank_json = jsons_root / "tag_bank_term.json"
     path_tag_bank_variety_json = jsons_root / "tag_bank_term_variety.json"
     path_tag_locale_folder = jsons_root / "tags" / "locale"
+    path_tag_bank_folder = jsons_root / "tags" / "bank"
 
     for path in (
         path_languages_json,
@@ -816,15 +962,40 @@ def main() -> None:
             print(f"Path does not exist @ {path}")
             return
 
+    # Assets are both inputs and outputs, since we rewrite them to ensure formatting.
+    # The folders are globbed on every call: the tag banks only exist after a run.
+    def fingerprinted() -> list[Path]:
+        return [
+            path_lang_rs,
+            path_tags_rs,
+            path_tags_loc_rs,
+            path_languages_json,
+            path_tag_order_json,
+            path_tag_bank_json,
+            path_tag_bank_variety_json,
+            *path_tag_locale_folder.glob("*.json"),
+            *path_tag_bank_folder.glob("*.json"),
+        ]
+
+    if (
+        not args.force
+        and not check_kaikki
+        and not check_yomitan
+        and fingerprint(fingerprinted()) == read_fingerprint()
+    ):
+        print("Nothing changed since the last run. Use --force to regenerate.")
+        return
+
     sort_languages_json(path_languages_json)
 
     langs = load_langs(path_languages_json)
 
-    if check_kaikki:
-        check_kaikki_langs(langs)
+    with phase("check"):
+        if check_kaikki:
+            check_kaikki_langs(langs)
 
-    if check_yomitan:
-        check_yomitan_langs(langs)
+        if check_yomitan:
+            check_yomitan_langs(langs)
 
     tag_order: list[str] = []
     with path_tag_order_json.open() as f:
@@ -832,8 +1003,9 @@ def main() -> None:
         for _, tags in data.items():
             tag_order.extend(tags)
     # Overwrite to ensure formatting
-    with path_tag_order_json.open("w") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    write_if_changed(
+        path_tag_order_json, json.dumps(data, indent=4, ensure_ascii=False)
+    )
 
     whitelisted_tags = load_sort_dump_tags(path_tag_bank_json)
     for wt in whitelisted_tags:
@@ -863,15 +1035,55 @@ def main() -> None:
     # generate_lang_rs(langs, sys.stdout)
     # generate_tags_rs(tag_order, sys.stdout)
 
-    with path_lang_rs.open("w") as f:
+    generated: list[tuple[Path, io.StringIO]] = []
+    with phase("generate"):
+        f = io.StringIO()
         generate_lang_rs(langs, f)
-        print(f"Wrote rust code @ {path_lang_rs}")
-    with path_tags_rs.open("w") as f:
+        generated.append((path_lang_rs, f))
+
+        f = io.StringIO()
         generate_tags_rs(tag_order, whitelisted_tags, f)
-        print(f"Wrote rust code @ {path_tags_rs}")
-    with path_tags_loc_rs.open("w") as f:
-        generate_tags_localization_rs(locale, whitelisted_tags, f)
-        print(f"Wrote rust code @ {path_tags_loc_rs}")
+        generated.append((path_tags_rs, f))
+
+        tables = {
+            iso: locale_table(translations, whitelisted_tags)
+            for iso, translations in locale.items()
+        }
+
+        f = io.StringIO()
+        generate_tags_localization_rs(tables, whitelisted_tags, path_tag_bank_folder, f)
+        generated.append((path_tags_loc_rs, f))
+
+        path_tag_bank_folder.mkdir(exist_ok=True)
+        for iso, table in [(None, None), *tables.items()]:
+            f = io.StringIO(generate_tag_bank_json(table, whitelisted_tags))
+            generated.append((tag_bank_path(path_tag_bank_folder, iso), f))
+
+    with phase("write"):
+        for path, f in generated:
+            if write_if_changed(path, f.getvalue()):
+                print(f"Wrote generated code @ {path}")
+            else:
+                print(f"Unchanged generated code @ {path}")
+
+    # Once the outputs are written, so that it covers the files of this run
+    write_fingerprint(fingerprint(fingerprinted()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check-yomitan", action="store_true")
+    parser.add_argument("--check-kaikki", action="store_true")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="regenerate even if no input changed since the last run",
+    )
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    with profiled(args.profile, args.cprofile, "build"):
+        build(args)
 
 
 if __name__ == "__main__":
@@ -1,64 +1,66 @@
-"""Pretty print release metadata for diagnostics."""
+"""Pretty print release metadata for diagnostics.
 
+Sizes come from the cached scan of the release (see scan.py), in bytes, and are only
+made human readable for printing.
+"""
+
+import argparse
+import sys
 from dataclasses import dataclass
-import json
+from pathlib import Path
+
+from profiling import add_profile_args, phase, profiled
+from scan import DEFAULT_WORKERS, load_scan
 
 
 @dataclass
 class DictInfo:
     path: str
     size: str
-    size_bytes: float
+    size_bytes: int
 
 
-def parse_size(size_str: str) -> float:
-    size_str = size_str.strip()
-    units = {
-        "KB": 1024,
-        "MB": 1024**2,
-        "GB": 1024**3,
-    }
+def human_size(size_bytes: float) -> str:
+    """Same format as human_size @ src/utils.rs"""
+    for unit in ("B", "KB", "MB"):
+        if size_bytes < 1024:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024
+    return f"{size_bytes:.1f} GB"
 
-    for unit, multiplier in units.items():
-        if size_str.endswith(unit):
-            value = float(size_str[: -len(unit)].strip())
-            return value * multiplier
-    # If no unit...
-    assert False
 
-
-def extract_dictionaries(data) -> list[DictInfo]:
+def extract_dictionaries(root: Path) -> list[DictInfo]:
     """Extract only actual dictionaries (source -> target pairs)."""
-    results: list[DictInfo] = []
-
-    def traverse_targets(source_path: str, targets_obj) -> None:
-        if isinstance(targets_obj, dict):
-            for target_name, target_value in targets_obj.items():
-                if isinstance(target_value, str):
-                    size_bytes = parse_size(target_value)
-                    dict_info = DictInfo(
-                        path=f"{source_path} -> {target_name}",
-                        size=target_value,
-                        size_bytes=size_bytes,
-                    )
-                    results.append(dict_info)
-
-    if "dicts" in data:
-        for dict_type, dict_data in data["dicts"].items():
-            if "sources" in dict_data:
-                for source_name, source_data in dict_data["sources"].items():
-                    if "targets" in source_data:
-                        source_path = f"{dict_type}/{source_name}"
-                        traverse_targets(source_path, source_data["targets"])
-
-    return results
+    with phase("scan"):
+        dict_stats = load_scan(root, DEFAULT_WORKERS)
+    return [
+        DictInfo(
+            path=f"{ds.type}/{ds.source} -> {ds.target}",
+            size=human_size(ds.size),
+            size_bytes=ds.size,
+        )
+        for ds in dict_stats
+    ]
 
 
 def main() -> None:
-    with open("docs/release_metadata.json", "r") as f:
-        data = json.load(f)
-
-    all_dicts = extract_dictionaries(data)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "root",
+        nargs="?",
+        type=Path,
+        default=Path("data/release/dict"),
+        help="release dict folder (default: data/release/dict)",
+    )
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        print(f"No folder found at {args.root}")
+        sys.exit(1)
+
+    with profiled(args.profile, args.cprofile, "metadata"):
+        all_dicts = extract_dictionaries(args.root)
     all_dicts.sort(key=lambda x: x.size_bytes, reverse=True)
 
     upto = 10
@@ -0,0 +1,243 @@
+"""Opt-in profiling shared by the scripts.
+
+Scripts that support it take a `--profile` flag, which records per-phase wall and
+CPU time, bytes read and written, and the count and latency of HTTP requests, and
+writes them as a JSON report under data/profile/. Reports are timestamped, so that
+runs can be compared over time, like benches/log.txt does for the Rust side.
+
+`--cprofile PATH` additionally dumps cProfile stats, which can be read with pstats,
+or turned into a flamegraph with tools like snakeviz or flameprof.
+
+When profiling is disabled (the default), phases and HTTP records cost nothing.
+"""
+
+import argparse
+import cProfile
+import datetime
+import json
+import resource
+import statistics
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+PATH_PROFILE = Path("data") / "profile"
+PATH_PROC_IO = Path("/proc/self/io")
+
+
+@dataclass
+class IoCounters:
+    bytes_read: int = 0
+    """Bytes read through syscalls, including the page cache and sockets."""
+    bytes_written: int = 0
+    disk_read: int = 0
+    """Bytes actually fetched from storage."""
+    disk_written: int = 0
+
+    @classmethod
+    def now(cls) -> "IoCounters":
+        # Only available on Linux: report zeros elsewhere.
+        if not PATH_PROC_IO.exists():
+            return cls()
+        fields = dict(
+            line.split(": ") for line in PATH_PROC_IO.read_text().splitlines()
+        )
+        return cls(
+            int(fields["rchar"]),
+            int(fields["wchar"]),
+            int(fields["read_bytes"]),
+            int(fields["write_bytes"]),
+        )
+
+    def __sub__(self, other: "IoCounters") -> "IoCounters":
+        return IoCounters(
+            self.bytes_read - other.bytes_read,
+            self.bytes_written - other.bytes_written,
+            self.disk_read - other.disk_read,
+            self.disk_written - other.disk_written,
+        )
+
+    def __add__(self, other: "IoCounters") -> "IoCounters":
+        return IoCounters(
+            self.bytes_read + other.bytes_read,
+            self.bytes_written + other.bytes_written,
+            self.disk_read + other.disk_read,
+            self.disk_written + other.disk_written,
+        )
+
+
+def cpu_time() -> float:
+    """User + system time of the process, all threads included."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    """Process wide: includes the work of other threads during the phase."""
+    io: IoCounters = field(default_factory=IoCounters)
+
+
+@dataclass
+class HttpStats:
+    requests: int = 0
+    errors: int = 0
+    """Requests that failed or returned a status >= 400."""
+    bytes: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        lat = sorted(self.latencies)
+        quantiles = statistics.quantiles(lat, n=20) if len(lat) > 1 else lat * 19
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "latency": {
+                "total": sum(lat),
+                "mean": statistics.fmean(lat) if lat else 0.0,
+                "p50": quantiles[9] if lat else 0.0,
+                "p95": quantiles[18] if lat else 0.0,
+                "max": lat[-1] if lat else 0.0,
+            },
+        }
+
+
+class Profiler:
+    """Accumulate phase timings and HTTP records. Thread safe."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.phases: dict[str, PhaseStats] = {}
+        self.http: dict[str, HttpStats] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase. Phases with the same name are added together.
+
+        Phases can be nested, but should not run concurrently: CPU time and bytes are
+        measured for the whole process.
+        """
+        if not self.enabled:
+            yield
+            return
+        wall, cpu, io = time.perf_counter(), cpu_time(), IoCounters.now()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = cpu_time() - cpu
+            io = IoCounters.now() - io
+            with self.lock:
+                stats = self.phases.setdefault(name, PhaseStats())
+                stats.calls += 1
+                stats.wall += wall
+                stats.cpu += cpu
+                stats.io = stats.io + io
+
+    def record_http(
+        self, url: str, latency: float, status: int | None, nbytes: int = 0
+    ) -> None:
+        """Record a request to url. A status of None means that the request failed."""
+        if not self.enabled:
+            return
+        host = urlsplit(url).netloc or url
+        with self.lock:
+            stats = self.http.setdefault(host, HttpStats())
+            stats.requests += 1
+            stats.errors += status is None or status >= 400
+            stats.bytes += nbytes
+            stats.latencies.append(latency)
+
+    @contextmanager
+    def request(self, url: str) -> Iterator[None]:
+        """Time a request made through a library that does not expose the response."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        status = None
+        try:
+            yield
+            status = 200
+        finally:
+            self.record_http(url, time.perf_counter() - start, status)
+
+    def report(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "phases": {name: asdict(stats) for name, stats in self.phases.items()},
+                "http": {host: stats.summary() for host, stats in self.http.items()},
+            }
+
+
+PROFILER = Profiler()
+phase = PROFILER.phase
+record_http = PROFILER.record_http
+request = PROFILER.request
+
+
+def add_profile_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        nargs="?",
+        type=Path,
+        const=PATH_PROFILE,
+        help=f"write a timing report to this folder (default: {PATH_PROFILE})",
+    )
+    group.add_argument(
+        "--cprofile",
+        type=Path,
+        help="also dump cProfile stats to this path (implies --profile)",
+    )
+
+
+@contextmanager
+def profiled(
+    profile: Path | None, cprofile: Path | None, script: str
+) -> Iterator[None]:
+    """Profile the body if --profile or --cprofile was passed, and write the report."""
+    if profile is None and cprofile is None:
+        yield
+        return
+
+    PROFILER.enabled = True
+    profiler = cProfile.Profile() if cprofile is not None else None
+    started = datetime.datetime.now()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        with phase("total"):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            cprofile.parent.mkdir(parents=True, exist_ok=True)  # type: ignore
+            profiler.dump_stats(cprofile)
+            print(f"Wrote cProfile stats @ {cprofile}")
+
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        report = {
+            "script": script,
+            "argv": sys.argv[1:],
+            "started": started.isoformat(timespec="seconds"),
+            # ru_maxrss is in KB on Linux
+            "max_rss": usage.ru_maxrss * 1024,
+            **PROFILER.report(),
+        }
+        folder = profile or PATH_PROFILE
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"{script}-{started:%Y%m%d-%H%M%S}.json"
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Wrote profile report @ {path}")
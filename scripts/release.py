@@ -3,6 +3,10 @@
 Uploading to the hub requires:
 pip install python-dotenv huggingface-hub
 
+The default publish only uploads the files whose hash changed since the last
+published manifest, and can be resumed if interrupted. The previous behaviour
+(staging everything and calling upload_large_folder) is kept as publish-folder.
+
 ---
 
 To modify the huggingface repo:
@@ -15,32 +19,71 @@ git push
 """
 
 import argparse
+import copy
 import datetime
-import re
+import hashlib
+import json
+import os
 import shutil
 import subprocess
 import sys
-from dataclasses import dataclass
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 from pprint import pprint
-from typing import Literal, get_args
+from typing import Literal, Protocol, TypedDict, get_args
 
 from dotenv import load_dotenv
-from huggingface_hub import HfApi, whoami
+from huggingface_hub import (
+    CommitOperationAdd,
+    CommitOperationCopy,
+    CommitOperationDelete,
+    HfApi,
+    whoami,
+)
+from huggingface_hub.hf_api import RepoFile
+from huggingface_hub.utils import EntryNotFoundError
+from profiling import add_profile_args, phase, profiled, request
+from scan import write_scan
 
 REPO_ID_HF = "daxida/wty-release"
 REPO_HF = f"https://huggingface.co/datasets/{REPO_ID_HF}"
 REPO_ID_GH = "https://github.com/daxida/wty"
 
 type DictTy = Literal["main", "ipa", "ipa-merged", "glossary"]
-type CmdTy = Literal["publish", "squash"]
+type CmdTy = Literal["publish", "publish-folder", "squash"]
+type StageMode = Literal["auto", "hardlink", "reflink", "symlink", "copy"]
 
 CMD_CHOICES = get_args(CmdTy.__value__)
+STAGE_MODE_CHOICES = get_args(StageMode.__value__)
+
+STAGE_METHODS: dict[StageMode, list[str]] = {
+    "auto": ["hardlink", "reflink", "copy"],
+    "hardlink": ["hardlink", "copy"],
+    "reflink": ["reflink", "copy"],
+    "symlink": ["symlink", "copy"],
+    "copy": ["copy"],
+}
+"""Methods to try, in order, to stage a file. Copy is always the last resort."""
+
+FICLONE = 0x40049409
+"""Linux ioctl to share the extents of a file (btrfs, xfs...), see ioctl_ficlone(2)."""
+
+DEFAULT_WORKERS = 8
+COMMIT_BATCH_SIZE = 200
+"""Maximum number of files per commit. Smaller commits are cheaper to redo."""
 
 
 @dataclass
 class Args:
     cmd: CmdTy
+    workers: int
+    local_hub: Path | None
+    stage_mode: StageMode
+    profile: Path | None
+    cprofile: Path | None
 
 
 def release_version() -> str:
@@ -60,6 +103,10 @@ class PathManager:
         self.index = self.release / "index"
         self.readme = self.release / "README.md"
         self.download = self.release / "kaikki"
+        self.manifest = self.release / "manifest.json"
+        # Local only: sha256 cache and progress of an interrupted publish
+        self.hashes = self.release / "hashes.json"
+        self.upload_state = self.release / "upload_state.json"
 
         # These are at the "github repo root"
         self.assets = Path("assets")
@@ -100,26 +147,48 @@ def human_size(size_bytes: float, precision: int = 2) -> str:
     return f"{size_bytes:.{precision}f} GB"
 
 
-def stats(
-    path: Path,
-    *,
-    file_pattern: str | None = None,
-    endswith: str | None = None,
-) -> tuple[int, str]:
-    n_files = 0
-    size_files = 0
-    for f in path.rglob("*"):
-        if f.is_file():
-            if file_pattern is not None and not re.match(file_pattern, f.name):
-                continue
-            if endswith is not None and not f.name.endswith(endswith):
+def reflink(src: Path, dst: Path) -> None:
+    import fcntl  # Unix only
+
+    with src.open("rb") as fsrc, dst.open("wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+@dataclass
+class StageReport:
+    methods: list[str]
+    """Methods still worth trying. A method that fails once is not tried again."""
+    n_files: int = 0
+    bytes_written: int = 0
+    by_method: Counter[str] = field(default_factory=Counter)
+
+    def stage_file(self, src: Path, dst: Path) -> None:
+        for method in list(self.methods):
+            try:
+                match method:
+                    case "hardlink":
+                        os.link(src, dst)
+                    case "reflink":
+                        reflink(src, dst)
+                    case "symlink":
+                        dst.symlink_to(src.resolve())
+                    case _:
+                        shutil.copyfile(src, dst)
+                        self.bytes_written += src.stat().st_size
+            except OSError as e:
+                if method == "copy":
+                    raise
+                # Cross-device link, unsupported filesystem etc.
+                print(f"[stage] {method} not available ({e}), falling back")
+                dst.unlink(missing_ok=True)
+                self.methods.remove(method)
                 continue
-            n_files += 1
-            size_files += f.stat().st_size
-    return n_files, human_size(size_files)
+            self.n_files += 1
+            self.by_method[method] += 1
+            return
 
 
-def prepare_stage() -> None:
+def prepare_stage(mode: StageMode) -> None:
     """Take the release folder created with wty and structure it to comply with
     huggingface upload_large_folder.
 
@@ -138,17 +207,36 @@ def prepare_stage() -> None:
             ├── README.md
             └── log.txt
 
-    We copy (not move) files so the local release directory remains intact.
+    Files are linked to (not moved from) the release folder, so that it remains intact
+    without duplicating it on disk. Depending on the mode and on what the filesystem
+    supports, files are hardlinked, reflinked or symlinked. They are only copied when
+    nothing else works.
 
     The README and log shown on the Hugging Face repo root are handled
     separately and do not require upload_large_folder.
     """
     PM.stage.mkdir()  # Fail if exists
 
+    start = time.perf_counter()
+    report = StageReport(methods=list(STAGE_METHODS[mode]))
+
     for destination in (PM.version, PM.latest):
-        print(f"[stage] copying release to {destination}...")
-        shutil.copytree(str(PM.dictionary), destination / "dict")
-        shutil.copytree(str(PM.index), destination / "index")
+        print(f"[stage] staging release to {destination} ({mode})...")
+        for folder in ("dict", "index"):
+            src_root = PM.release / folder
+            for dirpath, _, filenames in os.walk(src_root):
+                src_dir = Path(dirpath)
+                dst_dir = destination / folder / src_dir.relative_to(src_root)
+                dst_dir.mkdir(parents=True, exist_ok=True)
+                for filename in filenames:
+                    report.stage_file(src_dir / filename, dst_dir / filename)
+
+    elapsed = time.perf_counter() - start
+    methods = ", ".join(f"{k}: {v}" for k, v in report.by_method.most_common())
+    print(
+        f"[stage] staged {report.n_files} files ({methods}), "
+        f"wrote {human_size(report.bytes_written)} in {elapsed:.2f} s"
+    )
 
 
 def login_to_huggingface() -> None:
@@ -165,13 +253,13 @@ def login_to_huggingface() -> None:
 
 # https://huggingface.co/new-dataset
 # https://huggingface.co/settings/tokens
-def upload_to_huggingface() -> None:
+def upload_to_huggingface(stage_mode: StageMode) -> None:
     PM.check_dict_dir()
 
     login_to_huggingface()
 
     dict_dir = PM.dictionary
-    _, size = stats(dict_dir)
+    size = human_size(sum(ds.size for ds in write_scan(dict_dir)))
     stage_dir = PM.stage
     version = release_version()
     git_cmd = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=".")
@@ -195,8 +283,10 @@ def upload_to_huggingface() -> None:
     api = HfApi()
 
     # Upload dict + index (stage folder)
-    prepare_stage()
-    api.upload_large_folder(**kwargs)  # type: ignore
+    with phase("stage"):
+        prepare_stage(stage_mode)
+    with phase("upload"), request(REPO_HF):
+        api.upload_large_folder(**kwargs)  # type: ignore
     print(f"Upload complete @ https://huggingface.co/datasets/{REPO_ID_HF}")
 
     # Upload README and logs at root, and also to latest and versions folders.
@@ -204,16 +294,381 @@ def upload_to_huggingface() -> None:
     update_readme_local(readme_path, commit_sha, version)
 
     for folder_in_repo in ("", f"versions/{release_version()}", "latest"):
-        api.upload_file(
-            path_or_fileobj=str(readme_path),
-            path_in_repo=f"{folder_in_repo}/README.md",
-            repo_id=REPO_ID_HF,
-            repo_type="dataset",
-            commit_message=f"[{version}] update README",
-        )
+        with phase("upload"), request(REPO_HF):
+            api.upload_file(
+                path_or_fileobj=str(readme_path),
+                path_in_repo=f"{folder_in_repo}/README.md",
+                repo_id=REPO_ID_HF,
+                repo_type="dataset",
+                commit_message=f"[{version}] update README",
+            )
         print(f"Uploaded README @ {folder_in_repo or 'root'}")
 
 
+class ManifestEntry(TypedDict):
+    sha256: str
+    size: int
+
+
+class Manifest(TypedDict):
+    """Content hashes of every published file, relative to the release folder.
+
+    Published at latest/manifest.json and versions/{version}/manifest.json.
+    """
+
+    version: str
+    commit: str
+    files: dict[str, ManifestEntry]
+
+
+type CommitOperation = CommitOperationAdd | CommitOperationCopy | CommitOperationDelete
+
+type Listing = dict[str, str | None]
+"""sha256 of the files under a folder of the repo, keyed by path relative to it.
+
+None when the hub does not tell (files not stored with LFS)."""
+
+RELEASE_FOLDERS = ("dict", "index")
+"""Folders of the release that the manifest describes."""
+
+
+class Hub(Protocol):
+    """What the publish pipeline needs from the huggingface dataset repo."""
+
+    def read_manifest(self) -> Manifest | None: ...
+
+    def list_files(self, folder: str) -> Listing: ...
+
+    def preupload(self, op: CommitOperationAdd) -> None: ...
+
+    def commit(self, ops: list[CommitOperation], message: str) -> None: ...
+
+
+class HfHub:
+    def __init__(self) -> None:
+        self.api = HfApi()
+
+    def read_manifest(self) -> Manifest | None:
+        filename = "latest/manifest.json"
+        with request(REPO_HF):
+            exists = self.api.file_exists(REPO_ID_HF, filename, repo_type="dataset")
+        if not exists:
+            return None
+        with request(REPO_HF):
+            path = self.api.hf_hub_download(REPO_ID_HF, filename, repo_type="dataset")
+        return json.loads(Path(path).read_text())  # type: ignore
+
+    def list_files(self, folder: str) -> Listing:
+        listing: Listing = {}
+        try:
+            with request(REPO_HF):
+                for item in self.api.list_repo_tree(
+                    REPO_ID_HF, path_in_repo=folder, recursive=True, repo_type="dataset"
+                ):
+                    if isinstance(item, RepoFile):
+                        rel = item.path.removeprefix(f"{folder}/")
+                        listing[rel] = item.lfs.sha256 if item.lfs else None
+        except EntryNotFoundError:
+            pass
+        return listing
+
+    def preupload(self, op: CommitOperationAdd) -> None:
+        with request(REPO_HF):
+            self.api.preupload_lfs_files(REPO_ID_HF, [op], repo_type="dataset")
+
+    def commit(self, ops: list[CommitOperation], message: str) -> None:
+        with request(REPO_HF):
+            self.api.create_commit(
+                REPO_ID_HF, ops, commit_message=message, repo_type="dataset"
+            )
+
+
+class LocalHub:
+    """Stand-in for the hub that applies commits to a local folder.
+
+    Useful to try the publish pipeline (and its resuming) without touching the hub.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def read_manifest(self) -> Manifest | None:
+        path = self.root / "latest" / "manifest.json"
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def list_files(self, folder: str) -> Listing:
+        root = self.root / folder
+        return {
+            path.relative_to(root).as_posix(): sha256_file(path)
+            for path in root.rglob("*")
+            if path.is_file()
+        }
+
+    def preupload(self, op: CommitOperationAdd) -> None:
+        pass
+
+    def commit(self, ops: list[CommitOperation], message: str) -> None:
+        print(f"[local-hub] {message} ({len(ops)} operations)")
+        for op in ops:
+            dst = self.root / op.path_in_repo
+            match op:
+                case CommitOperationAdd():
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(op.path_or_fileobj, dst)  # type: ignore
+                case CommitOperationCopy():
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(self.root / op.src_path_in_repo, dst)
+                case CommitOperationDelete():
+                    dst.unlink(missing_ok=True)
+
+
+def sha256_file(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def build_manifest(version: str, commit_sha: str, workers: int) -> Manifest:
+    """Hash every file under dict/ and index/.
+
+    Hashes are cached locally by (size, mtime), so that resuming an interrupted
+    publish does not hash the whole release again.
+    """
+    cache: dict[str, list] = {}
+    if PM.hashes.exists():
+        cache = json.loads(PM.hashes.read_text())
+
+    paths = sorted(
+        path
+        for folder in (PM.dictionary, PM.index)
+        for path in folder.rglob("*")
+        if path.is_file()
+    )
+
+    def hash_one(path: Path) -> tuple[str, int, int, str]:
+        rel = path.relative_to(PM.release).as_posix()
+        st = path.stat()
+        cached = cache.get(rel)
+        if cached is not None and cached[:2] == [st.st_size, st.st_mtime_ns]:
+            return rel, st.st_size, st.st_mtime_ns, cached[2]
+        return rel, st.st_size, st.st_mtime_ns, sha256_file(path)
+
+    files: dict[str, ManifestEntry] = {}
+    new_cache: dict[str, list] = {}
+    # hashlib releases the GIL while hashing: threads are enough
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for rel, size, mtime_ns, sha256 in executor.map(hash_one, paths):
+            files[rel] = {"sha256": sha256, "size": size}
+            new_cache[rel] = [size, mtime_ns, sha256]
+
+    PM.hashes.write_text(json.dumps(new_cache))
+    return {"version": version, "commit": commit_sha, "files": files}
+
+
+def manifest_listing(manifest: Manifest) -> Listing:
+    return {rel: entry["sha256"] for rel, entry in manifest["files"].items()}
+
+
+def changed_files(manifest: Manifest, latest: Listing) -> list[str]:
+    """Files whose hash differs from the one in latest/, or that are not there."""
+    return [
+        rel
+        for rel, entry in manifest["files"].items()
+        if latest.get(rel) != entry["sha256"]
+    ]
+
+
+def plan_operations(
+    manifest: Manifest, latest: Listing, version_files: Listing
+) -> list[CommitOperation]:
+    """Operations to go from what is published to the local manifest.
+
+    `latest` describes latest/ (the published manifest, or the files actually there) and
+    `version_files` the files already in the version folder, if it was published today.
+
+    Only changed files are uploaded, both to latest/ and to the version folder (the hub
+    stores their content once). Both operations share one upload info, whose sha256 is
+    taken from the manifest: files are not hashed again. Unchanged files are copied
+    server side from latest/ into the version folder, unless they are already there.
+    Files that disappeared are removed from both folders.
+    """
+    version = manifest["version"]
+    changed = set(changed_files(manifest, latest))
+    ops: list[CommitOperation] = []
+
+    for rel, entry in manifest["files"].items():
+        if rel in changed:
+            op = CommitOperationAdd(
+                path_in_repo=f"latest/{rel}", path_or_fileobj=str(PM.release / rel)
+            )
+            op.upload_info.sha256 = bytes.fromhex(entry["sha256"])
+            version_op = copy.copy(op)
+            version_op.path_in_repo = f"versions/{version}/{rel}"
+            ops.extend((op, version_op))
+        elif version_files.get(rel) != entry["sha256"]:
+            ops.append(
+                CommitOperationCopy(
+                    src_path_in_repo=f"latest/{rel}",
+                    path_in_repo=f"versions/{version}/{rel}",
+                )
+            )
+
+    for folder_in_repo, listing in (
+        ("latest", latest),
+        (f"versions/{version}", version_files),
+    ):
+        removed = listing.keys() - manifest["files"].keys()
+        for rel in sorted(removed):
+            if rel.split("/", 1)[0] in RELEASE_FOLDERS:
+                ops.append(
+                    CommitOperationDelete(path_in_repo=f"{folder_in_repo}/{rel}")
+                )
+
+    return ops
+
+
+class UploadState:
+    """Paths in repo already committed for this version. Persisted after every commit.
+
+    Resuming is only allowed for the same version (i.e. the same day) and the same
+    manifest: otherwise the state is discarded and the publish starts over. The
+    discarded attempt may have left files in latest/ that the published manifest does
+    not describe.
+    """
+
+    def __init__(self, manifest: Manifest) -> None:
+        self.key = [manifest["version"], sha256_manifest(manifest)]
+        self.committed: set[str] = set()
+        self.discarded = False
+        if PM.upload_state.exists():
+            data = json.loads(PM.upload_state.read_text())
+            if data["key"] == self.key:
+                self.committed = set(data["committed"])
+            else:
+                self.discarded = True
+
+    def save(self) -> None:
+        data = {"key": self.key, "committed": sorted(self.committed)}
+        PM.upload_state.write_text(json.dumps(data, indent=2))
+
+    def clear(self) -> None:
+        PM.upload_state.unlink(missing_ok=True)
+
+
+def sha256_manifest(manifest: Manifest) -> str:
+    text = json.dumps(manifest["files"], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def commit_in_batches(
+    hub: Hub, state: UploadState, ops: list[CommitOperation], label: str
+) -> None:
+    version = state.key[0]
+    for i in range(0, len(ops), COMMIT_BATCH_SIZE):
+        batch = ops[i : i + COMMIT_BATCH_SIZE]
+        hub.commit(batch, f"[{version}] {label} ({len(batch)} files)")
+        state.committed.update(op.path_in_repo for op in batch)
+        state.save()
+
+
+def run_operations(
+    hub: Hub, state: UploadState, ops: list[CommitOperation], workers: int
+) -> None:
+    """Upload file contents with parallel workers, and commit them in batches.
+
+    Commits happen in this thread, as soon as a batch of uploads is ready, so that
+    an interruption only loses the uploads of the current batch.
+    """
+    pending = [op for op in ops if op.path_in_repo not in state.committed]
+    additions = [op for op in pending if isinstance(op, CommitOperationAdd)]
+    others = [op for op in pending if not isinstance(op, CommitOperationAdd)]
+    n_skipped = len(ops) - len(pending)
+    if n_skipped:
+        print(
+            f"[publish] resuming: {n_skipped}/{len(ops)} operations already committed"
+        )
+    print(f"[publish] {len(additions)} uploads, {len(others)} copies/deletions")
+
+    uploaded: list[CommitOperation] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(hub.preupload, op): op for op in additions}
+        try:
+            for future in as_completed(futures):
+                future.result()
+                uploaded.append(futures[future])
+                if len(uploaded) == COMMIT_BATCH_SIZE:
+                    commit_in_batches(hub, state, uploaded, "upload")
+                    uploaded = []
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+    commit_in_batches(hub, state, uploaded, "upload")
+    commit_in_batches(hub, state, others, "copy unchanged and delete removed")
+
+
+def publish(hub: Hub, workers: int) -> None:
+    """Publish the release folder, uploading only what changed since the last publish.
+
+    The manifest is committed last, together with the READMEs, so that the published
+    manifest always describes a complete release.
+    """
+    PM.check_dict_dir()
+
+    version = release_version()
+    git_cmd = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=".")
+    commit_sha = git_cmd.decode().strip()
+
+    print("[publish] hashing release...")
+    write_scan(PM.dictionary, workers)
+    with phase("hash"):
+        manifest = build_manifest(version, commit_sha, workers)
+    with phase("read manifest"):
+        published = hub.read_manifest()
+        version_files = hub.list_files(f"versions/{version}")
+
+    state = UploadState(manifest)
+    if published is None or state.discarded:
+        # Whatever an abandoned attempt left in latest/ is not in the published manifest
+        print("[publish] diffing against the files in latest/")
+        with phase("read manifest"):
+            latest = hub.list_files("latest")
+    else:
+        latest = manifest_listing(published)
+    ops = plan_operations(manifest, latest, version_files)
+    changed = changed_files(manifest, latest)
+    size_changed = sum(manifest["files"][rel]["size"] for rel in changed)
+
+    print()
+    print(commit_sha[:7], commit_sha)
+    print(f"{version=}")
+    print(f"Previous version: {published['version'] if published else None}")
+    print(f"Changed files: {len(changed)}/{len(manifest['files'])}")
+    print(f"Upload {human_size(size_changed)} to {REPO_ID_HF}?")
+    double_check()
+
+    with phase("upload"):
+        run_operations(hub, state, ops, workers)
+
+    update_readme_local(PM.readme, commit_sha, version)
+    PM.manifest.write_text(json.dumps(manifest, indent=2))
+    final_ops: list[CommitOperation] = [
+        CommitOperationAdd(path_in_repo="README.md", path_or_fileobj=str(PM.readme))
+    ]
+    for folder_in_repo in ("latest", f"versions/{version}"):
+        for path in (PM.readme, PM.manifest):
+            final_ops.append(
+                CommitOperationAdd(
+                    path_in_repo=f"{folder_in_repo}/{path.name}",
+                    path_or_fileobj=str(path),
+                )
+            )
+    with phase("upload"):
+        hub.commit(final_ops, f"[{version}] update README and manifest")
+    state.clear()
+
+    print(f"Publish complete @ {REPO_HF}")
+
+
 def super_squash() -> None:
     """Squash the huggingface repo history.
 
@@ -272,18 +727,54 @@ def parse_args() -> Args:
         choices=CMD_CHOICES,
         help="Command to run (default: publish)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of parallel hashing/upload workers (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--local-hub",
+        type=Path,
+        help="Publish to this folder instead of huggingface (for testing)",
+    )
+    parser.add_argument(
+        "--stage-mode",
+        default="auto",
+        choices=STAGE_MODE_CHOICES,
+        help="How to build the stage folder of publish-folder (default: auto)",
+    )
+    add_profile_args(parser)
     args = parser.parse_args()
-    return Args(cmd=args.cmd)
+    return Args(
+        cmd=args.cmd,
+        workers=args.workers,
+        local_hub=args.local_hub,
+        stage_mode=args.stage_mode,
+        profile=args.profile,
+        cprofile=args.cprofile,
+    )
 
 
 def main() -> None:
     args = parse_args()
-    match args.cmd:
-        case "publish":
-            pre_stage()
-            upload_to_huggingface()
-        case "squash":
-            super_squash()
+    with profiled(args.profile, args.cprofile, f"release-{args.cmd}"):
+        match args.cmd:
+            case "publish":
+                if not PM.dictionary.exists():
+                    pre_stage()
+                hub: Hub
+                if args.local_hub is not None:
+                    hub = LocalHub(args.local_hub)
+                else:
+                    login_to_huggingface()
+                    hub = HfHub()
+                publish(hub, args.workers)
+            case "publish-folder":
+                pre_stage()
+                upload_to_huggingface(args.stage_mode)
+            case "squash":
+                super_squash()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+"""Scan the release dictionaries for size information.
+
+Walks a release `dict/` folder, expected to look like:
+
+    dict/<source>/<target>/<dict-name>.zip
+
+and caches the exact size in bytes of every dictionary, grouped by dictionary type,
+source and target, in a json next to it. release.py rescans before publishing, and
+metadata.py reads the cache as long as the tree looks the same: same folders with the
+same mtimes, and the same number of files.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+from profiling import add_profile_args, phase, profiled
+
+type DictTy = Literal["main", "ipa", "ipa-merged", "glossary"]
+
+SCAN_FILENAME = "scan.json"
+DEFAULT_WORKERS = 8
+
+
+@dataclass
+class DictStat:
+    path: str
+    """Relative to the scanned root."""
+    type: DictTy
+    source: str
+    target: str
+    size: int
+
+
+def classify_dict(name: str) -> DictTy:
+    """Same logic as classify_dict @ src/dict/release/metadata.rs"""
+    if name.endswith("-ipa"):
+        # wty-afb-en-ipa
+        if name.count("-") == 3:
+            return "ipa"
+        # wty-afb-ipa
+        return "ipa-merged"
+    if name.endswith("-gloss"):
+        return "glossary"
+    return "main"
+
+
+def scan_dir(path: str) -> tuple[list[str], list[tuple[str, int]]]:
+    """Return the subdirectories and the (path, size) of the files in path."""
+    dirs: list[str] = []
+    files: list[tuple[str, int]] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+            elif entry.is_file():
+                files.append((entry.path, entry.stat().st_size))
+    return dirs, files
+
+
+def iter_files(root: Path, workers: int = DEFAULT_WORKERS) -> Iterator[tuple[str, int]]:
+    """Yield the (path, size) of every file under root, as soon as they are found.
+
+    Every directory is scanned by a worker, and its subdirectories are submitted as
+    soon as they are listed, so that stats of different folders run concurrently.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: set[Future] = {executor.submit(scan_dir, str(root))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dirs, files = future.result()
+                pending.update(executor.submit(scan_dir, d) for d in dirs)
+                yield from files
+
+
+def scan(root: Path, workers: int = DEFAULT_WORKERS) -> list[DictStat]:
+    """Stat every dictionary zip under root. Sorted by path for stable output."""
+    dict_stats: list[DictStat] = []
+    for path, size in iter_files(root, workers):
+        rel = Path(path).relative_to(root)
+        if rel.suffix != ".zip" or len(rel.parts) != 3:
+            continue
+        source, target, filename = rel.parts
+        dict_ty = classify_dict(filename.removesuffix(".zip"))
+        dict_stats.append(DictStat(rel.as_posix(), dict_ty, source, target, size))
+    dict_stats.sort(key=lambda ds: ds.path)
+    return dict_stats
+
+
+def group(dict_stats: list[DictStat]) -> dict[str, Any]:
+    """Group sizes (in bytes) by dictionary type > source > target.
+
+    Same shape as docs/release_metadata.json, without the timings.
+    """
+    summary: dict[str, Any] = {"size": 0, "count": 0, "dicts": {}}
+    for ds in dict_stats:
+        type_entry = summary["dicts"].setdefault(
+            ds.type, {"size": 0, "count": 0, "sources": {}}
+        )
+        src = type_entry["sources"].setdefault(
+            ds.source, {"size": 0, "count": 0, "targets": {}}
+        )
+        src["targets"][ds.target] = ds.size
+        for entry in (summary, type_entry, src):
+            entry["size"] += ds.size
+            entry["count"] += 1
+    return summary
+
+
+def scan_path(root: Path) -> Path:
+    """Where the scan of root is cached: data/release/dict >> data/release/scan.json"""
+    return root.parent / SCAN_FILENAME
+
+
+def tree_stamp(root: Path) -> dict[str, Any]:
+    """The mtime of every folder under root, and the number of files.
+
+    Adding, removing or renaming a file changes the mtime of its folder. Only folders
+    are stat'ed, so this is much cheaper than a scan.
+    """
+    dirs: dict[str, int] = {}
+    n_files = 0
+    for dirpath, _, filenames in os.walk(root):
+        rel = Path(dirpath).relative_to(root).as_posix()
+        dirs[rel] = os.stat(dirpath).st_mtime_ns
+        n_files += len(filenames)
+    return {"dirs": dirs, "n_files": n_files}
+
+
+def write_scan(root: Path, workers: int = DEFAULT_WORKERS) -> list[DictStat]:
+    # Stamped before scanning, so that changes during the scan invalidate it
+    stamp = tree_stamp(root)
+    with phase("scan"):
+        dict_stats = scan(root, workers)
+    data = {
+        **group(dict_stats),
+        "stamp": stamp,
+        "files": [asdict(ds) for ds in dict_stats],
+    }
+    scan_path(root).write_text(json.dumps(data, indent=2))
+    return dict_stats
+
+
+def load_scan(root: Path, workers: int = DEFAULT_WORKERS) -> list[DictStat]:
+    """Read the cached scan of root, or scan it again if the tree changed since.
+
+    A dictionary rewritten in place, with the same name, keeps the stamp of the tree:
+    use write_scan when exact sizes matter.
+    """
+    path = scan_path(root)
+    if path.exists():
+        data = json.loads(path.read_text())
+        if data.get("stamp") == tree_stamp(root):
+            return [DictStat(**ds) for ds in data["files"]]
+    return write_scan(root, workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", type=Path, help="release dict folder to scan")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"number of directories scanned in parallel (default: {DEFAULT_WORKERS})",
+    )
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        print(f"No folder found at {args.root}")
+        sys.exit(1)
+
+    with profiled(args.profile, args.cprofile, "scan"):
+        dict_stats = write_scan(args.root, args.workers)
+    total = sum(ds.size for ds in dict_stats)
+    print(f"Scanned {len(dict_stats)} dictionaries ({total} bytes)")
+    print(f"Wrote scan @ {scan_path(args.root)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Tests for the publish pipeline of release.py, against a LocalHub.
+
+Run with: python3 -m unittest discover -s scripts
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import release
+from huggingface_hub import (
+    CommitOperationAdd,
+    CommitOperationCopy,
+    CommitOperationDelete,
+)
+from release import CommitOperation, LocalHub, PathManager, publish
+
+
+class Interrupted(Exception):
+    pass
+
+
+class RecordingHub(LocalHub):
+    """LocalHub that records its commits, and can be interrupted after some of them."""
+
+    def __init__(self, root: Path, fail_after: int | None = None) -> None:
+        super().__init__(root)
+        self.commits: list[list[CommitOperation]] = []
+        self.fail_after = fail_after
+
+    def commit(self, ops: list[CommitOperation], message: str) -> None:
+        if self.fail_after is not None and len(self.commits) == self.fail_after:
+            raise Interrupted
+        super().commit(ops, message)
+        self.commits.append(ops)
+
+    def ops(self, ty: type) -> list[CommitOperation]:
+        return [op for ops in self.commits for op in ops if isinstance(op, ty)]
+
+    def paths(self, ty: type) -> set[str]:
+        return {op.path_in_repo for op in self.ops(ty)}
+
+    def tree(self, folder: str) -> dict[str, str]:
+        root = self.root / folder
+        return {
+            path.relative_to(root).as_posix(): path.read_text()
+            for path in root.rglob("*")
+            if path.is_file()
+        }
+
+
+class PublishTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp = Path(tmp_dir.name)
+        self.pm = PathManager(self.tmp / "data")
+        self.pm.release.mkdir(parents=True)
+
+        for patch in (
+            mock.patch.object(release, "PM", self.pm),
+            mock.patch.object(release, "double_check"),
+            mock.patch.object(
+                release.subprocess, "check_output", return_value=b"0" * 40
+            ),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def write_release(self, files: dict[str, str]) -> None:
+        """Replace the release folder with files, keyed by path relative to it."""
+        for folder in release.RELEASE_FOLDERS:
+            root = self.pm.release / folder
+            for path in root.rglob("*") if root.exists() else ():
+                if path.is_file():
+                    path.unlink()
+        for rel, content in files.items():
+            path = self.pm.release / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+    def publish(self, hub: LocalHub, version: str) -> None:
+        with (
+            mock.patch.object(release, "release_version", return_value=version),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            publish(hub, workers=2)
+
+    def test_uploads_only_changed_files(self) -> None:
+        files = {
+            "dict/en/el/wty-en-el.zip": "en-el",
+            "dict/de/en/wty-de-en.zip": "de-en",
+            "index/wty-en-el.json": "{}",
+        }
+        self.write_release(files)
+        hub = RecordingHub(self.tmp / "hub")
+        self.publish(hub, "2024-01-01")
+        self.assertEqual(
+            hub.paths(CommitOperationAdd) - {"README.md"},
+            {
+                f"{folder}/{rel}"
+                for folder in ("latest", "versions/2024-01-01")
+                for rel in [*files, "README.md", "manifest.json"]
+            },
+        )
+
+        files["dict/en/el/wty-en-el.zip"] = "en-el, but longer"
+        self.write_release(files)
+        hub = RecordingHub(hub.root)
+        self.publish(hub, "2024-01-02")
+
+        uploads = hub.ops(CommitOperationAdd)
+        self.assertEqual(
+            {op.path_in_repo for op in uploads if "/dict/" in op.path_in_repo},
+            {
+                "latest/dict/en/el/wty-en-el.zip",
+                "versions/2024-01-02/dict/en/el/wty-en-el.zip",
+            },
+        )
+        # The upload info comes from the manifest, and is shared by both folders
+        latest_op, version_op = (op for op in uploads if "/dict/" in op.path_in_repo)
+        self.assertIs(latest_op.upload_info, version_op.upload_info)
+        manifest = json.loads(self.pm.manifest.read_text())
+        sha256 = manifest["files"]["dict/en/el/wty-en-el.zip"]["sha256"]
+        self.assertEqual(latest_op.upload_info.sha256.hex(), sha256)
+
+        self.assertEqual(hub.tree("latest/dict"), hub.tree("versions/2024-01-02/dict"))
+        self.assertEqual(
+            hub.tree("latest/dict")["en/el/wty-en-el.zip"], "en-el, but longer"
+        )
+        self.assertEqual(
+            hub.tree("versions/2024-01-01/dict")["en/el/wty-en-el.zip"], "en-el"
+        )
+
+    def test_copies_unchanged_and_deletes_removed_files(self) -> None:
+        files = {
+            "dict/en/el/wty-en-el.zip": "en-el",
+            "dict/de/en/wty-de-en.zip": "de-en",
+            "dict/fr/en/wty-fr-en.zip": "fr-en",
+        }
+        self.write_release(files)
+        hub = RecordingHub(self.tmp / "hub")
+        self.publish(hub, "2024-01-01")
+
+        del files["dict/fr/en/wty-fr-en.zip"]
+        files["dict/en/el/wty-en-el.zip"] = "en-el, but longer"
+        self.write_release(files)
+        hub = RecordingHub(hub.root)
+        self.publish(hub, "2024-01-02")
+
+        copies = hub.ops(CommitOperationCopy)
+        self.assertEqual(
+            {(op.src_path_in_repo, op.path_in_repo) for op in copies},
+            {
+                (
+                    "latest/dict/de/en/wty-de-en.zip",
+                    "versions/2024-01-02/dict/de/en/wty-de-en.zip",
+                )
+            },
+        )
+        self.assertEqual(
+            hub.paths(CommitOperationDelete), {"latest/dict/fr/en/wty-fr-en.zip"}
+        )
+        expected = {
+            rel.removeprefix("dict/"): content for rel, content in files.items()
+        }
+        self.assertEqual(hub.tree("latest/dict"), expected)
+        self.assertEqual(hub.tree("versions/2024-01-02/dict"), expected)
+        self.assertIn("fr/en/wty-fr-en.zip", hub.tree("versions/2024-01-01/dict"))
+
+        # Publishing again the same day removes the file from the version folder too
+        del files["dict/de/en/wty-de-en.zip"]
+        self.write_release(files)
+        hub = RecordingHub(hub.root)
+        self.publish(hub, "2024-01-02")
+        self.assertEqual(
+            hub.paths(CommitOperationDelete),
+            {
+                "latest/dict/de/en/wty-de-en.zip",
+                "versions/2024-01-02/dict/de/en/wty-de-en.zip",
+            },
+        )
+        # Nothing changed otherwise: only the README and the manifest are uploaded
+        self.assertEqual(hub.ops(CommitOperationCopy), [])
+        self.assertEqual(len(hub.ops(CommitOperationAdd)), 5)
+        self.assertEqual(
+            hub.tree("versions/2024-01-02/dict"),
+            {"en/el/wty-en-el.zip": "en-el, but longer"},
+        )
+
+    def test_resume_after_interruption(self) -> None:
+        files = {f"dict/en/t{i}/wty-en-t{i}.zip": f"en-t{i}" for i in range(3)}
+        self.write_release(files)
+        hub = RecordingHub(self.tmp / "hub")
+        self.publish(hub, "2024-01-01")
+
+        # Every file changes: latest/ is diffed against the published manifest, so
+        # only the upload state knows what the interrupted attempt already committed.
+        files = {rel: f"{content}, but longer" for rel, content in files.items()}
+        self.write_release(files)
+        hub = RecordingHub(hub.root, fail_after=2)
+        with (
+            mock.patch.object(release, "COMMIT_BATCH_SIZE", 2),
+            self.assertRaises(Interrupted),
+        ):
+            self.publish(hub, "2024-01-02")
+
+        committed = {op.path_in_repo for ops in hub.commits for op in ops}
+        self.assertEqual(len(committed), 4)
+        state = json.loads(self.pm.upload_state.read_text())
+        self.assertEqual(set(state["committed"]), committed)
+        published = hub.read_manifest()
+        assert published is not None
+        self.assertEqual(published["version"], "2024-01-01")
+
+        hub = RecordingHub(hub.root)
+        with mock.patch.object(release, "COMMIT_BATCH_SIZE", 2):
+            self.publish(hub, "2024-01-02")
+
+        resumed = hub.paths(CommitOperationAdd)
+        self.assertEqual(
+            resumed - committed,
+            {
+                "README.md",
+                "latest/README.md",
+                "latest/manifest.json",
+                "versions/2024-01-02/README.md",
+                "versions/2024-01-02/manifest.json",
+                *(
+                    f"{folder}/{rel}"
+                    for folder in ("latest", "versions/2024-01-02")
+                    for rel in files
+                    if f"{folder}/{rel}" not in committed
+                ),
+            },
+        )
+        self.assertFalse(resumed & committed)
+        self.assertFalse(self.pm.upload_state.exists())
+        expected = {
+            rel.removeprefix("dict/"): content for rel, content in files.items()
+        }
+        self.assertEqual(hub.tree("latest/dict"), expected)
+        self.assertEqual(hub.tree("versions/2024-01-02/dict"), expected)
+        manifest = hub.read_manifest()
+        assert manifest is not None
+        self.assertEqual(manifest["version"], "2024-01-02")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,292 @@
+"""Tests for update_tests.py.
+
+Run with: python3 -m unittest discover -s scripts
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from difflib import SequenceMatcher
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from update_tests import (
+    DEFAULT_CACHE_MAX_SIZE_MB,
+    PATH_CACHE,
+    PATH_REGISTRY,
+    PATH_TESTS_INPUT,
+    Fetcher,
+    HttpCache,
+    flatten_json,
+    get_download_url,
+    read_jsonl,
+    score_candidates,
+)
+
+PATH_ROOT = Path(__file__).parent.parent
+PATH_REGISTRY_SAMPLE = PATH_ROOT / "tests" / "registry_sample.jsonl"
+CHECK_SCORER = os.environ.get("WTY_CHECK_SCORER") == "1"
+
+
+class Page:
+    """A page served by the local server, with the validators of its current body."""
+
+    def __init__(self, body: bytes, etag: str, last_modified: str) -> None:
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serve server.pages, and answer 304 if the validators of a request match."""
+
+    server: "Server"
+
+    def do_GET(self) -> None:
+        self.server.requests.append((self.path, dict(self.headers)))
+        page = self.server.pages.get(self.path)
+        if page is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_none_match is not None:
+            not_modified = if_none_match == page.etag
+        else:
+            not_modified = if_modified_since == page.last_modified
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", page.etag)
+        self.send_header("Last-Modified", page.last_modified)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Length", str(len(page.body)))
+        self.end_headers()
+        self.wfile.write(page.body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.pages: dict[str, Page] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+
+    def url(self, path: str) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+
+class HttpCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = Server()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = Path(tmp_dir.name)
+
+    def fetcher(self, cache: HttpCache) -> Fetcher:
+        fetcher = Fetcher(concurrency=1, rate_limit=0, cache=cache)
+        self.addCleanup(fetcher.session.close)
+        return fetcher
+
+    def test_revalidation(self) -> None:
+        body = b'{"word": "test"}\n'
+        etag = '"v1"'
+        last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+        self.server.pages["/test.jsonl"] = Page(body, etag, last_modified)
+        url = self.server.url("/test.jsonl")
+        cache = HttpCache(self.cache_dir, max_size=1 << 20)
+        fetcher = self.fetcher(cache)
+
+        first = fetcher.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertFalse(first.not_modified)
+        self.assertEqual(first.text, body.decode())
+        self.assertEqual(first.last_modified, last_modified)
+        entry = cache.load(url)
+        assert entry is not None
+        self.assertEqual(entry["etag"], etag)
+        self.assertEqual(entry["last_modified"], last_modified)
+
+        test = {"word": "test"}
+        cache.set_match(url, test, {"word": "test", "pos": "noun"})
+
+        second = fetcher.get(url)
+        _, headers = self.server.requests[-1]
+        self.assertEqual(headers.get("If-None-Match"), etag)
+        self.assertEqual(headers.get("If-Modified-Since"), last_modified)
+        self.assertEqual(second.status_code, 304)
+        self.assertTrue(second.ok)
+        self.assertTrue(second.not_modified)
+        self.assertIsNone(second.text)
+        self.assertEqual(second.last_modified, last_modified)
+        self.assertEqual(cache.read_text(url), body.decode())
+        # A 304 keeps the matches found in the cached body
+        self.assertEqual(cache.get_match(url, test), {"word": "test", "pos": "noun"})
+
+    def test_modified_page_replaces_cache_entry(self) -> None:
+        self.server.pages["/test.jsonl"] = Page(
+            b"{}\n", '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT"
+        )
+        url = self.server.url("/test.jsonl")
+        cache = HttpCache(self.cache_dir, max_size=1 << 20)
+        fetcher = self.fetcher(cache)
+        fetcher.get(url)
+        cache.set_match(url, {}, {})
+
+        new_body = b'{"word": "new"}\n'
+        new_last_modified = "Tue, 02 Jan 2024 00:00:00 GMT"
+        self.server.pages["/test.jsonl"] = Page(new_body, '"v2"', new_last_modified)
+
+        fetched = fetcher.get(url)
+        self.assertEqual(fetched.status_code, 200)
+        self.assertFalse(fetched.not_modified)
+        self.assertEqual(fetched.text, new_body.decode())
+        self.assertEqual(fetched.last_modified, new_last_modified)
+        entry = cache.load(url)
+        assert entry is not None
+        self.assertEqual(entry["etag"], '"v2"')
+        self.assertEqual(entry["last_modified"], new_last_modified)
+        self.assertEqual(entry["matches"], {})
+        self.assertEqual(cache.read_text(url), new_body.decode())
+
+    def test_errors_are_not_cached(self) -> None:
+        url = self.server.url("/missing.jsonl")
+        cache = HttpCache(self.cache_dir, max_size=1 << 20)
+
+        fetched = self.fetcher(cache).get(url)
+        self.assertFalse(fetched.ok)
+        self.assertEqual(fetched.status_code, 404)
+        self.assertIsNone(cache.load(url))
+
+    def test_eviction_by_size(self) -> None:
+        paths = ["/a.jsonl", "/b.jsonl", "/c.jsonl"]
+        for i, path in enumerate(paths):
+            self.server.pages[path] = Page(
+                b"x" * 1000, f'"{i}"', "Mon, 01 Jan 2024 00:00:00 GMT"
+            )
+        urls = [self.server.url(path) for path in paths]
+        cache = HttpCache(self.cache_dir, max_size=1 << 20)
+        fetcher = self.fetcher(cache)
+        for url in urls:
+            fetcher.get(url)
+
+        for url, mtime in zip(urls, (1, 2, 3), strict=True):
+            meta_path, _ = cache.paths(url)
+            os.utime(meta_path, (mtime, mtime))
+        # A 304 is a hit: a becomes the most recently used entry, and b the least
+        self.assertTrue(fetcher.get(urls[0]).not_modified)
+
+        entry_size = sum(path.stat().st_size for path in cache.paths(urls[0]))
+        cache.max_size = 2 * entry_size
+        cache.evict()
+
+        self.assertIsNotNone(cache.load(urls[0]))
+        self.assertIsNone(cache.load(urls[1]))
+        self.assertIsNotNone(cache.load(urls[2]))
+        total_size = sum(path.stat().st_size for path in self.cache_dir.iterdir())
+        self.assertLessEqual(total_size, cache.max_size)
+
+
+def sequence_similarity(a: Any, b: Any) -> float:
+    """The scorer that score_candidates replaced, kept as a reference."""
+
+    def to_str(obj: Any) -> str:
+        return "\n".join(f"{k}: {v}" for k, v in sorted(flatten_json(obj).items()))
+
+    return SequenceMatcher(None, to_str(a), to_str(b)).ratio()
+
+
+class ScoreCandidatesTest(unittest.TestCase):
+    """Compare score_candidates with the reference scorer on real registry entries.
+
+    Every case of the sample is a test of tests/kaikki, and candidates taken from
+    tests/registry.json: the entries of the page of its word, plus (if the page has a
+    single entry) up to three entries of other words of the same language pair,
+    preferably with the same pos. Entries over 10kB were left out, since the reference
+    scorer is quadratic. TestsuiteMatchTest covers the full pages.
+    """
+
+    def test_same_ranking_as_reference(self) -> None:
+        with PATH_REGISTRY_SAMPLE.open(encoding="utf-8") as f:
+            cases = [json.loads(line) for line in f]
+
+        for case in cases:
+            test, candidates = case["test"], case["candidates"]
+            with self.subTest(f"{case['source']}-{case['target']} {test['word']}"):
+                reference = sorted(
+                    range(len(candidates)),
+                    key=lambda i: sequence_similarity(test, candidates[i]),
+                    reverse=True,
+                )
+                ranking = [i for i, _ in score_candidates(test, candidates)]
+
+                self.assertEqual(ranking[0], reference[0])
+                # The entries of the page of the word must come first, and in the
+                # same order. Other words only serve as decoys: the scorers do not
+                # always agree on their order.
+                scored = set(ranking)
+                same_word = {
+                    i for i, c in enumerate(candidates) if c["word"] == test["word"]
+                }
+                self.assertEqual(
+                    ranking, sorted(ranking, key=lambda i: i not in same_word)
+                )
+                self.assertEqual(
+                    [i for i in ranking if i in same_word],
+                    [i for i in reference if i in same_word and i in scored],
+                )
+
+
+@unittest.skipUnless(CHECK_SCORER, "set WTY_CHECK_SCORER=1 to run (slow)")
+class TestsuiteMatchTest(unittest.TestCase):
+    """Both scorers must choose the same entry for every test of tests/kaikki.
+
+    Candidates are the full kaikki page of the word, large ones included, read from
+    the response cache of update_tests.py: run it with --update-registry first.
+    """
+
+    def test_same_choice_as_reference(self) -> None:
+        registry = json.loads((PATH_ROOT / PATH_REGISTRY).read_text())
+        custom = {
+            (source, target, value["json"]["word"])
+            for source, targets in registry.items()
+            for target, values in targets.items()
+            for value in values
+            if value["download_url"] == "none"
+        }
+        cache = HttpCache(PATH_ROOT / PATH_CACHE, DEFAULT_CACHE_MAX_SIZE_MB * 1024**2)
+
+        for tests_path in sorted((PATH_ROOT / PATH_TESTS_INPUT).glob("*.jsonl")):
+            source, target, _ = tests_path.name.split("-")
+            for test in read_jsonl(tests_path.read_text(encoding="utf-8")):
+                word = test["word"]
+                with self.subTest(f"{source}-{target} {word}"):
+                    if (source, target, word) in custom:
+                        self.skipTest("custom testcase, not in kaikki")
+                    url = get_download_url(word, target)  # type: ignore
+                    self.assertIsNotNone(cache.load(url), f"{url} is not cached")
+                    candidates = read_jsonl(cache.read_text(url))
+
+                    # Same as the old scorer: stable sort, so the first best wins
+                    scores = [sequence_similarity(test, c) for c in candidates]
+                    reference = scores.index(max(scores))
+                    best, _ = score_candidates(test, candidates)[0]
+                    self.assertEqual(candidates[best], candidates[reference])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,18 +7,35 @@ The registry is only intended to be used via git diffs, to check for updates.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
-from difflib import SequenceMatcher
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Literal, TypedDict, cast, get_args
+from urllib.parse import urlsplit
 
 import requests
+from profiling import add_profile_args, phase, profiled, record_http
+from requests.adapters import HTTPAdapter
 
 PATH_TESTS_DIR = Path("tests")
 PATH_TESTS_INPUT = PATH_TESTS_DIR / "kaikki"
 PATH_REGISTRY = PATH_TESTS_DIR / "registry.json"
 PATH_REGISTRY_TIMESTAMPS = PATH_TESTS_DIR / "registry_timestamps.json"
+PATH_CACHE = Path("data") / "cache" / "update_tests"
+
+DEFAULT_CONCURRENCY = 8
+"""Number of requests that can be in flight at the same time."""
+DEFAULT_RATE_LIMIT = 10.0
+"""Maximum number of requests per second sent to the same host. 0 disables it."""
+DEFAULT_CACHE_MAX_SIZE_MB = 512
+"""Size above which the least recently used cached responses are evicted."""
 
 L = Literal[
     "ar",
@@ -83,12 +100,90 @@ def flatten_json(obj: Any, prefix: str = "") -> dict[str, str]:
     return items
 
 
-def json_to_str(a: Any) -> str:
-    return "\n".join(f"{k}: {v}" for k, v in sorted(flatten_json(a).items()))
+STRUCTURAL_KEYS = ("lang_code", "pos", "etymology_number")
+"""Top level keys that a candidate must share with the test to be scored."""
+SENSE_ID_KEYS = ("id", "senseid", "sense_index")
+"""Sense level keys that identify a sense, depending on the edition extractor."""
+
+
+class Flattened:
+    """The flattened "key: value" items of a JSON object, and the words of its values.
+
+    Both are sets (or counters) so that comparing two objects is linear in their size.
+    """
+
+    def __init__(self, obj: Any) -> None:
+        flat = flatten_json(obj)
+        self.items = {f"{k}: {v}" for k, v in flat.items()}
+        self.words = Counter(word for v in flat.values() for word in v.split())
+
+
+def dice(a_len: int, b_len: int, common: int) -> float:
+    total = a_len + b_len
+    return 2 * common / total if total else 1.0
 
 
-def json_similarity(a: Any, b: Any) -> float:
-    return SequenceMatcher(None, json_to_str(a), json_to_str(b)).ratio()
+def flat_similarity(a: Flattened, b: Flattened) -> tuple[float, float]:
+    """Similarity between two flattened JSON objects.
+
+    Compares exact "key: value" items first. Since an updated gloss shares no item with
+    its previous version, the overlap of value words is used to break ties.
+    """
+    items = dice(len(a.items), len(b.items), len(a.items & b.items))
+    words = dice(a.words.total(), b.words.total(), (a.words & b.words).total())
+    return items, words
+
+
+def json_similarity(a: Any, b: Any) -> tuple[float, float]:
+    return flat_similarity(Flattened(a), Flattened(b))
+
+
+def sense_ids(entry: Any) -> set[str]:
+    return {
+        str(sense[key])
+        for sense in entry.get("senses", [])
+        for key in SENSE_ID_KEYS
+        if key in sense
+    }
+
+
+def prefilter(test: Any, candidates: list[Any]) -> list[int]:
+    """Indices of the candidates that agree with the test on cheap structural keys.
+
+    A filter is only applied if at least one candidate survives it, so that a test
+    whose pos (etc.) changed upstream still gets matched.
+    """
+    indices = list(range(len(candidates)))
+
+    for key in STRUCTURAL_KEYS:
+        if key not in test:
+            continue
+        kept = [i for i in indices if candidates[i].get(key) == test[key]]
+        if kept:
+            indices = kept
+
+    if test_ids := sense_ids(test):
+        kept = [i for i in indices if sense_ids(candidates[i]) & test_ids]
+        if kept:
+            indices = kept
+
+    return indices
+
+
+def score_candidates(test: Any, candidates: list[Any]) -> list[tuple[int, Any]]:
+    """Score every candidate against the test at once.
+
+    The test is only flattened once, and candidates that do not pass the prefilter are
+    not flattened at all. Return (index, score) pairs, best first. Ties are broken by
+    the position of the candidate.
+    """
+    flat_test = Flattened(test)
+    scores = [
+        (i, flat_similarity(flat_test, Flattened(candidates[i])))
+        for i in prefilter(test, candidates)
+    ]
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores
 
 
 def get_test_path(source: L, target: L) -> Path:
@@ -101,31 +196,260 @@ def add_to_registry(registry: Reg, source: L, target: L, value: RegValue) -> Non
     registry[source][target].append(value)
 
 
-def update_registry_for_pair(source: L, target: L) -> tuple[Reg, Timestamps]:
+def get_download_url(word: str, target: L) -> str:
+    search_query = "/".join([word[0], word[:2], word])
+    # We can replace the "All languages combined" with the source but it requires
+    # knowing how to convert from an iso (en) to a long name (English)
+    if target == "en":
+        return f"https://kaikki.org/dictionary/All%20languages%20combined/meaning/{search_query}.jsonl"
+    return f"https://kaikki.org/{target}wiktionary/All%20languages%20combined/meaning/{search_query}.jsonl"
+
+
+class RateLimiter:
+    """Space out requests to the same host by at least 1/rate seconds.
+
+    Slots are reserved under a lock, but the sleeping happens outside of it, so that
+    requests to different hosts never wait on each other.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot: dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CacheEntry(TypedDict):
+    url: str
+    etag: str | None
+    last_modified: str | None
+    matches: dict[str, Any]
+    """Best match of every test scored against this body, keyed by test hash."""
+
+
+def test_hash(test: Any) -> str:
+    text = json.dumps(test, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    # The thread id makes the temporary path unique across workers.
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+class HttpCache:
+    """On-disk cache of kaikki responses keyed by url.
+
+    Every url is stored as two files: the raw body, and a small json with the
+    validators (ETag, Last-Modified) used for conditional requests, together with the
+    best matches already found in that body. The mtime of the latter is bumped on
+    every hit, and is what eviction uses to find the least recently used entries.
+    """
+
+    def __init__(self, root: Path, max_size: int) -> None:
+        self.root = root
+        self.max_size = max_size
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def load(self, url: str) -> CacheEntry | None:
+        meta_path, body_path = self.paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            entry: CacheEntry = json.loads(meta_path.read_text())
+        except json.JSONDecodeError:
+            return None  # Interrupted write: treat it as a miss
+        return entry if entry["url"] == url else None
+
+    def store(self, url: str, resp: requests.Response) -> None:
+        meta_path, body_path = self.paths(url)
+        entry: CacheEntry = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "matches": {},
+        }
+        write_atomic(body_path, resp.content)
+        write_atomic(meta_path, json.dumps(entry, ensure_ascii=False).encode())
+
+    def touch(self, url: str) -> None:
+        meta_path, _ = self.paths(url)
+        meta_path.touch()
+
+    def read_text(self, url: str) -> str:
+        _, body_path = self.paths(url)
+        return body_path.read_text(encoding="utf-8")
+
+    def get_match(self, url: str, test: Any) -> Any | None:
+        entry = self.load(url)
+        if entry is None:
+            return None
+        return entry["matches"].get(test_hash(test))
+
+    def set_match(self, url: str, test: Any, match: Any) -> None:
+        entry = self.load(url)
+        if entry is None:
+            return
+        entry["matches"][test_hash(test)] = match
+        meta_path, _ = self.paths(url)
+        write_atomic(meta_path, json.dumps(entry, ensure_ascii=False).encode())
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_size."""
+        entries: list[tuple[float, int, Path, Path]] = []
+        total_size = 0
+        for meta_path in self.root.glob("*.json"):
+            body_path = meta_path.with_suffix(".body")
+            size = meta_path.stat().st_size
+            if body_path.exists():
+                size += body_path.stat().st_size
+            entries.append((meta_path.stat().st_mtime, size, meta_path, body_path))
+            total_size += size
+
+        if total_size <= self.max_size:
+            return
+
+        n_evicted = 0
+        for _, size, meta_path, body_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            meta_path.unlink(missing_ok=True)
+            body_path.unlink(missing_ok=True)
+            total_size -= size
+            n_evicted += 1
+        print(f"Evicted {n_evicted} cached responses from {self.root}")
+
+
+@dataclass
+class Fetched:
+    """What the registry needs from the response to a (maybe conditional) request."""
+
+    url: str
+    ok: bool
+    status_code: int
+    last_modified: str
+    not_modified: bool
+    """The server answered 304, the body is in the cache."""
+    text: str | None
+    """None if not_modified, to only read the cached body if we need to re-score."""
+
+
+class Fetcher:
+    """Fetch urls with a bounded thread pool sharing one connection-pooled session.
+
+    If a cache is given, requests are made conditional on the cached validators.
+    """
+
+    def __init__(
+        self, concurrency: int, rate_limit: float, cache: HttpCache | None = None
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rate_limit)
+        self.cache = cache
+        self.session = requests.Session()
+        # The default pool keeps 10 connections per host: make room for every worker.
+        adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str) -> Fetched:
+        entry = self.cache.load(url) if self.cache else None
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        self.limiter.wait(url)
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(url, headers=headers)
+        except requests.RequestException:
+            record_http(url, time.perf_counter() - start, None)
+            raise
+        record_http(
+            url, time.perf_counter() - start, resp.status_code, len(resp.content)
+        )
+
+        if self.cache and entry is not None and resp.status_code == 304:
+            self.cache.touch(url)
+            last_modified = resp.headers.get("Last-Modified", entry["last_modified"])
+            return Fetched(url, True, 304, last_modified or "None", True, None)
+
+        if self.cache and resp.ok:
+            self.cache.store(url, resp)
+
+        last_modified = resp.headers.get("Last-Modified", "None")
+        text = resp.content.decode("utf-8") if resp.ok else None
+        return Fetched(url, resp.ok, resp.status_code, last_modified, False, text)
+
+    def get_all(self, urls: list[str]) -> list[Fetched]:
+        """Fetch every url. Responses are returned in the same order as urls."""
+        if self.concurrency == 1:
+            return [self.get(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return list(executor.map(self.get, urls))
+
+
+def find_best_match(test: Any, text: str) -> Any:
+    jsonl = read_jsonl(text)
+
+    best_index, _ = score_candidates(test, jsonl)[0]
+    best_match = jsonl[best_index]
+
+    # reorder keys for visibility
+    return {
+        "word": best_match["word"],
+        "pos": best_match["pos"],
+        **{k: v for k, v in best_match.items() if k not in ("word", "pos")},
+    }
+
+
+def update_registry_for_pair(
+    source: L,
+    target: L,
+    tests: list[Any],
+    responses: list[Fetched],
+    cache: HttpCache | None,
+) -> tuple[Reg, Timestamps]:
     """Get registry and timestamps for the source-target language pair.
 
+    Expects one response per test, in the same order, so that the registry does not
+    depend on the order in which the requests were completed.
+
+    If the page of a word was not modified since it was cached, and the test did not
+    change either, the cached best match is reused without parsing the page.
+
     Timestamps are given separatedly so that they can be also writen as such. Preventing
     noise in the registry diffs.
     """
     print(f"Updating {source}-{target} (registry)", flush=True)
-    tests_path = get_test_path(source, target)
-    tests = read_jsonl(tests_path.read_text())
 
     registry: Reg = {}
     timestamps: Timestamps = {}
 
-    for test in tests:
+    for test, resp in zip(tests, responses, strict=True):
         word = test["word"]
+        url = resp.url
 
-        search_query = "/".join([word[0], word[:2], word])
-        # We can replace the "All languages combined" with the source but it requires
-        # knowing how to convert from an iso (en) to a long name (English)
-        if target == "en":
-            url = f"https://kaikki.org/dictionary/All%20languages%20combined/meaning/{search_query}.jsonl"
-        else:
-            url = f"https://kaikki.org/{target}wiktionary/All%20languages%20combined/meaning/{search_query}.jsonl"
-
-        resp = requests.get(url)
         if not resp.ok:
             print(
                 f"[WARN] (err. {resp.status_code}) Failed to fetch {word} @ {url}\n"
@@ -141,26 +465,23 @@ def update_registry_for_pair(source: L, target: L) -> tuple[Reg, Timestamps]:
             add_to_registry(registry, source, target, custom_test)
             continue
 
-        last_modified = resp.headers.get("Last-Modified", "None")
         if source not in timestamps:
             timestamps[source] = {target: []}
-        timestamps[source][target].append(last_modified)
-
-        text = resp.content.decode("utf-8")
-        jsonl = read_jsonl(text)
-
-        scores = [
-            (i, json_similarity(test, cand), cand) for i, cand in enumerate(jsonl)
-        ]
-        scores.sort(reverse=True, key=lambda x: x[1])
-        _, _, best_match = scores[0]
-
-        # reorder keys for visibility
-        best_match = {
-            "word": best_match["word"],
-            "pos": best_match["pos"],
-            **{k: v for k, v in best_match.items() if k not in ("word", "pos")},
-        }
+        timestamps[source][target].append(resp.last_modified)
+
+        best_match = None
+        if cache is not None and resp.not_modified:
+            best_match = cache.get_match(url, test)
+
+        if best_match is None:
+            if resp.text is not None:
+                text = resp.text
+            else:
+                assert cache is not None  # only conditional requests lack a body
+                text = cache.read_text(url)
+            best_match = find_best_match(test, text)
+            if cache is not None:
+                cache.set_match(url, test, best_match)
 
         registry_value: RegValue = {
             "url": url.replace(".jsonl", ".html"),
@@ -211,9 +532,14 @@ def get_lang_pairs_to_update(
     return lang_pairs
 
 
-def update_registry(lang_pairs: LangPairs, load_prev_registry: bool) -> None:
+def update_registry(
+    lang_pairs: LangPairs, load_prev_registry: bool, fetcher: Fetcher
+) -> None:
     """Update the registry with the given language pairs.
 
+    The words of every pair are fetched at once, so that small pairs do not leave
+    the workers of the fetcher idle.
+
     Note that this loads the previous registry, if any, to prevent deleting every
     entry that did not match the --target filter, it some was passed via the CLI.
 
@@ -236,21 +562,47 @@ def update_registry(lang_pairs: LangPairs, load_prev_registry: bool) -> None:
             with PATH_REGISTRY_TIMESTAMPS.open() as f:
                 timestamps = json.load(f)
 
-    for source, targets in lang_pairs.items():
+    pairs = [
+        (source, target) for source, targets in lang_pairs.items() for target in targets
+    ]
+    tests_per_pair = [read_jsonl(get_test_path(*pair).read_text()) for pair in pairs]
+    urls_per_pair = [
+        [get_download_url(test["word"], target) for test in tests]
+        for (_, target), tests in zip(pairs, tests_per_pair)
+    ]
+
+    all_urls = [url for urls in urls_per_pair for url in urls]
+    print(f"Fetching {len(all_urls)} words ({fetcher.concurrency} workers)", flush=True)
+    with phase("fetch"):
+        all_responses = fetcher.get_all(all_urls)
+    n_not_modified = sum(resp.not_modified for resp in all_responses)
+    if fetcher.cache is not None:
+        print(f"{n_not_modified}/{len(all_urls)} words not modified since cached")
+    responses_iter = iter(all_responses)
+
+    for (source, target), tests, urls in zip(pairs, tests_per_pair, urls_per_pair):
         if source not in registry:
             registry[source] = {}
         if source not in timestamps:
             timestamps[source] = {}
 
-        for target in targets:
-            pair_registry, pair_timestamps = update_registry_for_pair(source, target)
-            registry[source][target] = pair_registry[source][target]
-            timestamps[source][target] = pair_timestamps[source][target]
+        responses = [next(responses_iter) for _ in urls]
+        with phase("score"):
+            pair_registry, pair_timestamps = update_registry_for_pair(
+                source, target, tests, responses, fetcher.cache
+            )
+        registry[source][target] = pair_registry[source][target]
+        timestamps[source][target] = pair_timestamps[source][target]
 
-    PATH_REGISTRY.write_text(json.dumps(registry, indent=2, ensure_ascii=False))
-    PATH_REGISTRY_TIMESTAMPS.write_text(
-        json.dumps(timestamps, indent=2, ensure_ascii=False)
-    )
+    if fetcher.cache is not None:
+        with phase("evict cache"):
+            fetcher.cache.evict()
+
+    with phase("write registry"):
+        PATH_REGISTRY.write_text(json.dumps(registry, indent=2, ensure_ascii=False))
+        PATH_REGISTRY_TIMESTAMPS.write_text(
+            json.dumps(timestamps, indent=2, ensure_ascii=False)
+        )
 
 
 def update_tests() -> None:
@@ -288,17 +640,47 @@ def main() -> None:
         action="store_true",
         help="update the registry before updating tests",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"number of concurrent requests (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help=f"max requests per second per host, 0 to disable (default: {DEFAULT_RATE_LIMIT})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"do not read nor write the response cache at {PATH_CACHE}",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_SIZE_MB,
+        help=f"size of the response cache in MB (default: {DEFAULT_CACHE_MAX_SIZE_MB})",
+    )
+    add_profile_args(parser)
     args = parser.parse_args()
 
-    if args.update_registry:
-        print(f"Updating registry at {PATH_REGISTRY}")
-        lang_pairs = get_lang_pairs_to_update(args.source, args.target)
-        # Load previous if there are filters
-        load_prev_registry = args.source or args.target
-        update_registry(lang_pairs, load_prev_registry)
-
-    print(f"Updating tests at {PATH_TESTS_INPUT}")
-    update_tests()
+    with profiled(args.profile, args.cprofile, "update_tests"):
+        if args.update_registry:
+            print(f"Updating registry at {PATH_REGISTRY}")
+            lang_pairs = get_lang_pairs_to_update(args.source, args.target)
+            # Load previous if there are filters
+            load_prev_registry = args.source or args.target
+            cache = None
+            if not args.no_cache:
+                cache = HttpCache(PATH_CACHE, args.cache_max_size * 1024**2)
+            fetcher = Fetcher(args.concurrency, args.rate_limit, cache)
+            update_registry(lang_pairs, load_prev_registry, fetcher)
+
+        print(f"Updating tests at {PATH_TESTS_INPUT}")
+        with phase("write tests"):
+            update_tests()
 
 
 if __name__ == "__main__":
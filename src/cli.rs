@@ -6,7 +6,7 @@ use anyhow::{Ok, Result, bail};
 use clap::{Parser, Subcommand};
 
 use crate::{
-    dict::WriterFormat,
+    dict::{MetricsFormat, WriterFormat},
     lang::{Edition, EditionSpec, Lang},
     models::kaikki::WordEntry,
     path::{DictionaryType, PathManager},
@@ -125,6 +125,28 @@ pub struct ReleaseArgs {
     /// Change the root directory
     #[arg(long, default_value = "data")]
     pub root_dir: PathBuf,
+
+    /// Memory that dictionaries being made at the same time may use, in GiB
+    ///
+    /// The memory of every dictionary is estimated from the size of its source language.
+    #[arg(long, default_value_t = 20)]
+    pub memory_budget: u64,
+
+    /// Rebuild every dictionary, even those whose inputs did not change
+    #[arg(long)]
+    pub full: bool,
+
+    /// Only list the dictionaries that would be rebuilt
+    ///
+    /// Nothing is downloaded: editions are compared using their current databases.
+    #[arg(long)]
+    pub dry_run: bool,
+
+    /// Decompress downloads to jsonlines on disk before importing them
+    ///
+    /// Otherwise, databases are imported straight from the downloaded .gz.
+    #[arg(long)]
+    pub keep_jsonl: bool,
 }
 
 #[derive(Parser, Debug, Default)]
@@ -224,6 +246,35 @@ pub struct Options {
     /// Writer format
     #[arg(long, default_value_t = WriterFormat::Yomitan)]
     pub format: WriterFormat,
+
+    /// Cut whole editions into per-language slices when reading them, and read the
+    /// slices from then on
+    #[arg(long)]
+    pub cache_filter: bool,
+
+    /// Number of threads used to deserialize jsonlines. 0 uses every core
+    #[arg(long, short, default_value_t = 0)]
+    pub jobs: usize,
+
+    /// Deflate level of yomitan zips, from 0 (no compression) to 9 [default: 6]
+    #[arg(long, value_parser = clap::value_parser!(i64).range(0..=9))]
+    pub compression_level: Option<i64>,
+
+    /// Compress the banks of yomitan zips in parallel
+    #[arg(long)]
+    pub parallel_zip: bool,
+
+    /// Write memory and throughput metrics to this file
+    #[arg(long)]
+    pub metrics: Option<PathBuf>,
+
+    /// Format of the metrics file
+    #[arg(long, value_enum, default_value_t = MetricsFormat::Jsonl)]
+    pub metrics_format: MetricsFormat,
+
+    /// Seconds between two samples of the metrics
+    #[arg(long, default_value_t = 5.0)]
+    pub metrics_interval: f64,
 }
 
 /// Newtype string wrapper to overwrite Default with `wty`.
@@ -1,6 +1,8 @@
 //! [`Dictionary`] trait and dictionary build pipeline.
 
 use anyhow::{Context, Ok, Result};
+use memchr::{memchr, memmem::Finder};
+use rayon::{ThreadPool, ThreadPoolBuilder, prelude::*};
 use serde::{Deserialize, Serialize};
 
 use std::{
@@ -9,19 +11,27 @@ use std::{
     fs::File,
     io::{BufRead, BufReader, BufWriter, Write},
     path::PathBuf,
+    sync::LazyLock,
 };
 
 use crate::{
     Map,
     cli::{LangSpecs, Options},
+    dict::metrics::{Phase, Recorder},
     download::find_or_download_jsonl,
     lang::{Edition, Lang},
-    models::{kaikki::WordEntry, yomitan::YomitanDict},
+    models::{
+        kaikki::{ArchivedWordEntry, WordEntry},
+        yomitan::{EntryGroup, YomitanDict},
+    },
     path::PathManager,
 };
 
 const CONSOLE_PRINT_INTERVAL: i32 = 10000;
 
+/// Number of jsonlines deserialized together by the thread pool.
+const BATCH_LINES: usize = 4096;
+
 /// Trait for Intermediate representation.
 ///
 /// Used for postprocessing (merge, etc.) and debugging via snapshots.
@@ -33,6 +43,11 @@ pub trait Intermediate: Default {
 
     /// How to write `Self::I` to disk.
     fn write(&self, pm: &PathManager) -> Result<PathBuf>;
+
+    /// Bytes on the heap, if known. Only used for metrics.
+    fn heap_size(&self) -> Option<usize> {
+        None
+    }
 }
 
 impl<T> Intermediate for Vec<T>
@@ -91,6 +106,16 @@ pub trait Dictionary {
         false
     }
 
+    /// How to read an entry from the database, where it is stored archived.
+    ///
+    /// By default, it is fully deserialized. Dictionaries that only read a few fields should
+    /// only deserialize those (see [`ArchivedWordEntry`]), and can return `None` to skip the
+    /// entry without deserializing anything.
+    #[allow(unused_variables)]
+    fn from_archived(&self, langs: Langs, entry: &ArchivedWordEntry) -> Result<Option<WordEntry>> {
+        Ok(Some(entry.deserialize_all()?))
+    }
+
     /// How to preprocess a [`WordEntry`]. Everything that mutates `entry` should go here.
     #[allow(unused_variables)]
     fn preprocess(&self, langs: Langs, entry: &mut WordEntry, opts: &Options, irs: &mut Self::I) {}
@@ -119,6 +144,14 @@ pub trait Dictionary {
 
     /// How to convert `Self::I` into one or more yomitan entries.
     fn to_yomitan(&self, langs: LangSpecs, irs: &Self::I) -> YomitanDict;
+
+    /// Same as [`Self::to_yomitan`], but entries are made lazily, as they are written.
+    ///
+    /// By default, this goes through [`Self::to_yomitan`]: implement it for dictionaries that
+    /// can be big, so that their entries are never all in memory at the same time.
+    fn to_yomitan_groups<'a>(&self, langs: LangSpecs, irs: &'a Self::I) -> Vec<EntryGroup<'a>> {
+        self.to_yomitan(langs, irs).into_iter_grouped()
+    }
 }
 
 fn rejected(entry: &WordEntry, opts: &Options) -> bool {
@@ -167,19 +200,74 @@ pub(crate) fn iter_datasets(
     })
 }
 
+/// The key read by [`LangCodeProbe`], as written in the jsonlines.
+const LANG_CODE_KEY: &[u8] = b"\"lang_code\"";
+
+static LANG_CODE_FINDER: LazyLock<Finder<'static>> = LazyLock::new(|| Finder::new(LANG_CODE_KEY));
+
+/// Only deserialize the `lang_code` of a jsonline.
 #[derive(Deserialize)]
 #[serde(default)]
-pub(crate) struct LangCodeProbe<'a> {
+pub struct LangCodeProbe<'a> {
     #[serde(borrow)]
     lang_code: Cow<'a, str>,
 }
 
 impl LangCodeProbe<'_> {
+    /// Whether the entry of this jsonline is not in `lang`.
+    ///
+    /// Most lines are rejected by [`Self::surely_other_lang`] without deserializing
+    /// anything. The rest go through [`Self::should_skip_serde`].
     pub fn should_skip(line: &[u8], lang: Lang) -> Result<bool> {
+        if Self::surely_other_lang(line, lang.iso()) {
+            return Ok(true);
+        }
+        Self::should_skip_serde(line, lang)
+    }
+
+    /// Same as [`Self::should_skip`], but always deserializing `lang_code`.
+    pub fn should_skip_serde(line: &[u8], lang: Lang) -> Result<bool> {
         let probe: LangCodeProbe =
             serde_json::from_slice(line).with_context(|| "Error decoding JSON @ probe")?;
         Ok(probe.lang_code != lang.iso())
     }
+
+    /// The language of the entry of this jsonline, if it is one we support.
+    pub fn lang(line: &[u8]) -> Result<Option<Lang>> {
+        let probe: LangCodeProbe =
+            serde_json::from_slice(line).with_context(|| "Error decoding JSON @ probe")?;
+        Ok(probe.lang_code.parse().ok())
+    }
+
+    /// Whether no `"lang_code"` key of the line has `iso` as value, by only looking at
+    /// bytes.
+    ///
+    /// Nested keys (f.e. in translations) are also looked at: we can not tell them
+    /// apart from the top-level one without parsing. So a line is only surely of
+    /// another language if *every* `lang_code` differs from `iso`.
+    ///
+    /// When the key is missing, or some value is not written verbatim as
+    /// `"lang_code": "xx"`, it can not tell and returns false.
+    fn surely_other_lang(line: &[u8], iso: &str) -> bool {
+        let mut found = false;
+
+        for start in LANG_CODE_FINDER.find_iter(line) {
+            let rest = &line[start + LANG_CODE_KEY.len()..];
+            let Some(rest) = rest.strip_prefix(b": \"") else {
+                return false;
+            };
+            let Some(end) = memchr(b'"', rest) else {
+                return false;
+            };
+            let value = &rest[..end];
+            if value == iso.as_bytes() || value.contains(&b'\\') {
+                return false;
+            }
+            found = true;
+        }
+
+        found
+    }
 }
 
 impl Default for LangCodeProbe<'_> {
@@ -190,7 +278,94 @@ impl Default for LangCodeProbe<'_> {
     }
 }
 
+/// A batch of jsonlines, stored contiguously.
+#[derive(Default)]
+pub(crate) struct LineBatch {
+    buf: Vec<u8>,
+    /// End of every line in `buf`.
+    ends: Vec<usize>,
+}
+
+impl LineBatch {
+    /// Replace the batch with the next (at most) `BATCH_LINES` lines of `reader`.
+    ///
+    /// Return false if there was nothing left to read.
+    pub fn fill(&mut self, reader: &mut impl BufRead) -> Result<bool> {
+        self.buf.clear();
+        self.ends.clear();
+        while self.ends.len() < BATCH_LINES {
+            if reader.read_until(b'\n', &mut self.buf)? == 0 {
+                break; // EOF
+            }
+            self.ends.push(self.buf.len());
+        }
+        Ok(!self.ends.is_empty())
+    }
+
+    pub fn line(&self, idx: usize) -> &[u8] {
+        let start = if idx == 0 { 0 } else { self.ends[idx - 1] };
+        &self.buf[start..self.ends[idx]]
+    }
+
+    pub fn lines(&self) -> impl Iterator<Item = &[u8]> {
+        (0..self.ends.len()).map(|idx| self.line(idx))
+    }
+
+    /// Bytes of every line together.
+    pub fn byte_len(&self) -> usize {
+        self.buf.len()
+    }
+
+    /// Apply `f` to every line in parallel. Results are in the same order as the batch.
+    pub fn map<T, F>(&self, f: F) -> Vec<T>
+    where
+        T: Send,
+        F: Fn(&[u8]) -> T + Sync + Send,
+    {
+        (0..self.ends.len())
+            .into_par_iter()
+            .map(|idx| f(self.line(idx)))
+            .collect()
+    }
+
+    /// Deserialize every line in parallel, in the same order as the batch.
+    ///
+    /// Lines skipped by the probe, if any, are None.
+    fn parse(&self, probe: Option<Lang>) -> Vec<Result<Option<WordEntry>>> {
+        self.map(|line| parse_line(line, probe))
+    }
+}
+
+fn parse_line(line: &[u8], probe: Option<Lang>) -> Result<Option<WordEntry>> {
+    if let Some(lang) = probe
+        && LangCodeProbe::should_skip(line, lang)?
+    {
+        return Ok(None);
+    }
+
+    let entry = serde_json::from_slice(line).with_context(|| "Error decoding JSON @ make_dict")?;
+    Ok(Some(entry))
+}
+
+/// [`rayon::join`] in `pool`, or in the global pool if there is none.
+fn join_in<A, B, RA, RB>(pool: Option<&ThreadPool>, oper_a: A, oper_b: B) -> (RA, RB)
+where
+    A: FnOnce() -> RA + Send,
+    B: FnOnce() -> RB + Send,
+    RA: Send,
+    RB: Send,
+{
+    match pool {
+        Some(pool) => pool.join(oper_a, oper_b),
+        None => rayon::join(oper_a, oper_b),
+    }
+}
+
 /// Make a dictionary from a Kaikki jsonlines.
+///
+/// Lines are read in batches: while a batch is probed and deserialized by the thread
+/// pool, the next one is read. Entries are then processed in this thread, in file
+/// order, so that the result does not depend on the number of threads.
 pub fn make_dict_from_jsonl<D: Dictionary>(dict: D, raw_args: D::A) -> Result<()> {
     let pm: &PathManager = &raw_args.try_into()?;
     let (_, source_pm, target_pm) = pm.langs();
@@ -199,8 +374,22 @@ pub fn make_dict_from_jsonl<D: Dictionary>(dict: D, raw_args: D::A) -> Result<()
     pm.setup_dirs()?;
 
     let capacity = 256 * (1 << 10); // default is 8 * (1 << 10) := 8KB
-    let mut line = Vec::with_capacity(1 << 10);
+    // Only build a pool if asked to: the global one already uses every core.
+    let pool = match opts.jobs {
+        0 => None,
+        jobs => Some(ThreadPoolBuilder::new().num_threads(jobs).build()?),
+    };
+    let mut batch = LineBatch::default();
+    let mut next_batch = LineBatch::default();
     let mut irs = D::I::default();
+    let mut recorder = Recorder::new(pm.dict_name_expanded(), opts);
+
+    // This slows down tests, since we pay the deserialization even though we
+    // do not filter any entry.
+    // TODO: at some point we should have a "make_dict" for CLI/release.rs
+    // with a db, and another, without probing, for tests, instead of having
+    // one for release.rs and other for CLI/tests.
+    let probe = dict.supports_probe().then_some(source_pm);
 
     for pair in iter_datasets(pm) {
         let (edition, path_jsonl) = pair?;
@@ -211,52 +400,54 @@ pub fn make_dict_from_jsonl<D: Dictionary>(dict: D, raw_args: D::A) -> Result<()
         let mut line_count = 0;
         let mut accepted_count = 0;
 
-        loop {
-            line.clear();
-            if reader.read_until(b'\n', &mut line)? == 0 {
-                break; // EOF
-            }
-
-            line_count += 1;
-
-            if !opts.quiet && line_count % CONSOLE_PRINT_INTERVAL == 0 {
-                print!("Processed {line_count} lines...\r");
-                std::io::stdout().flush()?;
-            }
-
-            // This slows down tests, since we pay the deserialization even though we
-            // do not filter any entry.
-            // TODO: at some point we should have a "make_dict" for CLI/release.rs
-            // with a db, and another, without probing, for tests, instead of having
-            // one for release.rs and other for CLI/tests.
-            if dict.supports_probe() && LangCodeProbe::should_skip(&line, source_pm)? {
-                continue;
+        let mut has_lines = batch.fill(&mut reader)?;
+        'batches: while has_lines {
+            recorder.count(0, batch.byte_len() as u64, 0);
+            let (entries, has_next) = join_in(
+                pool.as_ref(),
+                || batch.parse(probe),
+                || next_batch.fill(&mut reader),
+            );
+
+            for entry in entries {
+                line_count += 1;
+
+                if !opts.quiet && line_count % CONSOLE_PRINT_INTERVAL == 0 {
+                    print!("Processed {line_count} lines...\r");
+                    std::io::stdout().flush()?;
+                }
+
+                let Some(mut entry) = entry? else {
+                    continue;
+                };
+
+                if rejected(&entry, opts) {
+                    continue;
+                }
+
+                accepted_count += 1;
+                if accepted_count == opts.first {
+                    break 'batches;
+                }
+
+                if dict.skip_if(&entry) {
+                    continue;
+                }
+
+                let langs = Langs {
+                    edition,
+                    source: source_pm,
+                    target: target_pm,
+                };
+
+                dict.preprocess(langs, &mut entry, opts, &mut irs);
+                dict.process(langs, &entry, &mut irs);
+                recorder.count(1, 0, 0);
             }
 
-            let mut entry: WordEntry =
-                serde_json::from_slice(&line).with_context(|| "Error decoding JSON @ make_dict")?;
-
-            if rejected(&entry, opts) {
-                continue;
-            }
-
-            accepted_count += 1;
-            if accepted_count == opts.first {
-                break;
-            }
-
-            if dict.skip_if(&entry) {
-                continue;
-            }
-
-            let langs = Langs {
-                edition,
-                source: source_pm,
-                target: target_pm,
-            };
-
-            dict.preprocess(langs, &mut entry, opts, &mut irs);
-            dict.process(langs, &entry, &mut irs);
+            recorder.tick(&irs)?;
+            std::mem::swap(&mut batch, &mut next_batch);
+            has_lines = has_next?;
         }
 
         if !opts.quiet {
@@ -264,17 +455,65 @@ pub fn make_dict_from_jsonl<D: Dictionary>(dict: D, raw_args: D::A) -> Result<()
         }
     }
 
+    recorder.ingested(&irs)?;
     if !opts.quiet {
         dict.found_ir_message(pm.langs, &irs);
     }
 
     if irs.is_empty() {
+        recorder.finish()?;
         return Ok(());
     }
 
     dict.postprocess(&mut irs);
 
+    recorder.start_phase(Phase::Write);
     opts.format.write(&dict, pm.langs, opts, pm, &irs)?;
+    recorder.finish()?;
 
     Ok(())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn assert_same_probe(line: &str, lang: Lang) {
+        let line = line.as_bytes();
+        assert_eq!(
+            LangCodeProbe::should_skip(line, lang).unwrap(),
+            LangCodeProbe::should_skip_serde(line, lang).unwrap(),
+        );
+    }
+
+    #[test]
+    fn probe_top_level() {
+        let line = r#"{"word": "foo", "lang_code": "de", "pos": "noun"}"#;
+        assert!(LangCodeProbe::surely_other_lang(line.as_bytes(), "en"));
+        assert_same_probe(line, Lang::En);
+        assert_same_probe(line, Lang::De);
+    }
+
+    #[test]
+    fn probe_nested() {
+        // The top-level lang_code is en, and is written after a nested de
+        let line = r#"{"translations": [{"lang_code": "de"}], "lang_code": "en"}"#;
+        assert!(!LangCodeProbe::surely_other_lang(line.as_bytes(), "de"));
+        assert_same_probe(line, Lang::En);
+        assert_same_probe(line, Lang::De);
+        assert_same_probe(line, Lang::Fr);
+    }
+
+    #[test]
+    fn probe_not_verbatim() {
+        for line in [
+            r#"{"lang_code":"de"}"#,
+            r#"{"lang_code": "\u0064e"}"#,
+            r#"{"word": "foo"}"#,
+        ] {
+            assert!(!LangCodeProbe::surely_other_lang(line.as_bytes(), "en"));
+            assert_same_probe(line, Lang::En);
+            assert_same_probe(line, Lang::De);
+        }
+    }
+}
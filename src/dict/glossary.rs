@@ -1,13 +1,17 @@
 //! Glossary and GlossaryExtended dictionaries.
 
+use anyhow::Result;
+
 use crate::{
     Map, Set,
     cli::{GlossaryArgs, GlossaryExtendedArgs, LangSpecs},
     dict::{Dictionary, Langs, main::get_reading},
     lang::{Edition, Lang},
     models::{
-        kaikki::WordEntry,
-        yomitan::{DetailedDefinition, NTag, Node, TermInfo, YomitanDict, wrap},
+        kaikki::{ArchivedWordEntry, WordEntry},
+        yomitan::{
+            DetailedDefinition, EntryGroup, NTag, Node, TermInfo, YomitanDict, YomitanEntry, wrap,
+        },
     },
     tags::{Pos, find_tag_in_bank, localize_tag_info},
 };
@@ -22,6 +26,10 @@ impl Dictionary for DGlossary {
     type A = GlossaryArgs;
     type I = Vec<TermInfo>;
 
+    fn from_archived(&self, langs: Langs, entry: &ArchivedWordEntry) -> Result<Option<WordEntry>> {
+        from_archived_glossary(entry, &[langs.target])
+    }
+
     fn process(&self, langs: Langs, entry: &WordEntry, irs: &mut Self::I) {
         process_glossary(langs.edition, langs.target, entry, irs);
     }
@@ -29,6 +37,13 @@ impl Dictionary for DGlossary {
     fn to_yomitan(&self, _: LangSpecs, irs: &Self::I) -> YomitanDict {
         YomitanDict::new(irs.clone(), vec![], vec![])
     }
+
+    fn to_yomitan_groups<'a>(&self, _: LangSpecs, irs: &'a Self::I) -> Vec<EntryGroup<'a>> {
+        vec![EntryGroup::new(
+            "term",
+            irs.iter().cloned().map(YomitanEntry::TermInfo),
+        )]
+    }
 }
 
 impl Dictionary for DGlossaryExtended {
@@ -39,6 +54,10 @@ impl Dictionary for DGlossaryExtended {
         false
     }
 
+    fn from_archived(&self, langs: Langs, entry: &ArchivedWordEntry) -> Result<Option<WordEntry>> {
+        from_archived_glossary(entry, &[langs.source, langs.target])
+    }
+
     fn process(&self, langs: Langs, entry: &WordEntry, irs: &mut Self::I) {
         process_glossary_extended(langs.edition, langs.source, langs.target, entry, irs);
     }
@@ -68,6 +87,21 @@ impl Dictionary for DGlossaryExtended {
     }
 }
 
+/// Only entries with some non-trivial translation in `langs` are deserialized, and only
+/// their headword and translations.
+fn from_archived_glossary(entry: &ArchivedWordEntry, langs: &[Lang]) -> Result<Option<WordEntry>> {
+    let has_translations = entry.translations.iter().any(|translation| {
+        !translation.word.is_empty()
+            && langs
+                .iter()
+                .any(|lang| translation.lang_code.as_str() == lang.iso())
+    });
+    if !has_translations {
+        return Ok(None);
+    }
+    Ok(Some(entry.deserialize_translations()?))
+}
+
 fn process_glossary(source: Edition, target: Lang, entry: &WordEntry, irs: &mut Vec<TermInfo>) {
     let mut translations: Map<&str, Vec<String>> = Map::default();
     for translation in entry.non_trivial_translations() {
@@ -0,0 +1,66 @@
+//! String interning for the intermediate representations.
+//!
+//! The same words appear in many keys: a lemma is also the uninflected side of all its
+//! forms, forms are often shared by several parts of speech, and most words are their own
+//! reading. Keys (and the tags of the ipa dictionaries) store a [`Sym`] instead, and every
+//! distinct string is stored once in the [`Interner`].
+
+use std::mem::size_of;
+
+use crate::Set;
+
+/// A string interned in an [`Interner`]. Only meaningful for the interner that made it.
+#[derive(Debug, Clone, Copy, Hash, PartialEq, Eq)]
+pub struct Sym(u32);
+
+#[derive(Debug, Default)]
+pub struct Interner(Set<Box<str>>);
+
+impl Interner {
+    pub fn intern(&mut self, string: &str) -> Sym {
+        let idx = match self.0.get_index_of(string) {
+            Some(idx) => idx,
+            None => self.0.insert_full(string.into()).0,
+        };
+        Sym(u32::try_from(idx).expect("less than u32::MAX distinct strings"))
+    }
+
+    pub fn resolve(&self, sym: Sym) -> &str {
+        &self.0[sym.0 as usize]
+    }
+
+    pub fn len(&self) -> usize {
+        self.0.len()
+    }
+
+    pub fn capacity(&self) -> usize {
+        self.0.capacity()
+    }
+
+    pub fn iter(&self) -> impl Iterator<Item = &str> {
+        self.0.iter().map(AsRef::as_ref)
+    }
+
+    /// Bytes on the heap.
+    pub fn heap_size(&self) -> usize {
+        // Every entry is a hash and a Box<str> in the entries, and an index in the table
+        self.capacity() * (2 * size_of::<usize>() + size_of::<Box<str>>())
+            + self.iter().map(str::len).sum::<usize>()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn intern_once() {
+        let mut strings = Interner::default();
+        let run = strings.intern("run");
+        let ran = strings.intern("ran");
+        assert_eq!(strings.intern("run"), run);
+        assert_ne!(run, ran);
+        assert_eq!(strings.resolve(ran), "ran");
+        assert_eq!(strings.len(), 2);
+    }
+}
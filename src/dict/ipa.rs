@@ -1,14 +1,26 @@
 //! Ipa and IpaMerged dictionaries.
 
+use std::{mem::size_of, path::PathBuf};
+
+use anyhow::Result;
+
 use crate::{
     Map,
     cli::{IpaArgs, IpaMergedArgs, LangSpecs},
-    dict::{Dictionary, Langs, main::get_reading},
+    dict::{
+        Dictionary, Intermediate, Langs,
+        intern::{Interner, Sym},
+        main::get_reading,
+    },
     lang::{Edition, Lang},
     models::{
-        kaikki::WordEntry,
-        yomitan::{Ipa, PhoneticTranscription, TermMeta, TermPhoneticTranscription, YomitanDict},
+        kaikki::{ArchivedWordEntry, WordEntry},
+        yomitan::{
+            EntryGroup, Ipa, PhoneticTranscription, TermMeta, TermPhoneticTranscription,
+            YomitanDict, YomitanEntry,
+        },
     },
+    path::PathManager,
     tags::{find_tag_in_bank, localize_tag},
 };
 
@@ -22,12 +34,23 @@ impl Dictionary for DIpa {
     type A = IpaArgs;
     type I = IIpa;
 
+    fn from_archived(&self, _: Langs, entry: &ArchivedWordEntry) -> Result<Option<WordEntry>> {
+        from_archived_ipa(entry)
+    }
+
     fn process(&self, langs: Langs, entry: &WordEntry, irs: &mut Self::I) {
         process_ipa(langs.edition, langs.source, langs.target, entry, irs);
     }
 
     fn to_yomitan(&self, _: LangSpecs, irs: &Self::I) -> YomitanDict {
-        YomitanDict::new(vec![], vec![], to_yomitan_ipa(irs))
+        YomitanDict::new(vec![], vec![], to_yomitan_ipa(irs).collect())
+    }
+
+    fn to_yomitan_groups<'a>(&self, _: LangSpecs, irs: &'a Self::I) -> Vec<EntryGroup<'a>> {
+        vec![EntryGroup::new(
+            "meta",
+            to_yomitan_ipa(irs).map(YomitanEntry::TermMeta),
+        )]
     }
 }
 
@@ -35,6 +58,10 @@ impl Dictionary for DIpaMerged {
     type A = IpaMergedArgs;
     type I = IIpa;
 
+    fn from_archived(&self, _: Langs, entry: &ArchivedWordEntry) -> Result<Option<WordEntry>> {
+        from_archived_ipa(entry)
+    }
+
     fn process(&self, langs: Langs, entry: &WordEntry, irs: &mut Self::I) {
         process_ipa(langs.edition, langs.source, langs.target, entry, irs);
     }
@@ -45,7 +72,14 @@ impl Dictionary for DIpaMerged {
     }
 
     fn to_yomitan(&self, _: LangSpecs, irs: &Self::I) -> YomitanDict {
-        YomitanDict::new(vec![], vec![], to_yomitan_ipa(irs))
+        YomitanDict::new(vec![], vec![], to_yomitan_ipa(irs).collect())
+    }
+
+    fn to_yomitan_groups<'a>(&self, _: LangSpecs, irs: &'a Self::I) -> Vec<EntryGroup<'a>> {
+        vec![EntryGroup::new(
+            "meta",
+            to_yomitan_ipa(irs).map(YomitanEntry::TermMeta),
+        )]
     }
 }
 
@@ -114,8 +148,121 @@ fn get_ipas(entry: &WordEntry) -> Vec<Ipa> {
         .collect()
 }
 
-/// ((lemma, reading), transcription)
-type IIpa = Map<(String, String), Vec<Ipa>>;
+/// Only the headword of entries with some IPA is deserialized.
+fn from_archived_ipa(entry: &ArchivedWordEntry) -> Result<Option<WordEntry>> {
+    if entry.sounds.iter().all(|sound| sound.ipa.is_empty()) {
+        return Ok(None);
+    }
+    Ok(Some(entry.deserialize_headword()?))
+}
+
+/// An [`Ipa`] whose tags are interned in the [`IIpa`] it belongs to.
+#[derive(Debug)]
+struct IpaInfo {
+    ipa: String,
+    tags: Vec<Sym>,
+}
+
+impl IpaInfo {
+    fn resolve(&self, strings: &Interner) -> Ipa {
+        Ipa {
+            ipa: self.ipa.clone(),
+            tags: self
+                .tags
+                .iter()
+                .map(|tag| strings.resolve(*tag).to_string())
+                .collect(),
+        }
+    }
+}
+
+/// ((lemma, reading), transcriptions)
+///
+/// Lemmas, readings and tags are interned: most lemmas are their own reading, and the same
+/// few tags come back in most transcriptions.
+#[derive(Debug, Default)]
+pub struct IIpa {
+    map: Map<(Sym, Sym), Vec<IpaInfo>>,
+    strings: Interner,
+}
+
+impl Intermediate for IIpa {
+    fn len(&self) -> usize {
+        self.map.len()
+    }
+
+    fn write(&self, _: &PathManager) -> Result<PathBuf> {
+        unimplemented!()
+    }
+
+    fn heap_size(&self) -> Option<usize> {
+        let transcriptions: usize = self
+            .map
+            .values()
+            .map(|infos| {
+                infos.capacity() * size_of::<IpaInfo>()
+                    + infos
+                        .iter()
+                        .map(|info| info.ipa.capacity() + info.tags.capacity() * size_of::<Sym>())
+                        .sum::<usize>()
+            })
+            .sum();
+        let map = self.map.capacity() * (size_of::<(Sym, Sym)>() + size_of::<Vec<IpaInfo>>());
+        Some(map + transcriptions + self.strings.heap_size())
+    }
+}
+
+impl IIpa {
+    /// Add the transcriptions of (lemma, reading), merging those that only differ in their
+    /// delimiters.
+    fn insert(&mut self, lemma: &str, reading: &str, ipas: Vec<Ipa>) {
+        let key = (self.strings.intern(lemma), self.strings.intern(reading));
+        let existing = self.map.entry(key).or_default();
+        for ipa in ipas {
+            let tags: Vec<Sym> = ipa
+                .tags
+                .iter()
+                .map(|tag| self.strings.intern(tag))
+                .collect();
+            let inner = ipa_inner(&ipa.ipa);
+            if let Some(existing_ipa) = existing.iter_mut().find(|e| ipa_inner(&e.ipa) == inner) {
+                // Prefer phonetic [X] over phonemic /X/ (more specific)
+                if is_phonetic(&ipa.ipa) {
+                    existing_ipa.ipa = ipa.ipa;
+                }
+                for tag in tags {
+                    if !existing_ipa.tags.contains(&tag) {
+                        existing_ipa.tags.push(tag);
+                    }
+                }
+            } else {
+                existing.push(IpaInfo { ipa: ipa.ipa, tags });
+            }
+        }
+    }
+
+    /// Sort by lemma, then reading.
+    fn sort_unstable_keys(&mut self) {
+        let strings = &self.strings;
+        self.map
+            .sort_unstable_by(|(lemma_a, reading_a), _, (lemma_b, reading_b), _| {
+                let a = (strings.resolve(*lemma_a), strings.resolve(*reading_a));
+                let b = (strings.resolve(*lemma_b), strings.resolve(*reading_b));
+                a.cmp(&b)
+            });
+    }
+
+    /// Iterates over: lemma, reading, transcriptions
+    fn iter(&self) -> impl Iterator<Item = (&str, &str, &Vec<IpaInfo>)> {
+        self.map.iter().map(move |((lemma, reading), infos)| {
+            (
+                self.strings.resolve(*lemma),
+                self.strings.resolve(*reading),
+                infos,
+            )
+        })
+    }
+}
 
 fn process_ipa(edition: Edition, source: Lang, target: Lang, entry: &WordEntry, irs: &mut IIpa) {
     let mut ipas = get_ipas(entry);
@@ -143,45 +290,30 @@ fn process_ipa(edition: Edition, source: Lang, target: Lang, entry: &WordEntry,
     }
 
     let reading = get_reading(edition, source, entry).unwrap_or_else(|| entry.word.clone());
-    let existing = irs.entry((entry.word.clone(), reading)).or_default();
-    for ipa in ipas {
-        let inner = ipa_inner(&ipa.ipa);
-        if let Some(existing_ipa) = existing.iter_mut().find(|e| ipa_inner(&e.ipa) == inner) {
-            // Prefer phonetic [X] over phonemic /X/ (more specific)
-            if is_phonetic(&ipa.ipa) {
-                existing_ipa.ipa = ipa.ipa;
-            }
-            for tag in ipa.tags {
-                if !existing_ipa.tags.contains(&tag) {
-                    existing_ipa.tags.push(tag);
-                }
-            }
-        } else {
-            existing.push(ipa);
-        }
-    }
+    irs.insert(&entry.word, &reading, ipas);
 }
 
-fn to_yomitan_ipa(irs: &IIpa) -> Vec<TermMeta> {
-    irs.into_iter()
-        .map(|((lemma, reading), transcriptions)| {
-            // NOTE: sorting is tricky because the order in Wiktionary may matter, with the first
-            // result being the most relevant (not always, remains to be tested).
-            // This is relevant for X-Y-ipa dicts, for merged X-ipa dicts the order is completely
-            // random, as in it depends on edition iteration order, and therefore sorting is much
-            // more justified.
-            //
-            // transcriptions.sort_unstable_by(|a, b| ipa_inner(&a.ipa).cmp(ipa_inner(&b.ipa)));
-
-            TermMeta::TermPhoneticTranscription(TermPhoneticTranscription::new(
-                lemma.clone(),
-                PhoneticTranscription {
-                    reading: reading.clone(),
-                    transcriptions: transcriptions.clone(),
-                },
-            ))
-        })
-        .collect()
+fn to_yomitan_ipa(irs: &IIpa) -> impl Iterator<Item = TermMeta> {
+    irs.iter().map(move |(lemma, reading, transcriptions)| {
+        // NOTE: sorting is tricky because the order in Wiktionary may matter, with the first
+        // result being the most relevant (not always, remains to be tested).
+        // This is relevant for X-Y-ipa dicts, for merged X-ipa dicts the order is completely
+        // random, as in it depends on edition iteration order, and therefore sorting is much
+        // more justified.
+        //
+        // transcriptions.sort_unstable_by(|a, b| ipa_inner(&a.ipa).cmp(ipa_inner(&b.ipa)));
+
+        TermMeta::TermPhoneticTranscription(TermPhoneticTranscription::new(
+            lemma.to_string(),
+            PhoneticTranscription {
+                reading: reading.to_string(),
+                transcriptions: transcriptions
+                    .iter()
+                    .map(|info| info.resolve(&irs.strings))
+                    .collect(),
+            },
+        ))
+    })
 }
 
 #[cfg(test)]
@@ -190,6 +322,18 @@ mod tests {
 
     use crate::models::kaikki::Sound;
 
+    impl IIpa {
+        /// The transcriptions of every (lemma, reading), with their tags resolved.
+        fn resolved(&self) -> Vec<(&str, &str, Vec<Ipa>)> {
+            self.iter()
+                .map(|(lemma, reading, infos)| {
+                    let ipas = infos.iter().map(|info| info.resolve(&self.strings));
+                    (lemma, reading, ipas.collect())
+                })
+                .collect()
+        }
+    }
+
     impl Sound {
         fn new(ipa: &str) -> Self {
             Self {
@@ -224,7 +368,8 @@ mod tests {
 
         assert_eq!(irs.len(), 1);
 
-        let transcriptions = irs.values().next().unwrap();
+        let resolved = irs.resolved();
+        let transcriptions = &resolved[0].2;
         assert_eq!(transcriptions.len(), 2);
         assert_eq!(&transcriptions[0].ipa, "[ipa1]");
         assert_eq!(&transcriptions[1].ipa, "[ipa2]");
@@ -245,7 +390,8 @@ mod tests {
 
         assert_eq!(irs.len(), 1);
 
-        let transcriptions = irs.values().next().unwrap();
+        let resolved = irs.resolved();
+        let transcriptions = &resolved[0].2;
         assert_eq!(transcriptions.len(), 2);
 
         assert_eq!(&transcriptions[0].ipa, "[ipa1]");
@@ -276,7 +422,8 @@ mod tests {
         entry.sounds = vec![Sound::with_tag("ipa1", "tag2")];
         dict.process(langs, &entry, &mut irs);
 
-        let transcriptions = irs.values().next().unwrap();
+        let resolved = irs.resolved();
+        let transcriptions = &resolved[0].2;
         assert_eq!(transcriptions.len(), 1);
         // Both tags should be present after merging
         assert!(transcriptions[0].tags.contains(&"tag1".to_string()));
@@ -303,7 +450,34 @@ mod tests {
 
         dict.postprocess(&mut irs);
 
-        let keys: Vec<&String> = irs.keys().map(|(word, _)| word).collect();
+        let keys: Vec<&str> = irs.resolved().into_iter().map(|(word, ..)| word).collect();
         assert_eq!(keys, vec!["apple", "zebra"]);
     }
+
+    #[test]
+    fn process_ipa_from_archived() {
+        let dict = DIpa;
+        let langs = Langs::new(Edition::En, Lang::La, Lang::En);
+
+        let mut entry = WordEntry::default();
+        entry.word = "fama".to_string();
+        entry.sounds = vec![Sound::with_tag("/ˈfaː.ma/", "Classical-Latin")];
+        entry.senses = vec![Default::default()];
+        let bytes = rkyv::to_bytes::<rkyv::rancor::Error>(&entry).unwrap();
+        let archived = rkyv::access::<ArchivedWordEntry, rkyv::rancor::Error>(&bytes).unwrap();
+
+        let partial = dict.from_archived(langs, archived).unwrap().unwrap();
+        assert!(partial.senses.is_empty());
+
+        let (mut irs, mut irs_partial) = (IIpa::default(), IIpa::default());
+        dict.process(langs, &entry, &mut irs);
+        dict.process(langs, &partial, &mut irs_partial);
+        assert_eq!(irs_partial.resolved(), irs.resolved());
+
+        // No IPA: skipped before deserializing anything
+        let entry = WordEntry::default();
+        let bytes = rkyv::to_bytes::<rkyv::rancor::Error>(&entry).unwrap();
+        let archived = rkyv::access::<ArchivedWordEntry, rkyv::rancor::Error>(&bytes).unwrap();
+        assert!(dict.from_archived(langs, archived).unwrap().is_none());
+    }
 }
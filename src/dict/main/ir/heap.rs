@@ -34,15 +34,22 @@ impl HeapSize for Pos {
     }
 }
 
+// Interned strings are counted once, in the Interner
 impl HeapSize for LemmaKey {
     fn heap_size(&self) -> usize {
-        self.lemma.heap_size() + self.reading.heap_size() + self.pos.heap_size()
+        0
     }
 }
 
 impl HeapSize for FormKey {
     fn heap_size(&self) -> usize {
-        self.uninflected.heap_size() + self.inflected.heap_size() + self.pos.heap_size()
+        0
+    }
+}
+
+impl HeapSize for Interner {
+    fn heap_size(&self) -> usize {
+        Self::heap_size(self)
     }
 }
 
@@ -111,7 +118,7 @@ impl HeapSize for FormMap {
 
 impl HeapSize for Tidy {
     fn heap_size(&self) -> usize {
-        self.lemma_map.heap_size() + self.form_map.heap_size()
+        self.lemma_map.heap_size() + self.form_map.heap_size() + self.strings.heap_size()
     }
 }
 
@@ -15,7 +15,10 @@ use preprocess_forms::preprocess_forms;
 use crate::{
     Map, Set,
     cli::{LangSpecs, Options},
-    dict::Intermediate,
+    dict::{
+        Intermediate,
+        intern::{Interner, Sym},
+    },
     lang::{Edition, Lang},
     models::kaikki::{Example, Form, HeadTemplate, Sense, Synonym, Tag, WordEntry},
     path::PathManager,
@@ -37,6 +40,8 @@ const MAX_SIZE_OF_EXAMPLE_REFERENCE: usize = 120;
 pub struct Tidy {
     pub lemma_map: LemmaMap, // 56
     pub form_map: FormMap,   // 56
+    /// Strings of the keys of both maps.
+    pub strings: Interner,
 }
 
 impl Intermediate for Tidy {
@@ -47,6 +52,10 @@ impl Intermediate for Tidy {
     fn write(&self, pm: &PathManager) -> Result<PathBuf> {
         self.write(pm)
     }
+
+    fn heap_size(&self) -> Option<usize> {
+        Some(HeapSize::heap_size(self))
+    }
 }
 
 impl Tidy {
@@ -55,7 +64,8 @@ impl Tidy {
     }
 
     fn insert_lemma(&mut self, lemma: &str, reading: &str, pos: &str, entry: LemmaInfo) {
-        self.lemma_map.insert(lemma, reading, pos, entry);
+        self.lemma_map
+            .insert(&mut self.strings, lemma, reading, pos, entry);
     }
 
     fn insert_form(
@@ -67,7 +77,17 @@ impl Tidy {
         tags: Vec<Tag>,
     ) {
         self.form_map
-            .insert(uninflected, inflected, pos, source, tags);
+            .insert(&mut self.strings, uninflected, inflected, pos, source, tags);
+    }
+
+    /// Iterates over: lemma, reading, pos, info
+    pub fn lemmas(&self) -> impl Iterator<Item = (&str, &str, Pos, &LemmaInfo)> {
+        self.lemma_map.flat_iter(&self.strings)
+    }
+
+    /// Iterates over: uninflected, inflected, pos, source, tags
+    pub fn forms(&self) -> impl Iterator<Item = (&str, &str, Pos, &FormSource, &Vec<String>)> {
+        self.form_map.flat_iter(&self.strings)
     }
 
     // NOTE: we write stuff even if irs.attribute is empty
@@ -80,20 +100,22 @@ impl Tidy {
         let file = File::create(&opath)?;
         let writer = BufWriter::new(file);
 
+        let lemmas = self.lemma_map.nested(&self.strings);
         if pm.opts.pretty {
-            serde_json::to_writer_pretty(writer, &self.lemma_map)?;
+            serde_json::to_writer_pretty(writer, &lemmas)?;
         } else {
-            serde_json::to_writer(writer, &self.lemma_map)?;
+            serde_json::to_writer(writer, &lemmas)?;
         }
 
         let opath = pm.path_forms();
         let file = File::create(&opath)?;
         let writer = BufWriter::new(file);
 
+        let forms = self.form_map.nested(&self.strings);
         if pm.opts.pretty {
-            serde_json::to_writer_pretty(writer, &self.form_map)?;
+            serde_json::to_writer_pretty(writer, &forms)?;
         } else {
-            serde_json::to_writer(writer, &self.form_map)?;
+            serde_json::to_writer(writer, &forms)?;
         }
 
         Ok(dir_tidy)
@@ -120,15 +142,10 @@ fn check_orphaned_redirects(irs: &mut Tidy) {
     let mut orphaned_count = 0;
     let total = irs.form_map.len();
 
-    let lemmas_found: Set<_> = irs
-        .lemma_map
-        .0
-        .iter()
-        .map(|(key, _)| key.lemma.as_str())
-        .collect();
+    let lemmas_found: Set<Sym> = irs.lemma_map.0.keys().map(|key| key.lemma).collect();
 
-    for (uninfl, _, _, _, _) in irs.form_map.flat_iter() {
-        if !lemmas_found.contains(uninfl) {
+    for key in irs.form_map.0.keys() {
+        if !lemmas_found.contains(&key.uninflected) {
             // tracing::debug!("{:?} does not exist as lemma", uninfl);
             orphaned_count += 1;
         }
@@ -151,11 +168,14 @@ pub(crate) fn found_ir_message_impl(langs: LangSpecs, irs: &Tidy) {
         "mismatch in form counts"
     );
 
+    let n_strings = irs.strings.len();
     let lemma_heap = irs.lemma_map.heap_size() as f64;
     let form_heap = irs.form_map.heap_size() as f64;
-    let irs_heap = lemma_heap + form_heap;
+    let strings_heap = irs.strings.heap_size() as f64;
+    let irs_heap = lemma_heap + form_heap + strings_heap;
     let lemma_heap_msg = human_size(lemma_heap);
     let form_heap_msg = human_size(form_heap);
+    let strings_heap_msg = human_size(strings_heap);
     let irs_heap_msg = human_size(irs_heap);
 
     const MB: f64 = 1024.0 * 1024.0;
@@ -169,13 +189,14 @@ pub(crate) fn found_ir_message_impl(langs: LangSpecs, irs: &Tidy) {
         );
         tracing::debug!("├─ terms: {} ({})", n_lemmas, lemma_heap_msg,);
         tracing::debug!(
-            "└─ forms: {} ({}) [infl {}, extr {}, alt {}]",
+            "├─ forms: {} ({}) [infl {}, extr {}, alt {}]",
             n_forms,
             form_heap_msg,
             n_forms_inflection,
             n_forms_extracted,
             n_forms_alt_of,
         );
+        tracing::debug!("└─ strings: {} ({})", n_strings, strings_heap_msg);
     } else {
         tracing::debug!(
             "Found {n_irs} irs: {n_lemmas} terms, {n_forms} forms \
@@ -184,35 +205,47 @@ pub(crate) fn found_ir_message_impl(langs: LangSpecs, irs: &Tidy) {
     }
 }
 
-#[derive(Debug, Clone, Hash, PartialEq, Eq)]
+#[derive(Debug, Clone, Copy, Hash, PartialEq, Eq)]
 struct LemmaKey {
-    lemma: String,
-    reading: String,
+    lemma: Sym,
+    reading: Sym,
     pos: Pos,
 }
 
 impl LemmaKey {
-    fn new(lemma: &str, reading: &str, pos: Pos) -> Self {
+    fn new(strings: &mut Interner, lemma: &str, reading: &str, pos: Pos) -> Self {
         Self {
-            lemma: lemma.into(),
-            reading: reading.into(),
+            lemma: strings.intern(lemma),
+            reading: strings.intern(reading),
             pos,
         }
     }
 
-    fn unpack(&self) -> (&str, &str, Pos) {
-        (&self.lemma, &self.reading, self.pos)
+    fn unpack(self, strings: &Interner) -> (&str, &str, Pos) {
+        (
+            strings.resolve(self.lemma),
+            strings.resolve(self.reading),
+            self.pos,
+        )
     }
 }
 
+/// Keys are interned in the [`Interner`] of the [`Tidy`] they belong to.
 #[derive(Debug, Default)]
 pub struct LemmaMap(Map<LemmaKey, Vec<LemmaInfo>>);
 
 impl LemmaMap {
-    fn insert(&mut self, lemma: &str, reading: &str, pos: &str, entry: LemmaInfo) {
+    fn insert(
+        &mut self,
+        strings: &mut Interner,
+        lemma: &str,
+        reading: &str,
+        pos: &str,
+        entry: LemmaInfo,
+    ) {
         debug_assert!(!entry.gloss_tree.is_empty());
 
-        let key = LemmaKey::new(lemma, reading, Pos::from(pos));
+        let key = LemmaKey::new(strings, lemma, reading, Pos::from(pos));
 
         match self.0.entry(key) {
             Entry::Vacant(e) => {
@@ -225,18 +258,18 @@ impl LemmaMap {
     }
 }
 
-// We only serialize for debugging in the testsuite, so having this tmp nested is easy to write and
-// has no overhead when building the dictionary without --save-temps. This way, we avoid storing
-// nested structures that are less performant (both for cache locality, and number of lookups).
-impl Serialize for LemmaMap {
-    fn serialize<S>(&self, serializer: S) -> Result<S::Ok, S::Error>
-    where
-        S: serde::Serializer,
-    {
-        let mut nested: Map<&str, Map<&str, Map<Pos, &Vec<LemmaInfo>>>> = Map::default();
+type NestedLemmas<'a> = Map<&'a str, Map<&'a str, Map<Pos, &'a Vec<LemmaInfo>>>>;
+
+impl LemmaMap {
+    // We only serialize for debugging in the testsuite, so having this tmp nested is easy to
+    // write and has no overhead when building the dictionary without --save-temps. This way, we
+    // avoid storing nested structures that are less performant (both for cache locality, and
+    // number of lookups).
+    fn nested<'a>(&'a self, strings: &'a Interner) -> NestedLemmas<'a> {
+        let mut nested = NestedLemmas::default();
 
         for (key, infos) in &self.0 {
-            let (lemma, reading, pos) = key.unpack();
+            let (lemma, reading, pos) = key.unpack(strings);
             nested
                 .entry(lemma)
                 .or_default()
@@ -245,17 +278,16 @@ impl Serialize for LemmaMap {
                 .insert(pos, infos);
         }
 
-        nested.serialize(serializer)
+        nested
     }
-}
 
-impl LemmaMap {
-    pub fn flat_iter(&self) -> impl Iterator<Item = (&str, &str, Pos, &LemmaInfo)> {
-        self.0.iter().flat_map(|(key, infos)| {
-            infos.iter().map(move |info| {
-                let (lemma, reading, pos) = key.unpack();
-                (lemma, reading, pos, info)
-            })
+    fn flat_iter<'a>(
+        &'a self,
+        strings: &'a Interner,
+    ) -> impl Iterator<Item = (&'a str, &'a str, Pos, &'a LemmaInfo)> {
+        self.0.iter().flat_map(move |(key, infos)| {
+            let (lemma, reading, pos) = key.unpack(strings);
+            infos.iter().map(move |info| (lemma, reading, pos, info))
         })
     }
 
@@ -264,33 +296,39 @@ impl LemmaMap {
     }
 }
 
-#[derive(Debug, Clone, Hash, PartialEq, Eq)]
+#[derive(Debug, Clone, Copy, Hash, PartialEq, Eq)]
 pub struct FormKey {
-    uninflected: String,
-    inflected: String,
+    uninflected: Sym,
+    inflected: Sym,
     pos: Pos,
 }
 
 impl FormKey {
-    fn new(uninflected: &str, inflected: &str, pos: Pos) -> Self {
+    fn new(strings: &mut Interner, uninflected: &str, inflected: &str, pos: Pos) -> Self {
         Self {
-            uninflected: uninflected.into(),
-            inflected: inflected.into(),
+            uninflected: strings.intern(uninflected),
+            inflected: strings.intern(inflected),
             pos,
         }
     }
 
-    fn unpack(&self) -> (&str, &str, Pos) {
-        (self.uninflected.as_str(), self.inflected.as_str(), self.pos)
+    fn unpack(self, strings: &Interner) -> (&str, &str, Pos) {
+        (
+            strings.resolve(self.uninflected),
+            strings.resolve(self.inflected),
+            self.pos,
+        )
     }
 }
 
+/// Keys are interned in the [`Interner`] of the [`Tidy`] they belong to.
 #[derive(Debug, Default)]
 pub struct FormMap(Map<FormKey, (FormSource, Vec<String>)>);
 
 impl FormMap {
     fn insert(
         &mut self,
+        strings: &mut Interner,
         uninflected: &str,
         inflected: &str,
         pos: &str,
@@ -306,7 +344,7 @@ impl FormMap {
             return;
         }
 
-        let key = FormKey::new(uninflected, inflected, Pos::from(pos));
+        let key = FormKey::new(strings, uninflected, inflected, Pos::from(pos));
 
         match self.0.entry(key) {
             Entry::Vacant(e) => {
@@ -319,19 +357,15 @@ impl FormMap {
     }
 }
 
-// We only serialize for debugging in the testsuite, so having this tmp nested is easy to write and
-// has no overhead when building the dictionary without --save-temps. This way, we avoid storing
-// nested structures that are less performant (both for cache locality, and number of lookups).
-impl Serialize for FormMap {
-    fn serialize<S>(&self, serializer: S) -> Result<S::Ok, S::Error>
-    where
-        S: serde::Serializer,
-    {
-        #[expect(clippy::type_complexity)]
-        let mut nested: Map<&str, Map<&str, Map<Pos, &(FormSource, Vec<String>)>>> = Map::default();
+type NestedForms<'a> = Map<&'a str, Map<&'a str, Map<Pos, &'a (FormSource, Vec<String>)>>>;
+
+impl FormMap {
+    // Same as LemmaMap::nested
+    fn nested<'a>(&'a self, strings: &'a Interner) -> NestedForms<'a> {
+        let mut nested = NestedForms::default();
 
         for (key, infos) in &self.0 {
-            let (uninflected, inflected, pos) = key.unpack();
+            let (uninflected, inflected, pos) = key.unpack(strings);
             nested
                 .entry(uninflected)
                 .or_default()
@@ -340,37 +374,30 @@ impl Serialize for FormMap {
                 .insert(pos, infos);
         }
 
-        nested.serialize(serializer)
+        nested
     }
-}
 
-impl FormMap {
     /// Iterates over: uninflected, inflected, pos, source, tags
-    pub fn flat_iter(&self) -> impl Iterator<Item = (&str, &str, Pos, &FormSource, &Vec<String>)> {
-        self.0.iter().map(|(key, (source, tags))| {
-            let (uninflected, inflected, pos) = key.unpack();
+    fn flat_iter<'a>(
+        &'a self,
+        strings: &'a Interner,
+    ) -> impl Iterator<Item = (&'a str, &'a str, Pos, &'a FormSource, &'a Vec<String>)> {
+        self.0.iter().map(move |(key, (source, tags))| {
+            let (uninflected, inflected, pos) = key.unpack(strings);
             (uninflected, inflected, pos, source, tags)
         })
     }
 
-    /// Iterates over: uninflected, inflected, pos, source, tags
-    pub fn flat_iter_mut(
-        &mut self,
-    ) -> impl Iterator<Item = (&str, &str, Pos, &mut FormSource, &mut Vec<String>)> {
-        self.0.iter_mut().map(|(key, (source, tags))| {
-            let (uninflected, inflected, pos) = key.unpack();
-            (uninflected, inflected, pos, source, tags)
-        })
+    fn tags_mut(&mut self) -> impl Iterator<Item = &mut Vec<String>> {
+        self.0.values_mut().map(|(_, tags)| tags)
     }
 
     fn len(&self) -> usize {
-        self.flat_iter().count()
+        self.0.len()
     }
 
     fn len_of(&self, source: FormSource) -> usize {
-        self.flat_iter()
-            .filter(|(_, _, _, src, _)| **src == source)
-            .count()
+        self.0.values().filter(|(src, _)| *src == source).count()
     }
 
     fn len_extracted(&self) -> usize {
@@ -447,7 +474,7 @@ pub struct GlossInfo {
 }
 
 fn postprocess_forms(form_map: &mut FormMap) {
-    for (_, _, _, _, tags) in form_map.flat_iter_mut() {
+    for tags in form_map.tags_mut() {
         // Keep only unique tags and remove tags subsets
         remove_redundant_tags(tags);
 
@@ -498,9 +525,11 @@ pub(crate) fn process_main(edition: Edition, source: Lang, entry: &WordEntry, ir
 /// Whether we should completely skip this entry.
 ///
 /// The function is trivial at the moment and only relevant for the [ja-en] dict.
-pub(crate) fn should_skip_entry(entry: &WordEntry) -> bool {
+///
+/// It only reads the pos, so that it can also be checked on archived entries.
+pub(crate) fn should_skip_entry(pos: &str) -> bool {
     // https://en.wiktionary.org/wiki/toraware#Japanese
-    entry.pos == "romanization"
+    pos == "romanization"
 }
 
 // Everything that mutates entry
@@ -6,10 +6,15 @@ mod yomitan;
 
 pub use ir::get_reading;
 
+use anyhow::Result;
+
 use crate::{
     cli::{LangSpecs, MainArgs, Options},
     dict::{Dictionary, Langs},
-    models::{kaikki::WordEntry, yomitan::YomitanDict},
+    models::{
+        kaikki::{ArchivedWordEntry, WordEntry},
+        yomitan::{EntryGroup, YomitanDict},
+    },
 };
 
 #[derive(Debug, Clone, Copy)]
@@ -19,8 +24,16 @@ impl Dictionary for DMain {
     type I = ir::Tidy;
     type A = MainArgs;
 
+    // Preprocessing touches almost every field, so everything is deserialized
+    fn from_archived(&self, _: Langs, entry: &ArchivedWordEntry) -> Result<Option<WordEntry>> {
+        if ir::should_skip_entry(entry.pos.as_str()) {
+            return Ok(None);
+        }
+        Ok(Some(entry.deserialize_all()?))
+    }
+
     fn skip_if(&self, entry: &WordEntry) -> bool {
-        ir::should_skip_entry(entry)
+        ir::should_skip_entry(&entry.pos)
     }
 
     fn preprocess(&self, langs: Langs, entry: &mut WordEntry, opts: &Options, irs: &mut Self::I) {
@@ -42,4 +55,8 @@ impl Dictionary for DMain {
     fn to_yomitan(&self, langs: LangSpecs, irs: &Self::I) -> YomitanDict {
         yomitan::to_yomitan_impl(langs, irs)
     }
+
+    fn to_yomitan_groups<'a>(&self, langs: LangSpecs, irs: &'a Self::I) -> Vec<EntryGroup<'a>> {
+        yomitan::to_yomitan_groups_impl(langs, irs)
+    }
 }
@@ -4,7 +4,7 @@ use crate::{
     Set,
     cli::LangSpecs,
     dict::main::{
-        ir::{FormMap, GlossTree, LemmaInfo, LemmaMap, Tidy, normalize_orthography},
+        ir::{GlossTree, LemmaInfo, Tidy, normalize_orthography},
         locale::{
             localize_etymology_string, localize_examples_string, localize_grammar_string,
             localize_synonyms_string,
@@ -14,25 +14,37 @@ use crate::{
     models::{
         kaikki::{Example, Offset, Synonym, Tag},
         yomitan::{
-            BacklinkContent, BacklinkContentKind, DetailedDefinition, GenericNode, NTag, Node,
-            NodeData, NodeDataKey, TagInfo, TermInfo, TermInfoForm, YomitanDict, wrap,
+            BacklinkContent, BacklinkContentKind, DetailedDefinition, EntryGroup, GenericNode,
+            NTag, Node, NodeData, NodeDataKey, TagInfo, TermInfo, TermInfoForm, YomitanDict,
+            YomitanEntry, wrap,
         },
     },
     tags::{Pos, find_tag_in_bank, localize_tag, localize_tag_info},
 };
 
 pub fn to_yomitan_impl(langs: LangSpecs, irs: &Tidy) -> YomitanDict {
-    let term_info = to_yomitan_lemmas(langs.target, &irs.lemma_map);
-    let term_info_form = to_yomitan_forms(langs.source, &irs.form_map);
+    let term_info = to_yomitan_lemmas(langs.target, irs).collect();
+    let term_info_form = to_yomitan_forms(langs.source, irs).collect();
     YomitanDict::new(term_info, term_info_form, vec![])
 }
 
-#[tracing::instrument(skip_all, level = "trace")]
-fn to_yomitan_lemmas(target: Lang, lemma_map: &LemmaMap) -> Vec<TermInfo> {
-    lemma_map
-        .flat_iter()
+/// Same as [`to_yomitan_impl`], but entries are only made as they are consumed.
+pub fn to_yomitan_groups_impl(langs: LangSpecs, irs: &Tidy) -> Vec<EntryGroup<'_>> {
+    vec![
+        EntryGroup::new(
+            "term",
+            to_yomitan_lemmas(langs.target, irs).map(YomitanEntry::TermInfo),
+        ),
+        EntryGroup::new(
+            "form",
+            to_yomitan_forms(langs.source, irs).map(YomitanEntry::TermInfoForm),
+        ),
+    ]
+}
+
+fn to_yomitan_lemmas(target: Lang, irs: &Tidy) -> impl Iterator<Item = TermInfo> {
+    irs.lemmas()
         .map(move |(lemma, reading, pos, info)| to_yomitan_lemma(target, lemma, reading, pos, info))
-        .collect()
 }
 
 fn to_yomitan_lemma(
@@ -459,9 +471,8 @@ fn sanitize_offsets(offsets: &[Offset], upto: usize) -> Vec<Offset> {
 }
 
 #[tracing::instrument(skip_all, level = "trace")]
-fn to_yomitan_forms(source: Lang, form_map: &FormMap) -> Vec<TermInfoForm> {
-    form_map
-        .flat_iter()
+fn to_yomitan_forms(source: Lang, irs: &Tidy) -> impl Iterator<Item = TermInfoForm> {
+    irs.forms()
         .map(move |(uninflected, inflected, pos, _, tags)| {
             // There needs to be DetailedDefinition per tag because yomitan reads
             // multiple tags in a single Inflection as a causal inflection chain.
@@ -488,7 +499,6 @@ fn to_yomitan_forms(source: Lang, form_map: &FormMap) -> Vec<TermInfoForm> {
                 deinflection_definitions,
             )
         })
-        .collect()
 }
 
 #[cfg(test)]
@@ -0,0 +1,398 @@
+//! Memory and throughput of the making of a dictionary.
+//!
+//! A [`Recorder`] counts the entries, bytes and rows read while making a dictionary, times its
+//! phases, and measures the heap of its intermediate representation. With `--metrics`, it is
+//! also sampled every `--metrics-interval` seconds, either as JSON lines appended to the file
+//! (one per sample, and a last one with the summary), or as a Prometheus text file, rewritten
+//! at every sample.
+//!
+//! Writing is a single streaming phase: entries are converted, serialized and zipped bank by
+//! bank, so the three cannot be timed apart.
+
+use std::{
+    collections::BTreeMap,
+    fmt::Write as _,
+    fs::{self, File, OpenOptions},
+    io::{BufWriter, Write},
+    path::{Path, PathBuf},
+    time::{Duration, Instant},
+};
+
+use anyhow::{Ok, Result};
+use clap::ValueEnum;
+use serde::{Deserialize, Serialize};
+
+use crate::{cli::Options, dict::Intermediate};
+
+#[derive(ValueEnum, Debug, Default, Clone, Copy)]
+pub enum MetricsFormat {
+    // One json per sample
+    #[default]
+    Jsonl,
+    // Prometheus text exposition format, rewritten at every sample
+    Prometheus,
+}
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq, PartialOrd, Ord, Serialize, Deserialize)]
+#[serde(rename_all = "lowercase")]
+pub enum Phase {
+    /// Reading entries into the intermediate representation.
+    Ingest,
+    Postprocess,
+    /// Converting, serializing and zipping.
+    Write,
+}
+
+impl Phase {
+    const fn as_str(self) -> &'static str {
+        match self {
+            Self::Ingest => "ingest",
+            Self::Postprocess => "postprocess",
+            Self::Write => "write",
+        }
+    }
+}
+
+/// Totals of the making of a dictionary.
+#[derive(Debug, Clone, Default, PartialEq, Eq, Serialize, Deserialize)]
+pub struct DictMetrics {
+    /// Entries that made it into the intermediate representation.
+    pub entries: u64,
+    /// Bytes of jsonlines, or of archived entries, read.
+    pub bytes_read: u64,
+    /// Rows fetched from the database.
+    pub rows: u64,
+    /// Heap of the intermediate representation once every entry is in, if known.
+    pub ir_heap: Option<u64>,
+    /// Duration of every phase, in ms.
+    pub phases: BTreeMap<Phase, u128>,
+}
+
+#[derive(Serialize)]
+struct Sample<'a> {
+    dict: &'a str,
+    elapsed_ms: u128,
+    phase: Phase,
+    entries: u64,
+    entries_per_s: f64,
+    bytes_read: u64,
+    bytes_per_s: f64,
+    rows: u64,
+    rows_per_s: f64,
+    ir_heap: Option<u64>,
+}
+
+#[derive(Serialize)]
+struct Summary<'a> {
+    dict: &'a str,
+    elapsed_ms: u128,
+    summary: &'a DictMetrics,
+}
+
+/// Where, and how, samples are written.
+struct Output {
+    path: PathBuf,
+    format: MetricsFormat,
+    interval: Duration,
+    /// Only for json lines, opened at the first sample.
+    jsonl: Option<BufWriter<File>>,
+}
+
+/// Metrics of the dictionary being made.
+pub struct Recorder {
+    dict: String,
+    output: Option<Output>,
+    start: Instant,
+    phase: Phase,
+    phase_start: Instant,
+    /// Counters and time of the last sample, to compute rates over the last interval.
+    last: (DictMetrics, Instant),
+    metrics: DictMetrics,
+}
+
+impl Recorder {
+    /// Start recording the ingest phase of `dict`, f.e. `wty-de-en`.
+    pub fn new(dict: String, opts: &Options) -> Self {
+        let output = opts.metrics.as_ref().map(|path| Output {
+            path: path.clone(),
+            format: opts.metrics_format,
+            interval: Duration::from_secs_f64(opts.metrics_interval.max(0.0)),
+            jsonl: None,
+        });
+        let now = Instant::now();
+        Self {
+            dict,
+            output,
+            start: now,
+            phase: Phase::Ingest,
+            phase_start: now,
+            last: (DictMetrics::default(), now),
+            metrics: DictMetrics::default(),
+        }
+    }
+
+    pub fn count(&mut self, entries: u64, bytes_read: u64, rows: u64) {
+        self.metrics.entries += entries;
+        self.metrics.bytes_read += bytes_read;
+        self.metrics.rows += rows;
+    }
+
+    /// Write a sample if the interval elapsed since the last one.
+    ///
+    /// Measuring the heap walks the whole intermediate representation: it is only done here,
+    /// at the interval, and at the end of ingest.
+    pub fn tick(&mut self, irs: &impl Intermediate) -> Result<()> {
+        let Some(output) = &self.output else {
+            return Ok(());
+        };
+        if self.last.1.elapsed() < output.interval {
+            return Ok(());
+        }
+        let ir_heap = irs.heap_size().map(|size| size as u64);
+        self.sample(ir_heap)
+    }
+
+    /// End the ingest phase, and measure the intermediate representation.
+    pub fn ingested(&mut self, irs: &impl Intermediate) -> Result<()> {
+        self.metrics.ir_heap = irs.heap_size().map(|size| size as u64);
+        self.start_phase(Phase::Postprocess);
+        if self.output.is_some() {
+            self.sample(self.metrics.ir_heap)?;
+        }
+        Ok(())
+    }
+
+    /// End the current phase and start `phase`.
+    pub fn start_phase(&mut self, phase: Phase) {
+        let now = Instant::now();
+        let elapsed = now.duration_since(self.phase_start).as_millis();
+        *self.metrics.phases.entry(self.phase).or_default() += elapsed;
+        self.phase = phase;
+        self.phase_start = now;
+    }
+
+    /// End the current phase, and write the summary.
+    pub fn finish(mut self) -> Result<DictMetrics> {
+        self.start_phase(self.phase);
+        let elapsed_ms = self.start.elapsed().as_millis();
+
+        if let Some(output) = &mut self.output {
+            match output.format {
+                MetricsFormat::Jsonl => {
+                    let summary = Summary {
+                        dict: &self.dict,
+                        elapsed_ms,
+                        summary: &self.metrics,
+                    };
+                    let writer = output.jsonl(&summary)?;
+                    writer.flush()?;
+                }
+                MetricsFormat::Prometheus => {
+                    let text = prometheus(&self.dict, &self.metrics, (0.0, 0.0, 0.0));
+                    write_atomic(&output.path, &text)?;
+                }
+            }
+        }
+
+        tracing::debug!("[{}] {:?} in {elapsed_ms}ms", self.dict, self.metrics);
+        Ok(self.metrics)
+    }
+
+    fn sample(&mut self, ir_heap: Option<u64>) -> Result<()> {
+        let Some(output) = &mut self.output else {
+            return Ok(());
+        };
+
+        let now = Instant::now();
+        let (last, last_time) = &self.last;
+        let secs = now
+            .duration_since(*last_time)
+            .as_secs_f64()
+            .max(f64::EPSILON);
+        let rate = |current: u64, last: u64| (current - last) as f64 / secs;
+        let metrics = &self.metrics;
+        let rates = (
+            rate(metrics.entries, last.entries),
+            rate(metrics.bytes_read, last.bytes_read),
+            rate(metrics.rows, last.rows),
+        );
+
+        match output.format {
+            MetricsFormat::Jsonl => {
+                let sample = Sample {
+                    dict: &self.dict,
+                    elapsed_ms: now.duration_since(self.start).as_millis(),
+                    phase: self.phase,
+                    entries: metrics.entries,
+                    entries_per_s: rates.0,
+                    bytes_read: metrics.bytes_read,
+                    bytes_per_s: rates.1,
+                    rows: metrics.rows,
+                    rows_per_s: rates.2,
+                    ir_heap,
+                };
+                output.jsonl(&sample)?;
+            }
+            MetricsFormat::Prometheus => {
+                let mut current = metrics.clone();
+                // Include the phase in progress
+                *current.phases.entry(self.phase).or_default() +=
+                    now.duration_since(self.phase_start).as_millis();
+                current.ir_heap = ir_heap;
+                write_atomic(&output.path, &prometheus(&self.dict, &current, rates))?;
+            }
+        }
+
+        self.last = (self.metrics.clone(), now);
+        Ok(())
+    }
+}
+
+impl Output {
+    /// Append `value` as a json line.
+    fn jsonl(&mut self, value: &impl Serialize) -> Result<&mut BufWriter<File>> {
+        if self.jsonl.is_none() {
+            let file = OpenOptions::new()
+                .create(true)
+                .append(true)
+                .open(&self.path)?;
+            self.jsonl = Some(BufWriter::new(file));
+        }
+        let writer = self.jsonl.as_mut().expect("opened above");
+        serde_json::to_writer(&mut *writer, value)?;
+        writer.write_all(b"\n")?;
+        Ok(writer)
+    }
+}
+
+/// Rewrite `path`, so that scrapers never read it half written.
+fn write_atomic(path: &Path, text: &str) -> Result<()> {
+    let path_tmp = path.with_extension("tmp");
+    fs::write(&path_tmp, text)?;
+    fs::rename(path_tmp, path)?;
+    Ok(())
+}
+
+/// Prometheus text exposition of `metrics`, with `rates` of entries, bytes and rows per
+/// second over the last interval.
+fn prometheus(dict: &str, metrics: &DictMetrics, rates: (f64, f64, f64)) -> String {
+    let mut text = String::new();
+    let mut metric = |name: &str, ty: &str, help: &str, values: &[(Option<Phase>, f64)]| {
+        let _ = writeln!(text, "# HELP wty_{name} {help}");
+        let _ = writeln!(text, "# TYPE wty_{name} {ty}");
+        for (phase, value) in values {
+            let _ = match phase {
+                Some(phase) => writeln!(
+                    text,
+                    "wty_{name}{{dict=\"{dict}\",phase=\"{}\"}} {value}",
+                    phase.as_str()
+                ),
+                None => writeln!(text, "wty_{name}{{dict=\"{dict}\"}} {value}"),
+            };
+        }
+    };
+
+    metric(
+        "entries_total",
+        "counter",
+        "Entries in the intermediate representation.",
+        &[(None, metrics.entries as f64)],
+    );
+    metric(
+        "bytes_read_total",
+        "counter",
+        "Bytes of jsonlines or archived entries read.",
+        &[(None, metrics.bytes_read as f64)],
+    );
+    metric(
+        "rows_total",
+        "counter",
+        "Rows fetched from the database.",
+        &[(None, metrics.rows as f64)],
+    );
+    metric(
+        "entries_per_second",
+        "gauge",
+        "Entries per second over the last interval.",
+        &[(None, rates.0)],
+    );
+    metric(
+        "bytes_read_per_second",
+        "gauge",
+        "Bytes read per second over the last interval.",
+        &[(None, rates.1)],
+    );
+    metric(
+        "rows_per_second",
+        "gauge",
+        "Rows fetched per second over the last interval.",
+        &[(None, rates.2)],
+    );
+    if let Some(ir_heap) = metrics.ir_heap {
+        metric(
+            "ir_heap_bytes",
+            "gauge",
+            "Heap of the intermediate representation.",
+            &[(None, ir_heap as f64)],
+        );
+    }
+    let phases: Vec<_> = metrics
+        .phases
+        .iter()
+        .map(|(phase, ms)| (Some(*phase), *ms as f64 / 1000.0))
+        .collect();
+    metric(
+        "phase_seconds",
+        "gauge",
+        "Duration of every phase.",
+        &phases,
+    );
+
+    text
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn recorder_samples_and_sums_up() {
+        let path = std::env::temp_dir().join(format!("wty-metrics-{}.jsonl", std::process::id()));
+        let _ = fs::remove_file(&path);
+        let opts = Options {
+            metrics: Some(path.clone()),
+            ..Default::default()
+        };
+
+        let irs: Vec<u8> = Vec::new();
+        let mut recorder = Recorder::new("wty-de-en".to_string(), &opts);
+        recorder.count(2, 100, 3);
+        recorder.tick(&irs).unwrap();
+        recorder.ingested(&irs).unwrap();
+        recorder.start_phase(Phase::Write);
+        let metrics = recorder.finish().unwrap();
+
+        assert_eq!(
+            (metrics.entries, metrics.bytes_read, metrics.rows),
+            (2, 100, 3)
+        );
+        let phases: Vec<_> = metrics.phases.keys().copied().collect();
+        assert_eq!(phases, [Phase::Ingest, Phase::Postprocess, Phase::Write]);
+
+        // A sample at the first tick (the interval is zero), one at the end of ingest, and
+        // the summary
+        let lines = fs::read_to_string(&path).unwrap();
+        let lines: Vec<serde_json::Value> = lines
+            .lines()
+            .map(|line| serde_json::from_str(line).unwrap())
+            .collect();
+        fs::remove_file(&path).unwrap();
+        assert_eq!(lines.len(), 3);
+        assert_eq!(lines[0]["entries"], 2);
+        assert_eq!(lines[2]["summary"]["rows"], 3);
+
+        let text = prometheus("wty-de-en", &metrics, (1.0, 2.0, 3.0));
+        assert!(text.contains("wty_rows_total{dict=\"wty-de-en\"} 3\n"));
+        assert!(text.contains("wty_phase_seconds{dict=\"wty-de-en\",phase=\"write\"}"));
+    }
+}
@@ -3,20 +3,24 @@
 mod core;
 mod glossary;
 mod index;
+mod intern;
 mod ipa;
 mod main;
+mod metrics;
 mod release;
 mod scan;
 mod writer;
 
-pub use core::{Dictionary, Intermediate, Langs, make_dict_from_jsonl};
-use core::{LangCodeProbe, iter_datasets};
+pub(crate) use core::LineBatch;
+pub use core::{Dictionary, Intermediate, LangCodeProbe, Langs, make_dict_from_jsonl};
 
 // Dictionary types
 pub use glossary::{DGlossary, DGlossaryExtended};
 pub use ipa::{DIpa, DIpaMerged};
 pub use main::DMain;
 
+pub use metrics::MetricsFormat;
+
 pub use release::{make_dict_from_db, release};
 pub use scan::scan;
 pub use writer::WriterFormat;
@@ -1,16 +1,187 @@
 use std::{
     collections::HashSet,
-    fs::File,
-    io::{BufRead, BufReader},
+    fmt, fs,
     path::{Path, PathBuf},
-    time::Instant,
+    str::FromStr,
+    sync::mpsc::sync_channel,
+    thread,
+    time::{Instant, UNIX_EPOCH},
 };
 
 use anyhow::Result;
-use rkyv::Archived;
-use rusqlite::{Connection, params};
+use rkyv::util::AlignedVec;
+use rusqlite::{Connection, ToSql, Transaction, params_from_iter};
 
-use crate::{lang::Edition, models::kaikki::WordEntry};
+use crate::{
+    Map,
+    dict::LineBatch,
+    download::{download_last_modified, open_dump},
+    lang::Edition,
+    models::kaikki::{ArchivedWordEntry, WordEntry},
+    slice::{LineHasher, hash_dump},
+};
+
+/// Version of the tables. Databases of other versions are rebuilt.
+const SCHEMA_VERSION: u32 = 1;
+
+/// Rows inserted by a single `INSERT` statement when importing.
+const ROWS_PER_INSERT: usize = 256;
+
+/// Batches of encoded lines that can wait for the writer, to bound memory usage.
+const PENDING_BATCHES: usize = 4;
+
+/// Cache used while importing, in KiB (negative values are KiB for SQLite).
+///
+/// Editions are imported in parallel, so keep it reasonable.
+const IMPORT_CACHE_SIZE_KIB: i64 = -256 * 1024;
+
+/// What identifies a dump, without reading it.
+#[derive(Debug, Clone, PartialEq, Eq)]
+struct DumpStat {
+    /// Of the file: only comparable between dumps that are both gzipped, or both not.
+    size: u64,
+    gzipped: bool,
+    /// Nanoseconds since the epoch.
+    mtime: u128,
+    /// Sent by the server, if the dump is a complete download, or was decompressed from one.
+    last_modified: Option<String>,
+}
+
+impl DumpStat {
+    fn new(path_dump: &Path) -> Result<Self> {
+        let metadata = fs::metadata(path_dump)?;
+        Ok(Self {
+            size: metadata.len(),
+            gzipped: path_dump.extension().is_some_and(|ext| ext == "gz"),
+            mtime: metadata.modified()?.duration_since(UNIX_EPOCH)?.as_nanos(),
+            last_modified: download_last_modified(path_dump),
+        })
+    }
+}
+
+/// What a database was imported from, stored in its `metadata` table.
+#[derive(Debug, Clone)]
+struct DumpMetadata {
+    schema_version: u32,
+    dump: DumpStat,
+    /// Hash of the lines of the dump, see [`LineHasher`].
+    hash: u64,
+}
+
+/// What to do with the database of an edition, given its dump.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum Decision {
+    /// Imported from the same dump.
+    Reuse,
+    /// Imported from a dump with the same content, f.e. downloaded again: only the
+    /// metadata is updated.
+    Refresh,
+    /// Imported again, for the given reason.
+    Rebuild(&'static str),
+}
+
+impl Decision {
+    /// Decide from the metadata alone when possible. The dump is only hashed, with
+    /// `hash_dump`, if it may have the same content under another identity: downloaded
+    /// again, touched, or read gzipped instead of decompressed (or the reverse).
+    fn new(
+        stored: Option<&DumpMetadata>,
+        dump: &DumpStat,
+        hash_dump: impl FnOnce() -> Result<u64>,
+    ) -> Result<Self> {
+        let Some(stored) = stored else {
+            return Ok(Self::Rebuild("no metadata"));
+        };
+        if stored.schema_version != SCHEMA_VERSION {
+            return Ok(Self::Rebuild("schema changed"));
+        }
+
+        let same_format = stored.dump.gzipped == dump.gzipped;
+        let same_size = same_format && stored.dump.size == dump.size;
+        // The date of the server identifies a download, gzipped or not, and survives copies
+        // of the dump. The mtime does not.
+        let same_dump = match (&stored.dump.last_modified, &dump.last_modified) {
+            (Some(stored), Some(current)) => stored == current && (same_size || !same_format),
+            _ => same_size && stored.dump.mtime == dump.mtime,
+        };
+        if same_dump {
+            return Ok(Self::Reuse);
+        }
+        if same_format && !same_size {
+            return Ok(Self::Rebuild("dump changed"));
+        }
+        if hash_dump()? == stored.hash {
+            return Ok(Self::Refresh);
+        }
+        Ok(Self::Rebuild("dump changed"))
+    }
+}
+
+impl fmt::Display for Decision {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        match self {
+            Self::Reuse => f.write_str("reuse"),
+            Self::Refresh => f.write_str("refresh (same content)"),
+            Self::Rebuild(reason) => write!(f, "rebuild ({reason})"),
+        }
+    }
+}
+
+/// A [`WordEntry`] ready to be inserted.
+struct EncodedEntry {
+    lang_code: String,
+    blob: AlignedVec,
+    /// Translation languages, deduplicated, in order of appearance.
+    translation_langs: Vec<String>,
+}
+
+impl EncodedEntry {
+    fn new(line: &[u8]) -> Result<Self> {
+        let word_entry: WordEntry = serde_json::from_slice(line)?;
+        let blob = rkyv::to_bytes::<rkyv::rancor::Error>(&word_entry)?;
+
+        let mut seen = HashSet::new();
+        let translation_langs = word_entry
+            .translations
+            .into_iter()
+            .filter_map(|trans| {
+                seen.insert(trans.lang_code.clone())
+                    .then_some(trans.lang_code)
+            })
+            .collect();
+
+        Ok(Self {
+            lang_code: word_entry.lang_code,
+            blob,
+            translation_langs,
+        })
+    }
+}
+
+/// `INSERT INTO table (a, b) VALUES (?, ?), (?, ?)...` with `rows` rows.
+fn insert_sql(table: &str, columns: &[&str], rows: usize) -> String {
+    let row = format!("({})", vec!["?"; columns.len()].join(", "));
+    let values = vec![row.as_str(); rows].join(", ");
+    format!(
+        "INSERT INTO {table} ({}) VALUES {values}",
+        columns.join(", ")
+    )
+}
+
+/// Insert rows of `columns.len()` values each, `ROWS_PER_INSERT` at a time.
+fn insert_rows(
+    tx: &Transaction,
+    table: &str,
+    columns: &[&str],
+    values: &[&dyn ToSql],
+) -> Result<()> {
+    let chunk_len = ROWS_PER_INSERT * columns.len();
+    for chunk in values.chunks(chunk_len) {
+        let sql = insert_sql(table, columns, chunk.len() / columns.len());
+        tx.prepare_cached(&sql)?.execute(params_from_iter(chunk))?;
+    }
+    Ok(())
+}
 
 pub struct WiktextractDb {
     pub conn: Connection,
@@ -26,7 +197,7 @@ impl WiktextractDb {
     }
 
     /// Path for the database of this edition.
-    fn db_path_for<P>(root_dir: P, edition: Edition) -> PathBuf
+    pub fn db_path_for<P>(root_dir: P, edition: Edition) -> PathBuf
     where
         P: AsRef<Path>,
     {
@@ -42,107 +213,368 @@ impl WiktextractDb {
         Ok(Self { conn })
     }
 
-    pub fn create<P>(root_dir: P, edition: Edition, path_jsonl: PathBuf) -> Result<Self>
+    /// Number of entries of every language.
+    pub fn count_by_lang(&self) -> Result<Map<String, u64>> {
+        let mut stmt = self
+            .conn
+            .prepare("SELECT lang, COUNT(*) FROM wiktextract GROUP BY lang")?;
+        let counts = stmt
+            .query_map([], |row| Ok((row.get(0)?, row.get(1)?)))?
+            .collect::<rusqlite::Result<_>>()?;
+        Ok(counts)
+    }
+
+    /// Open the database of `edition`, (re)importing it from `path_dump` if needed.
+    ///
+    /// The database is reused if it was imported from the same dump, as recorded in its
+    /// metadata, and rebuilt from scratch otherwise (see [`Decision`]).
+    pub fn create<P>(root_dir: P, edition: Edition, path_dump: &Path) -> Result<(Self, Decision)>
     where
         P: AsRef<Path>,
     {
         let _ = std::fs::create_dir(Self::db_folder(&root_dir));
 
         let db_path = Self::db_path_for(&root_dir, edition);
+        let dump = DumpStat::new(path_dump)?;
+
+        let decision = if db_path.exists() {
+            let db = Self {
+                conn: Connection::open(&db_path)?,
+            };
+            let stored = db.dump_metadata()?;
+            let decision = Decision::new(stored.as_ref(), &dump, || hash_dump(path_dump))?;
+            match (decision, stored) {
+                (Decision::Reuse, _) => return Ok((db, decision)),
+                (Decision::Refresh, Some(stored)) => {
+                    db.write_dump_metadata(&DumpMetadata { dump, ..stored })?;
+                    return Ok((db, decision));
+                }
+                _ => {
+                    drop(db);
+                    std::fs::remove_file(&db_path)?;
+                }
+            }
+            decision
+        } else {
+            Decision::Rebuild("no database")
+        };
+
         let conn = Connection::open(&db_path)?;
 
         conn.execute_batch(
             r#"
-            CREATE TABLE IF NOT EXISTS wiktextract (
+            CREATE TABLE wiktextract (
                 id INTEGER PRIMARY KEY,
                 lang TEXT NOT NULL,
                 entry BLOB NOT NULL
             );
 
-            CREATE TABLE IF NOT EXISTS translations (
+            CREATE TABLE translations (
                 entry_id INTEGER NOT NULL,
                 target_lang TEXT NOT NULL,
                 FOREIGN KEY(entry_id) REFERENCES wiktextract(id)
             );
+            "#,
+        )?;
+
+        let mut db = Self { conn };
 
-            CREATE INDEX IF NOT EXISTS idx_wiktextract_lang
+        tracing::info!("Importing {} for {edition}...", path_dump.display());
+        let hash = db.import_dump(path_dump)?;
+
+        // Indexes are built once the tables are full: it is faster than updating them
+        // at every insert.
+        db.conn.execute_batch(
+            r#"
+            CREATE INDEX idx_wiktextract_lang
             ON wiktextract(lang);
 
-            CREATE INDEX IF NOT EXISTS idx_translations_target_lang
+            CREATE INDEX idx_translations_target_lang
             ON translations(target_lang);
 
-            CREATE INDEX IF NOT EXISTS idx_translations_entry_id
+            CREATE INDEX idx_translations_entry_id
             ON translations(entry_id);
             "#,
         )?;
 
-        let mut db = Self { conn };
+        // Last, so that an interrupted import has no metadata, and is rebuilt
+        db.write_dump_metadata(&DumpMetadata {
+            schema_version: SCHEMA_VERSION,
+            dump,
+            hash,
+        })?;
 
-        // NOTE: Not sure if we need to check that we init the db beforehand
-        let count: i64 = db
-            .conn
-            .query_row("SELECT COUNT(*) FROM wiktextract", [], |row| row.get(0))?;
+        Ok((db, decision))
+    }
 
-        if count == 0 {
-            tracing::info!("DB empty for {edition}, importing JSONL...");
-            db.import_jsonl(path_jsonl)?;
-        } else {
-            tracing::trace!("DB already initialized for {edition} ({count} rows)");
+    /// What the database was imported from, if it was imported completely.
+    fn dump_metadata(&self) -> Result<Option<DumpMetadata>> {
+        let has_metadata: bool = self.conn.query_row(
+            "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'metadata')",
+            [],
+            |row| row.get(0),
+        )?;
+        if !has_metadata {
+            return Ok(None);
+        }
+
+        let mut stmt = self.conn.prepare("SELECT key, value FROM metadata")?;
+        let values: Map<String, String> = stmt
+            .query_map([], |row| Ok((row.get(0)?, row.get(1)?)))?
+            .collect::<rusqlite::Result<_>>()?;
+        fn get<T: FromStr>(values: &Map<String, String>, key: &str) -> Option<T> {
+            values.get(key)?.parse().ok()
         }
 
-        Ok(db)
+        let (Some(schema_version), Some(size), Some(mtime), Some(hash)) = (
+            get(&values, "schema_version"),
+            get(&values, "dump_size"),
+            get(&values, "dump_mtime"),
+            get(&values, "dump_hash"),
+        ) else {
+            return Ok(None);
+        };
+
+        Ok(Some(DumpMetadata {
+            schema_version,
+            dump: DumpStat {
+                size,
+                // Not recorded at first, when only jsonlines were imported
+                gzipped: get(&values, "dump_gzipped").unwrap_or_default(),
+                mtime,
+                last_modified: values.get("dump_last_modified").cloned(),
+            },
+            hash,
+        }))
+    }
+
+    fn write_dump_metadata(&self, metadata: &DumpMetadata) -> Result<()> {
+        self.conn.execute_batch(
+            "DROP TABLE IF EXISTS metadata;
+             CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);",
+        )?;
+        let DumpMetadata {
+            schema_version,
+            dump,
+            hash,
+        } = metadata;
+        let mut values = vec![
+            ("schema_version", schema_version.to_string()),
+            ("dump_size", dump.size.to_string()),
+            ("dump_gzipped", dump.gzipped.to_string()),
+            ("dump_mtime", dump.mtime.to_string()),
+            ("dump_hash", hash.to_string()),
+        ];
+        if let Some(last_modified) = &dump.last_modified {
+            values.push(("dump_last_modified", last_modified.clone()));
+        }
+
+        let mut stmt = self
+            .conn
+            .prepare("INSERT INTO metadata (key, value) VALUES (?1, ?2)")?;
+        for (key, value) in values {
+            stmt.execute([key, value.as_str()])?;
+        }
+        Ok(())
     }
 
+    /// Import a jsonlines, or a gzipped one, into an empty database.
+    ///
+    /// The import is a pipeline: a dedicated thread reads (and decompresses) the dump in
+    /// batches of lines, which are deserialized and encoded in parallel on the rayon pool,
+    /// while another dedicated thread inserts them in file order, so that ids are the same
+    /// as if they were inserted one by one.
+    ///
+    /// Durability is traded for speed: a failed read or insert rolls the import back, but a
+    /// crash may leave a partial database. It has no metadata, since [`Self::create`] writes
+    /// it last, so it is rebuilt by the next run.
+    ///
+    /// Returns the hash of the lines of the dump, see [`LineHasher`].
     #[tracing::instrument(skip_all, level = "debug")]
-    pub fn import_jsonl<P: AsRef<Path>>(&mut self, jsonl_path: P) -> Result<()> {
+    pub fn import_dump(&mut self, path_dump: &Path) -> Result<u64> {
         let start = Instant::now();
-        let file = File::open(&jsonl_path)?;
-        let reader = BufReader::new(file);
+        let mut reader = open_dump(path_dump)?;
 
-        let tx = self.conn.transaction()?;
-        {
-            let mut insert_entry =
-                tx.prepare("INSERT INTO wiktextract (lang, entry) VALUES (?, ?)")?;
+        // Not OFF: without a journal, SQLite can not roll back the import if it fails. The
+        // database starts empty, so there is next to nothing to journal anyway.
+        self.conn.pragma_update(None, "journal_mode", "MEMORY")?;
+        self.conn.pragma_update(None, "synchronous", "OFF")?;
+        self.conn.pragma_update(None, "temp_store", "MEMORY")?;
+        self.conn
+            .pragma_update(None, "cache_size", IMPORT_CACHE_SIZE_KIB)?;
 
-            let mut insert_translation =
-                tx.prepare("INSERT INTO translations (entry_id, target_lang) VALUES (?, ?)")?;
+        let conn = &mut self.conn;
 
-            for line in reader.lines() {
-                let line = line?;
-                let word_entry: WordEntry = serde_json::from_str(&line)?;
-                let bytes = rkyv::to_bytes::<rkyv::rancor::Error>(&word_entry)?;
+        // The writer does not use rayon, so that it can not be starved by the workers
+        // (this runs inside the rayon pool when importing editions in parallel).
+        let (n_entries, hash) = thread::scope(|scope| {
+            let (sender, receiver) = sync_channel::<Vec<Result<EncodedEntry>>>(PENDING_BATCHES);
+            let writer = scope.spawn(move || -> Result<i64> {
+                let tx = conn.transaction()?;
+                let mut entry_id: i64 = 0;
+                for batch in receiver {
+                    let entries = batch.into_iter().collect::<Result<Vec<_>>>()?;
+                    let ids: Vec<i64> = (1..=entries.len() as i64)
+                        .map(|offset| entry_id + offset)
+                        .collect();
+                    let blobs: Vec<&[u8]> =
+                        entries.iter().map(|entry| entry.blob.as_slice()).collect();
 
-                // We are fine with adding entries for unsupported languages because we support
-                // almost everything, and the remaining percentage is very low.
-                // It takes more time to filter the unsupported languages than to ignore them.
+                    let mut entry_values: Vec<&dyn ToSql> = Vec::new();
+                    let mut translation_values: Vec<&dyn ToSql> = Vec::new();
 
-                insert_entry.execute(params![word_entry.lang_code, bytes.as_ref()])?;
+                    // We are fine with adding entries for unsupported languages because
+                    // we support almost everything, and the remaining percentage is very
+                    // low. It takes more time to filter the unsupported languages than
+                    // to ignore them.
+                    for ((entry, id), blob) in entries.iter().zip(&ids).zip(&blobs) {
+                        entry_values.extend([id as &dyn ToSql, &entry.lang_code, blob]);
+                        for target_lang in &entry.translation_langs {
+                            translation_values.extend([id as &dyn ToSql, target_lang]);
+                        }
+                    }
 
-                let entry_id = tx.last_insert_rowid();
+                    insert_rows(&tx, "wiktextract", &["id", "lang", "entry"], &entry_values)?;
+                    insert_rows(
+                        &tx,
+                        "translations",
+                        &["entry_id", "target_lang"],
+                        &translation_values,
+                    )?;
+                    entry_id += entries.len() as i64;
+                }
+                tx.commit()?;
+                Ok(entry_id)
+            });
 
-                let mut seen = HashSet::new();
-                for trans in word_entry.translations {
-                    if seen.insert(trans.lang_code.clone()) {
-                        insert_translation.execute(params![entry_id, trans.lang_code])?;
+            // Reading (and decompressing) the next batches overlaps with encoding this one
+            let (line_sender, line_receiver) = sync_channel::<Result<LineBatch>>(PENDING_BATCHES);
+            let reader = scope.spawn(move || {
+                let mut hasher = LineHasher::default();
+                loop {
+                    let mut batch = LineBatch::default();
+                    let batch = match batch.fill(&mut reader) {
+                        Ok(true) => {
+                            batch.lines().for_each(|line| hasher.update(line));
+                            Ok(batch)
+                        }
+                        Ok(false) => break,
+                        Err(err) => Err(err),
+                    };
+                    let failed = batch.is_err();
+                    // Fails only if the import stopped early
+                    if line_sender.send(batch).is_err() || failed {
+                        break;
                     }
                 }
+                hasher.finish()
+            });
+
+            for batch in line_receiver {
+                // A read error goes to the writer, so that it does not commit a partial import
+                let encoded = match batch {
+                    Ok(batch) => batch.map(EncodedEntry::new),
+                    Err(err) => vec![Err(err)],
+                };
+                // Fails only if the writer stopped early: its error is returned below
+                if sender.send(encoded).is_err() {
+                    break;
+                }
             }
-        }
-        tx.commit()?;
+            drop(sender);
+
+            let n_entries = writer.join().expect("the writer thread panicked")?;
+            let hash = reader.join().expect("the reader thread panicked");
+            anyhow::Ok((n_entries, hash))
+        })?;
 
         tracing::debug!(
-            "Making db took {:.3} ms",
+            "Making db took {:.3} ms ({n_entries} entries)",
             start.elapsed().as_secs_f64() * 1000.0
         );
 
-        Ok(())
+        Ok(hash)
+    }
+
+    /// Validate and access the archived entry of a row, without deserializing it.
+    pub fn access_entry(blob: &[u8]) -> Result<&ArchivedWordEntry> {
+        Ok(rkyv::access::<ArchivedWordEntry, rkyv::rancor::Error>(
+            blob,
+        )?)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn stat(size: u64, mtime: u128, last_modified: Option<&str>) -> DumpStat {
+        DumpStat {
+            size,
+            gzipped: true,
+            mtime,
+            last_modified: last_modified.map(str::to_string),
+        }
     }
 
-    pub fn blob_to_word_entry(blob: &[u8]) -> Result<WordEntry> {
-        let archived: &Archived<WordEntry> =
-            rkyv::access::<Archived<WordEntry>, rkyv::rancor::Error>(blob).unwrap();
-        let word_entry: WordEntry =
-            rkyv::deserialize::<WordEntry, rkyv::rancor::Error>(archived).unwrap();
-        Ok(word_entry)
+    fn decide(stored: &DumpMetadata, dump: &DumpStat, hash: u64) -> Decision {
+        Decision::new(Some(stored), dump, || Ok(hash)).unwrap()
+    }
+
+    #[test]
+    fn decision_from_dump_metadata() {
+        let stored = DumpMetadata {
+            schema_version: SCHEMA_VERSION,
+            dump: stat(10, 1, Some("Mon")),
+            hash: 42,
+        };
+
+        assert_eq!(
+            decide(&stored, &stat(10, 2, Some("Mon")), 0),
+            Decision::Reuse
+        );
+        assert_eq!(
+            decide(&stored, &stat(10, 2, Some("Tue")), 42),
+            Decision::Refresh
+        );
+        assert_eq!(
+            decide(&stored, &stat(10, 1, Some("Tue")), 0),
+            Decision::Rebuild("dump changed")
+        );
+        assert_eq!(
+            decide(&stored, &stat(11, 1, Some("Mon")), 42),
+            Decision::Rebuild("dump changed")
+        );
+        // Not downloaded: fall back to the mtime
+        assert_eq!(decide(&stored, &stat(10, 1, None), 0), Decision::Reuse);
+
+        // The same download, decompressed
+        let decompressed = DumpStat {
+            gzipped: false,
+            ..stat(50, 2, Some("Mon"))
+        };
+        assert_eq!(decide(&stored, &decompressed, 0), Decision::Reuse);
+        let decompressed = DumpStat {
+            last_modified: None,
+            ..decompressed
+        };
+        assert_eq!(decide(&stored, &decompressed, 42), Decision::Refresh);
+        assert_eq!(
+            decide(&stored, &decompressed, 0),
+            Decision::Rebuild("dump changed")
+        );
+
+        let old_schema = DumpMetadata {
+            schema_version: 0,
+            ..stored
+        };
+        assert_eq!(
+            decide(&old_schema, &stat(10, 1, Some("Mon")), 42),
+            Decision::Rebuild("schema changed")
+        );
+        assert_eq!(
+            Decision::new(None, &stat(10, 1, None), || Ok(42)).unwrap(),
+            Decision::Rebuild("no metadata")
+        );
     }
 }
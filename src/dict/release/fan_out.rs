@@ -0,0 +1,366 @@
+//! Make every dictionary of an edition in a single pass over its database.
+//!
+//! Making dictionaries one by one with [`make_dict_from_db`] queries, fetches and
+//! deserializes the same rows several times: for the main dictionary, for the ipa one, and
+//! for the glossary of every target. Here, the entries of every source are read once, and
+//! routed to every dictionary they are relevant to.
+//!
+//! [`make_dict_from_db`]: super::make_dict_from_db
+
+use std::{
+    num::NonZero,
+    path::PathBuf,
+    thread,
+    time::{Duration, Instant},
+};
+
+use anyhow::{Result, bail};
+
+use super::{
+    DQuery, TimingStats, WiktextractDb,
+    manifest::{JobRecord, Planner},
+    pp,
+    schedule::{Job, run_under_budget},
+};
+use crate::{
+    Map,
+    cli::{
+        DictName, GlossaryArgs, GlossaryLangs, IpaArgs, MainArgs, MainLangs, Options, ReleaseArgs,
+    },
+    dict::{
+        DGlossary, DIpa, DMain, Dictionary, Intermediate, Langs,
+        metrics::{DictMetrics, Phase, Recorder},
+    },
+    lang::{Edition, Lang},
+    models::kaikki::WordEntry,
+    path::PathManager,
+};
+
+/// A dictionary being made out of the entries routed to it.
+struct DictBuilder<D: Dictionary> {
+    dict: D,
+    langs: Langs,
+    pm: PathManager,
+    irs: D::I,
+    recorder: Recorder,
+}
+
+impl<D: Dictionary> DictBuilder<D> {
+    fn new(dict: D, langs: Langs, args: D::A) -> Result<Self> {
+        let pm: PathManager = args.try_into()?;
+        pm.setup_dirs()?;
+        let recorder = Recorder::new(pm.dict_name_expanded(), &pm.opts);
+        Ok(Self {
+            dict,
+            langs,
+            pm,
+            irs: D::I::default(),
+            recorder,
+        })
+    }
+
+    fn push(&mut self, entry: &mut WordEntry) {
+        if self.dict.skip_if(entry) {
+            return;
+        }
+        self.dict
+            .preprocess(self.langs, entry, &self.pm.opts, &mut self.irs);
+        self.dict.process(self.langs, entry, &mut self.irs);
+        self.recorder.count(1, 0, 0);
+    }
+
+    /// End the ingest phase, once the pass is over.
+    ///
+    /// The `rows` and `bytes_read` of the pass are shared by every dictionary of the source.
+    fn ingested(&mut self, rows: u64, bytes_read: u64) -> Result<()> {
+        self.recorder.count(0, bytes_read, rows);
+        self.recorder.ingested(&self.irs)
+    }
+
+    /// Write the dictionary. Returns where, if there was anything to write, and the metrics
+    /// of its making.
+    fn finish(mut self) -> Result<Option<(PathBuf, DictMetrics)>> {
+        if self.irs.is_empty() {
+            return Ok(None);
+        }
+
+        self.dict.postprocess(&mut self.irs);
+
+        self.recorder.start_phase(Phase::Write);
+        let pm = &self.pm;
+        pm.opts
+            .format
+            .write(&self.dict, pm.langs, &pm.opts, pm, &self.irs)?;
+
+        Ok(Some((pm.path_dict(), self.recorder.finish()?)))
+    }
+}
+
+fn options(rargs: &ReleaseArgs) -> Options {
+    Options {
+        quiet: true,
+        root_dir: rargs.root_dir.clone(),
+        parallel_zip: true,
+        ..Default::default()
+    }
+}
+
+/// Write a dictionary, and record the time it took, its metrics and where it was written.
+///
+/// The time is that of the pass, which is shared by every dictionary of the source, plus
+/// that of its own writing. That is, what it would take to make it on its own, as with
+/// [`make_dict_from_db`](super::make_dict_from_db).
+///
+/// If it fails, log why and push its name to `failed`.
+fn report<D: Dictionary>(
+    dict_name: &str,
+    builder: DictBuilder<D>,
+    (first_lang, second_lang): (Lang, Lang),
+    pass: Duration,
+    stats: &TimingStats,
+    record: &mut JobRecord,
+    failed: &mut Vec<String>,
+) {
+    let start = Instant::now();
+    match builder.finish() {
+        Ok(Some((path, metrics))) => {
+            let duration = pass + start.elapsed();
+            let (key, duration) = pp(dict_name, first_lang, Some(second_lang), duration, stats);
+            stats.record_metrics(key.clone(), metrics.clone());
+            record.push(path, key, duration, metrics);
+        }
+        Ok(None) => (),
+        Err(err) => {
+            tracing::error!("[{dict_name}-{first_lang}-{second_lang}] ERROR: {err:?}");
+            failed.push(format!("{dict_name}-{first_lang}-{second_lang}"));
+        }
+    }
+}
+
+/// Rough memory used to make the dictionaries of a source, per entry.
+///
+/// It errs on the safe side: the main dictionary dominates, and its entries vary a lot.
+const ESTIMATED_BYTES_PER_ENTRY: u64 = 8 * (1 << 10);
+
+/// Floor of the estimate, for the buffers and tables every job allocates.
+const ESTIMATED_BYTES_MIN: u64 = 32 * (1 << 20);
+
+/// Whether the entries of `source` also make the glossaries of `edition`.
+fn with_glossaries(edition: Edition, source: Lang) -> bool {
+    edition != Edition::Simple && source == Lang::from(edition)
+}
+
+const fn estimate_memory(entries: u64, with_glossaries: bool) -> u64 {
+    let mut estimate = entries * ESTIMATED_BYTES_PER_ENTRY;
+    if with_glossaries {
+        // The glossaries of every target are kept until the end of the pass
+        estimate += estimate / 2;
+    }
+    if estimate < ESTIMATED_BYTES_MIN {
+        ESTIMATED_BYTES_MIN
+    } else {
+        estimate
+    }
+}
+
+/// Make the main, ipa and glossary dictionaries of every edition.
+///
+/// Every source of every edition is a job, and they all run under the memory budget of
+/// `rargs`, sized after the number of entries of the source. Sources without entries, and
+/// jobs that `planner` deems up to date, are skipped.
+pub(super) fn release_editions(
+    rargs: &ReleaseArgs,
+    editions: &[Edition],
+    planner: &Planner,
+    stats: &TimingStats,
+) -> Result<()> {
+    let mut jobs = Vec::new();
+    for edition in editions {
+        if !WiktextractDb::db_path_for(&rargs.root_dir, *edition).exists() {
+            tracing::warn!("No database for {edition}: skipping it");
+            continue;
+        }
+        let counts = WiktextractDb::open(&rargs.root_dir, *edition)?.count_by_lang()?;
+        for source in Lang::all() {
+            match (edition, source) {
+                (Edition::Simple, Lang::Simple) => (),
+                (Edition::Simple, _) | (_, Lang::Simple) => continue,
+                _ => (),
+            }
+
+            let entries = counts.get(source.iso()).copied().unwrap_or_default();
+            if entries == 0 {
+                continue;
+            }
+            let job = format!("{edition}-{source}");
+            let Some(record) = planner.plan(&job, &[(*edition, source)], stats) else {
+                continue;
+            };
+            jobs.push(Job {
+                estimate: estimate_memory(entries, with_glossaries(*edition, source)),
+                task: (*edition, source, job, record),
+            });
+        }
+    }
+
+    if jobs.is_empty() {
+        return Ok(());
+    }
+
+    let threads = thread::available_parallelism().map_or(1, NonZero::get);
+    let budget = rargs.memory_budget * (1 << 30);
+    let report = run_under_budget(
+        jobs,
+        budget,
+        threads,
+        |(edition, source, job, mut record)| match release_source(
+            rargs,
+            edition,
+            source,
+            stats,
+            &mut record,
+        ) {
+            Ok(()) => planner.done(job, record),
+            Err(err) => tracing::error!("[{source}-{edition}] ERROR: {err:?}"),
+        },
+    );
+    println!("{report}");
+
+    Ok(())
+}
+
+/// Make every dictionary of `edition` whose entries are in `source`, in a single pass.
+///
+/// Entries go to the main and ipa dictionaries and, if `source` is the language of the
+/// edition, to the glossary of every language they have translations in.
+///
+/// Fails if any of them fails, so that the job is not recorded as done, and the missing
+/// dictionaries are made again on the next release.
+fn release_source(
+    rargs: &ReleaseArgs,
+    edition: Edition,
+    source: Lang,
+    stats: &TimingStats,
+    record: &mut JobRecord,
+) -> Result<()> {
+    let start = Instant::now();
+
+    let edition_lang: Lang = edition.into();
+    let langs = Langs::new(edition, source, edition_lang);
+    let main_langs = MainLangs {
+        source,
+        target: edition,
+    };
+    let mut main = DictBuilder::new(
+        DMain,
+        langs,
+        MainArgs {
+            langs: main_langs,
+            dict_name: DictName::default(),
+            options: options(rargs),
+        },
+    )?;
+    let mut ipa = DictBuilder::new(
+        DIpa,
+        langs,
+        IpaArgs {
+            langs: main_langs,
+            dict_name: DictName::default(),
+            options: options(rargs),
+        },
+    )?;
+
+    let with_glossaries = with_glossaries(edition, source);
+    let mut glossaries: Map<Lang, DictBuilder<DGlossary>> = Map::default();
+    // Parsing lang codes allocates: cache them, there are only so many
+    let mut lang_codes: Map<String, Option<Lang>> = Map::default();
+    let mut targets: Vec<Lang> = Vec::new();
+
+    let db = WiktextractDb::open(&rargs.root_dir, edition)?;
+    let mut stmt = db.conn.prepare(DMain::statement_str())?;
+    let mut rows = DMain::query(&mut stmt, source.iso(), edition_lang.iso())?;
+
+    let (mut n_rows, mut bytes_read) = (0, 0);
+    while let Some(row) = rows.next()? {
+        let blob: &[u8] = row.get_ref(0)?.as_blob()?;
+        n_rows += 1;
+        bytes_read += blob.len() as u64;
+        let mut entry = WiktextractDb::access_entry(blob)?.deserialize_all()?;
+
+        if with_glossaries {
+            targets.clear();
+            for translation in entry.non_trivial_translations() {
+                let lang_code = translation.lang_code.as_str();
+                let target = match lang_codes.get(lang_code) {
+                    Some(target) => *target,
+                    None => {
+                        let target = lang_code
+                            .parse::<Lang>()
+                            .ok()
+                            .filter(|target| *target != Lang::Simple && *target != edition_lang);
+                        lang_codes.insert(lang_code.to_string(), target);
+                        target
+                    }
+                };
+                if let Some(target) = target
+                    && !targets.contains(&target)
+                {
+                    targets.push(target);
+                }
+            }
+
+            for target in &targets {
+                if !glossaries.contains_key(target) {
+                    let builder = DictBuilder::new(
+                        DGlossary,
+                        Langs::new(edition, edition_lang, *target),
+                        GlossaryArgs {
+                            langs: GlossaryLangs {
+                                source: edition,
+                                target: *target,
+                            },
+                            dict_name: DictName::default(),
+                            options: options(rargs),
+                        },
+                    )?;
+                    glossaries.insert(*target, builder);
+                }
+                glossaries[target].push(&mut entry);
+            }
+        }
+
+        ipa.push(&mut entry);
+        // Last, since preprocessing the main dictionary mutates the entry
+        main.push(&mut entry);
+    }
+
+    main.ingested(n_rows, bytes_read)?;
+    ipa.ingested(n_rows, bytes_read)?;
+    for glossary in glossaries.values_mut() {
+        glossary.ingested(n_rows, bytes_read)?;
+    }
+
+    let pass = start.elapsed();
+    let mut failed = Vec::new();
+    let langs = (source, edition_lang);
+    report("main", main, langs, pass, stats, record, &mut failed);
+    report("ipa", ipa, langs, pass, stats, record, &mut failed);
+    for (target, glossary) in glossaries {
+        // Reverse order of main/ipa
+        let langs = (edition_lang, target);
+        report(
+            "glossary",
+            glossary,
+            langs,
+            pass,
+            stats,
+            record,
+            &mut failed,
+        );
+    }
+
+    if !failed.is_empty() {
+        bail!("failed to make {}", failed.join(", "));
+    }
+    Ok(())
+}
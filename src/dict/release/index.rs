@@ -1,4 +1,7 @@
-use std::fs::File;
+use std::{
+    fs::{self, File},
+    path::Path,
+};
 
 use anyhow::Result;
 
@@ -14,6 +17,9 @@ use crate::cli::ReleaseArgs;
 ///
 /// The `nb/ru` folders are dropped since indexes are intended to be used
 /// as direct URLs for the Yomitan upgrade machinery.
+///
+/// Indexes newer than their dictionary (f.e. reused by an incremental release)
+/// are kept as they are.
 pub fn extract_indexes(rargs: &ReleaseArgs) -> Result<()> {
     let dict_dir = rargs.root_dir.join("dict");
     let index_dir = rargs.root_dir.join("index");
@@ -22,6 +28,7 @@ pub fn extract_indexes(rargs: &ReleaseArgs) -> Result<()> {
     println!("[index] Extracting indexes...");
 
     let mut n_indexes = 0;
+    let mut n_reused = 0;
 
     for entry in walkdir::WalkDir::new(&dict_dir)
         .into_iter()
@@ -32,6 +39,11 @@ pub fn extract_indexes(rargs: &ReleaseArgs) -> Result<()> {
         let stem = zip_path.file_stem().unwrap().to_string_lossy();
         let index_path = index_dir.join(format!("{stem}-index.json"));
 
+        if is_newer(&index_path, zip_path)? {
+            n_reused += 1;
+            continue;
+        }
+
         let file = File::open(zip_path)?;
         let mut zip = zip::ZipArchive::new(file)?;
 
@@ -47,6 +59,14 @@ pub fn extract_indexes(rargs: &ReleaseArgs) -> Result<()> {
         n_indexes += 1;
     }
 
-    println!("[index] Extracted {n_indexes} indexes");
+    println!("[index] Extracted {n_indexes} indexes ({n_reused} up to date)");
     Ok(())
 }
+
+/// Whether `path` exists and was modified after `than`.
+fn is_newer(path: &Path, than: &Path) -> Result<bool> {
+    let Ok(metadata) = fs::metadata(path) else {
+        return Ok(false);
+    };
+    Ok(metadata.modified()? >= fs::metadata(than)?.modified()?)
+}
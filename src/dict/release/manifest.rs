@@ -0,0 +1,381 @@
+//! Incremental releases.
+//!
+//! The manifest records, for every release job, the fingerprints of the database slices it
+//! read (the entries of one language in one edition), the fingerprint of the generator, and
+//! the dictionaries it wrote. A job whose fingerprints did not change, and whose dictionaries
+//! are still there, is skipped: the dictionaries and their extracted indexes are reused.
+//!
+//! Slices are hashed from the edition databases. The hashes are kept in the manifest too,
+//! next to the size and modification time of the database, so that unchanged databases are
+//! not read again.
+//!
+//! The generator fingerprint covers the crate version and the assets. Code changes that do
+//! not bump the version are not detected: use `release --full` after them.
+
+use std::{
+    collections::BTreeMap,
+    fs,
+    hash::Hasher,
+    path::{Path, PathBuf},
+    sync::{
+        Mutex,
+        atomic::{AtomicUsize, Ordering},
+    },
+    time::{Duration, UNIX_EPOCH},
+};
+
+use anyhow::{Context, Result};
+use fxhash::FxHasher64;
+use serde::{Deserialize, Serialize};
+
+use super::{TimingStats, WiktextractDb};
+use crate::{
+    Map,
+    cli::ReleaseArgs,
+    dict::metrics::DictMetrics,
+    lang::{Edition, Lang},
+};
+
+const MANIFEST_FILENAME: &str = "manifest.json";
+
+/// Fingerprints of the slices read by a job, keyed by `{edition}/{lang}`.
+type Inputs = BTreeMap<String, String>;
+
+fn hex(hash: u64) -> String {
+    format!("{hash:016x}")
+}
+
+/// Fingerprint of the crate version and of every file under `assets/`.
+fn generator_fingerprint() -> Result<String> {
+    let mut hasher = FxHasher64::default();
+    hasher.write(env!("CARGO_PKG_VERSION").as_bytes());
+
+    let assets = Path::new(env!("CARGO_MANIFEST_DIR")).join("assets");
+    for entry in walkdir::WalkDir::new(&assets).sort_by_file_name() {
+        let entry = entry?;
+        if entry.file_type().is_file() {
+            let path = entry.path();
+            hasher.write(path.strip_prefix(&assets)?.to_string_lossy().as_bytes());
+            hasher.write(&fs::read(path)?);
+        }
+    }
+
+    Ok(hex(hasher.finish()))
+}
+
+#[derive(Debug, Default, Serialize, Deserialize)]
+struct DbFingerprints {
+    size: u64,
+    /// Nanoseconds since the epoch.
+    mtime: u128,
+    /// Keyed by lang.
+    slices: BTreeMap<String, String>,
+}
+
+impl DbFingerprints {
+    /// Hash the entries of every language of a database, in one pass.
+    fn hash(db: &WiktextractDb) -> Result<BTreeMap<String, String>> {
+        let mut hashers: Map<String, FxHasher64> = Map::default();
+        let mut stmt = db
+            .conn
+            .prepare("SELECT lang, entry FROM wiktextract ORDER BY id")?;
+        let mut rows = stmt.query([])?;
+        while let Some(row) = rows.next()? {
+            let lang = row.get_ref(0)?.as_str()?;
+            let blob = row.get_ref(1)?.as_blob()?;
+            if !hashers.contains_key(lang) {
+                hashers.insert(lang.to_string(), FxHasher64::default());
+            }
+            let hasher = &mut hashers[lang];
+            hasher.write_usize(blob.len());
+            hasher.write(blob);
+        }
+
+        Ok(hashers
+            .into_iter()
+            .map(|(lang, hasher)| (lang, hex(hasher.finish())))
+            .collect())
+    }
+}
+
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub(super) struct JobRecord {
+    generator: String,
+    inputs: Inputs,
+    /// Dictionaries written.
+    outputs: Vec<PathBuf>,
+    /// How long every dictionary took to make, in ms, keyed as in [`TimingStats`].
+    timings: BTreeMap<String, u128>,
+    /// Metrics of the making of every dictionary, keyed as `timings`.
+    #[serde(default)]
+    metrics: BTreeMap<String, DictMetrics>,
+}
+
+impl JobRecord {
+    /// Record a dictionary written by the job.
+    pub fn push(
+        &mut self,
+        path: PathBuf,
+        timing_key: String,
+        duration: Duration,
+        metrics: DictMetrics,
+    ) {
+        self.outputs.push(path);
+        self.timings
+            .insert(timing_key.clone(), duration.as_millis());
+        self.metrics.insert(timing_key, metrics);
+    }
+
+    /// Record the timings and metrics of the reused dictionaries, as if they had just been
+    /// made.
+    fn replay_timings(&self, stats: &TimingStats) {
+        for (key, ms) in &self.timings {
+            stats.record(key.clone(), Duration::from_millis(*ms as u64));
+        }
+        for (key, metrics) in &self.metrics {
+            stats.record_metrics(key.clone(), metrics.clone());
+        }
+    }
+}
+
+#[derive(Debug, Default, Serialize, Deserialize)]
+struct Manifest {
+    /// Keyed by edition.
+    databases: BTreeMap<String, DbFingerprints>,
+    /// Keyed by job, f.e. `en-de` for the dictionaries made from the German entries of the
+    /// English edition, or `ipa-merged-de`.
+    jobs: BTreeMap<String, JobRecord>,
+}
+
+impl Manifest {
+    fn path(root_dir: &Path) -> PathBuf {
+        root_dir.join(MANIFEST_FILENAME)
+    }
+
+    /// Load the manifest of the release at `root_dir`, or an empty one if there is none.
+    fn load(root_dir: &Path) -> Result<Self> {
+        let path = Self::path(root_dir);
+        if !path.exists() {
+            return Ok(Self::default());
+        }
+        serde_json::from_slice(&fs::read(&path)?)
+            .with_context(|| format!("Error decoding manifest @ {}", path.display()))
+    }
+
+    fn save(&self, root_dir: &Path) -> Result<()> {
+        let path = Self::path(root_dir);
+        let path_tmp = path.with_extension("json.tmp");
+        fs::write(&path_tmp, serde_json::to_vec_pretty(self)?)?;
+        fs::rename(path_tmp, path)?;
+        Ok(())
+    }
+
+    /// Hash the slices of the database of `edition`, unless it did not change.
+    ///
+    /// Editions without a database have no slices.
+    fn update_slices(&mut self, root_dir: &Path, edition: Edition) -> Result<()> {
+        let key = edition.to_string();
+        let db_path = WiktextractDb::db_path_for(root_dir, edition);
+        let Ok(metadata) = fs::metadata(&db_path) else {
+            self.databases.remove(&key);
+            return Ok(());
+        };
+        let size = metadata.len();
+        let mtime = metadata.modified()?.duration_since(UNIX_EPOCH)?.as_nanos();
+
+        if let Some(db) = self.databases.get(&key)
+            && db.size == size
+            && db.mtime == mtime
+        {
+            return Ok(());
+        }
+
+        let slices = DbFingerprints::hash(&WiktextractDb::open(root_dir, edition)?)?;
+        self.databases.insert(
+            key,
+            DbFingerprints {
+                size,
+                mtime,
+                slices,
+            },
+        );
+        Ok(())
+    }
+
+    /// Fingerprints of the given slices. Empty slices are left out.
+    fn inputs(&self, slices: &[(Edition, Lang)]) -> Inputs {
+        slices
+            .iter()
+            .filter_map(|(edition, lang)| {
+                let hash = self
+                    .databases
+                    .get(&edition.to_string())?
+                    .slices
+                    .get(lang.iso())?;
+                Some((format!("{edition}/{lang}"), hash.clone()))
+            })
+            .collect()
+    }
+
+    /// The record of `job` if it can be skipped: same generator, same inputs, and every
+    /// dictionary it wrote is still there.
+    fn fresh(&self, job: &str, generator: &str, inputs: &Inputs) -> Option<&JobRecord> {
+        self.jobs.get(job).filter(|record| {
+            record.generator == generator
+                && record.inputs == *inputs
+                && record.outputs.iter().all(|path| path.exists())
+        })
+    }
+}
+
+/// Decide which release jobs run, and collect the records of those that did.
+pub(super) struct Planner {
+    manifest: Manifest,
+    generator: String,
+    full: bool,
+    dry_run: bool,
+    done: Mutex<Vec<(String, JobRecord)>>,
+    skipped: AtomicUsize,
+}
+
+impl Planner {
+    /// Load the manifest and fingerprint the databases of `editions`.
+    pub fn new(rargs: &ReleaseArgs, editions: &[Edition]) -> Result<Self> {
+        let mut manifest = Manifest::load(&rargs.root_dir)?;
+        for edition in editions {
+            manifest.update_slices(&rargs.root_dir, *edition)?;
+        }
+
+        Ok(Self {
+            manifest,
+            generator: generator_fingerprint()?,
+            full: rargs.full,
+            dry_run: rargs.dry_run,
+            done: Mutex::new(Vec::new()),
+            skipped: AtomicUsize::new(0),
+        })
+    }
+
+    /// A record to fill if `job`, which reads `slices`, has to run.
+    ///
+    /// Otherwise, the dictionaries of the job are reused, and their timings are recorded in
+    /// `stats`. With `--dry-run`, jobs that would run are only listed.
+    pub fn plan(
+        &self,
+        job: &str,
+        slices: &[(Edition, Lang)],
+        stats: &TimingStats,
+    ) -> Option<JobRecord> {
+        let inputs = self.manifest.inputs(slices);
+
+        if !self.full
+            && let Some(record) = self.manifest.fresh(job, &self.generator, &inputs)
+        {
+            record.replay_timings(stats);
+            self.skipped.fetch_add(1, Ordering::Relaxed);
+            return None;
+        }
+
+        if self.dry_run {
+            println!("[dry-run] Would rebuild {job}");
+            return None;
+        }
+
+        Some(JobRecord {
+            generator: self.generator.clone(),
+            inputs,
+            outputs: Vec::new(),
+            timings: BTreeMap::new(),
+            metrics: BTreeMap::new(),
+        })
+    }
+
+    /// Keep the record of a job that ran successfully.
+    pub fn done(&self, job: String, record: JobRecord) {
+        self.done.lock().unwrap().push((job, record));
+    }
+
+    /// Write the manifest, unless this is a dry run.
+    pub fn finish(self, root_dir: &Path) -> Result<()> {
+        let skipped = self.skipped.into_inner();
+        if self.dry_run {
+            println!("[dry-run] {skipped} jobs are up to date");
+            return Ok(());
+        }
+
+        let mut manifest = self.manifest;
+        let done = self.done.into_inner().unwrap();
+        println!("Ran {} jobs, reused {skipped} up to date", done.len());
+        manifest.jobs.extend(done);
+        manifest.save(root_dir)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn planner(slice_hash: &str, full: bool) -> Planner {
+        let mut manifest = Manifest::default();
+        manifest.databases.insert(
+            "en".to_string(),
+            DbFingerprints {
+                slices: [("de".to_string(), slice_hash.to_string())].into(),
+                ..Default::default()
+            },
+        );
+        manifest.jobs.insert(
+            "en-de".to_string(),
+            JobRecord {
+                generator: "generator".to_string(),
+                inputs: [("en/de".to_string(), "hash".to_string())].into(),
+                outputs: Vec::new(),
+                timings: [("main-de-en".to_string(), 42)].into(),
+                metrics: [("main-de-en".to_string(), DictMetrics::default())].into(),
+            },
+        );
+
+        Planner {
+            manifest,
+            generator: "generator".to_string(),
+            full,
+            dry_run: false,
+            done: Mutex::new(Vec::new()),
+            skipped: AtomicUsize::new(0),
+        }
+    }
+
+    #[test]
+    fn plan_reuses_up_to_date_jobs() {
+        let stats = TimingStats::new();
+        let planner = planner("hash", false);
+        assert!(
+            planner
+                .plan("en-de", &[(Edition::En, Lang::De)], &stats)
+                .is_none()
+        );
+        assert!(stats.timings.lock().unwrap().contains_key("main-de-en"));
+        assert!(stats.metrics.lock().unwrap().contains_key("main-de-en"));
+    }
+
+    #[test]
+    fn plan_reruns_changed_jobs() {
+        let stats = TimingStats::new();
+        let slices = [(Edition::En, Lang::De)];
+        assert!(
+            planner("other", false)
+                .plan("en-de", &slices, &stats)
+                .is_some()
+        );
+        assert!(
+            planner("hash", true)
+                .plan("en-de", &slices, &stats)
+                .is_some()
+        );
+        assert!(
+            planner("hash", false)
+                .plan("en-fr", &slices, &stats)
+                .is_some()
+        );
+    }
+}
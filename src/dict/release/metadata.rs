@@ -1,18 +1,24 @@
 //! Dictionary release metadata.
 //!
 //! Scans the release `dict/` folder and produces a `release_metadata.json` summarizing
-//! the size of each dictionary type, source language, and target language.
+//! the size of each dictionary type, source language, and target language, and the counters
+//! of the making of every dictionary.
 //!
-//! Metadata is written to the `docs/` folder to be used in the downloads page.
+//! Metadata is written to the `docs/` folder to be used in the downloads page. The full
+//! metrics, with the duration of every phase, are written next to the release instead, to
+//! [`METRICS_FILENAME`].
 
 use std::{collections::BTreeMap, path::Path};
 
 use anyhow::Result;
 use serde::ser::SerializeStruct;
 
-use crate::dict::release::TimingStats;
+use crate::dict::{metrics::DictMetrics, release::TimingStats};
 use crate::utils::{human_size, human_time};
 
+/// Metrics of every dictionary of the last release, under the root directory.
+const METRICS_FILENAME: &str = "release_metrics.json";
+
 // There is not time for TargetInfo because most of the time is instant and it
 // pollutes the diff with variations that are mainly due to threading.
 #[derive(Debug, Default)]
@@ -38,6 +44,28 @@ struct TypeInfo {
 
 type DictInfo = BTreeMap<String, TypeInfo>;
 
+/// The counters of [`DictMetrics`], which only change when the dictionary does.
+///
+/// Like the time of targets, the duration of the phases would pollute the diff.
+#[derive(Debug, serde::Serialize)]
+struct DictCounters {
+    entries: u64,
+    bytes_read: u64,
+    rows: u64,
+    ir_heap: Option<u64>,
+}
+
+impl From<&DictMetrics> for DictCounters {
+    fn from(metrics: &DictMetrics) -> Self {
+        Self {
+            entries: metrics.entries,
+            bytes_read: metrics.bytes_read,
+            rows: metrics.rows,
+            ir_heap: metrics.ir_heap,
+        }
+    }
+}
+
 #[derive(Debug, Default)]
 struct DbInfo {
     size: u64,
@@ -51,6 +79,8 @@ struct Metadata {
     time: u128,
     db: BTreeMap<String, DbInfo>,
     dicts: DictInfo,
+    /// Keyed as the timings, f.e. `main-de-en`.
+    metrics: BTreeMap<String, DictCounters>,
 }
 
 impl serde::Serialize for TargetInfo {
@@ -83,12 +113,13 @@ impl serde::Serialize for TypeInfo {
 
 impl serde::Serialize for Metadata {
     fn serialize<S: serde::Serializer>(&self, s: S) -> Result<S::Ok, S::Error> {
-        let mut state = s.serialize_struct("Metadata", 5)?;
+        let mut state = s.serialize_struct("Metadata", 6)?;
         state.serialize_field("size", &human_size(self.size as f64))?;
         state.serialize_field("count", &self.count)?;
         state.serialize_field("time", &human_time(self.time))?;
         state.serialize_field("db", &self.db)?;
         state.serialize_field("dicts", &self.dicts)?;
+        state.serialize_field("metrics", &self.metrics)?;
         state.end()
     }
 }
@@ -121,6 +152,7 @@ fn classify_dict(name: &str) -> &str {
 fn scan_and_group(root_dir: &Path, stats: &TimingStats) -> Result<Metadata> {
     let mut meta = Metadata::default();
     let timings = stats.timings.lock().unwrap();
+    let metrics = stats.metrics.lock().unwrap();
 
     for entry in walkdir::WalkDir::new(root_dir)
         .into_iter()
@@ -159,6 +191,9 @@ fn scan_and_group(root_dir: &Path, stats: &TimingStats) -> Result<Metadata> {
             tracing::warn!("Key {timing_key} was not found");
             0
         };
+        if let Some(dict_metrics) = metrics.get(&timing_key) {
+            meta.metrics.insert(timing_key, dict_metrics.into());
+        }
 
         let target_info = TargetInfo { size };
 
@@ -207,5 +242,11 @@ pub fn write_dict_metadata(
     let out_path = Path::new("docs/release_metadata.json");
     std::fs::write(out_path, &json)?;
     println!("[meta] Dict metadata written to {}", out_path.display());
+
+    let metrics: BTreeMap<_, _> = stats.metrics.lock().unwrap().clone().into_iter().collect();
+    let json = serde_json::to_string_pretty(&metrics)?;
+    let out_path = root_dir.join(METRICS_FILENAME);
+    std::fs::write(&out_path, &json)?;
+    println!("[meta] Dict metrics written to {}", out_path.display());
     Ok(())
 }
@@ -12,49 +12,59 @@ use std::{
 };
 
 use anyhow::Result;
-use rayon::ThreadPoolBuilder;
 use rayon::prelude::*;
 use rusqlite::{Rows, Statement};
 
 mod db;
+mod fan_out;
 mod index;
+mod manifest;
 mod metadata;
+mod schedule;
 
 use db::WiktextractDb;
+use fan_out::release_editions;
 use index::extract_indexes;
+use manifest::Planner;
 use metadata::write_dict_metadata;
 
 use crate::{
     cli::{
-        DictName, GlossaryArgs, GlossaryExtendedArgs, GlossaryExtendedLangs, GlossaryLangs,
-        IpaArgs, IpaMergedArgs, IpaMergedLangs, MainArgs, MainLangs, Options, ReleaseArgs,
+        DictName, GlossaryExtendedArgs, GlossaryExtendedLangs, IpaMergedArgs, IpaMergedLangs,
+        MainArgs, MainLangs, Options, ReleaseArgs,
     },
     dict::{
         DGlossary, DGlossaryExtended, DIpa, DIpaMerged, DMain, Dictionary, Intermediate, Langs,
-        iter_datasets,
+        metrics::{DictMetrics, Phase, Recorder},
     },
-    download::find_or_download_jsonl,
+    download::find_or_download_dump,
     lang::{Edition, EditionSpec, Lang},
     path::PathManager,
+    utils::{human_size, peak_rss},
 };
 
-const MAX_NUM_THREADS_MAIN: usize = 4;
-
 #[derive(Debug, Default)]
 struct TimingStats {
     timings: Mutex<HashMap<String, Duration>>,
+    /// Keyed as `timings`. Only for dictionaries.
+    metrics: Mutex<HashMap<String, DictMetrics>>,
 }
 
 impl TimingStats {
     fn new() -> Self {
         Self {
             timings: Mutex::new(HashMap::new()),
+            metrics: Mutex::new(HashMap::new()),
         }
     }
 
     fn record(&self, key: String, duration: Duration) {
         self.timings.lock().unwrap().insert(key, duration);
     }
+
+    fn record_metrics(&self, key: String, metrics: DictMetrics) {
+        self.metrics.lock().unwrap().insert(key, metrics);
+    }
 }
 
 /// Build a dictionary release.
@@ -77,29 +87,31 @@ pub fn release(rargs: ReleaseArgs) -> Result<()> {
     );
 
     // First, download all jsonlines to prevent races when creating databases.
-    //
-    // NOTE: For some reason this takes time even when db are init, why?
     let _ = std::fs::create_dir(&rargs.root_dir);
     let db_stats = TimingStats::new();
-    download_and_create_db(&rargs, &editions, &db_stats);
+    if !rargs.dry_run {
+        download_and_create_db(&rargs, &editions, &db_stats);
+    }
 
     let start = Instant::now();
     let stats = TimingStats::new();
+    let planner = Planner::new(&rargs, &editions)?;
 
-    editions.iter().for_each(|edition| {
-        release_main(&rargs, *edition, &stats);
-        release_ipa(&rargs, *edition, &stats);
-        release_glossary(&rargs, *edition, &stats);
-    });
+    release_editions(&rargs, &editions, &planner, &stats)?;
 
     let targets = Lang::all();
     // let targets = [Lang::Afb];
     // let targets: Vec<Lang> = editions.iter().map(|ed| (*ed).into()).collect();
     targets.par_iter().for_each(|target| {
-        release_ipa_merged(&rargs, *target, &stats);
+        release_ipa_merged(&rargs, *target, &editions, &planner, &stats);
         // release_glossary_extended(*target, &stats);
     });
 
+    planner.finish(&rargs.root_dir)?;
+    if rargs.dry_run {
+        return Ok(());
+    }
+
     let elapsed = start.elapsed();
     println!("Finished dictionaries in {elapsed:.2?}");
 
@@ -116,6 +128,7 @@ fn download_and_create_db(rargs: &ReleaseArgs, editions: &[Edition], stats: &Tim
     let dir_kaik = rargs.root_dir.join("kaikki"); // cf. same function @ path.rs
     let _ = std::fs::create_dir(dir_kaik);
 
+    let decisions = Mutex::new(Vec::new());
     editions.par_iter().for_each(|edition| {
         let args = MainArgs {
             langs: MainLangs {
@@ -132,28 +145,43 @@ fn download_and_create_db(rargs: &ReleaseArgs, editions: &[Edition], stats: &Tim
         let pm: &PathManager = &args.try_into().unwrap();
 
         let now = Instant::now();
-        let path_jsonl = find_or_download_jsonl(*edition, None, pm).unwrap();
+        let path_dump = find_or_download_dump(*edition, pm, rargs.keep_jsonl).unwrap();
         println!("Finished download for {edition} ({:.2?})", now.elapsed());
 
         let now = Instant::now();
-        let _ = WiktextractDb::create(rargs.root_dir.clone(), *edition, path_jsonl).unwrap();
-        stats.record(edition.to_string(), now.elapsed());
-        println!("Finished database for {edition} ({:.2?})", now.elapsed());
+        let (_, decision) = WiktextractDb::create(&rargs.root_dir, *edition, &path_dump).unwrap();
+        let elapsed = now.elapsed();
+        decisions.lock().unwrap().push((*edition, decision, elapsed));
+        stats.record(edition.to_string(), elapsed);
+        // Editions are imported in parallel, so the peak RSS can not be told apart per
+        // edition: it is that of the whole process, up to now.
+        let peak = peak_rss().map_or_else(|| "?".to_string(), |rss| human_size(rss as f64));
+        println!(
+            "Finished database for {edition} ({decision} in {elapsed:.2?}, process peak RSS so far {peak})"
+        );
     });
 
     println!("Finished download & db creation in {:.2?}", start.elapsed());
+
+    let mut decisions = decisions.into_inner().unwrap();
+    decisions.sort_by_key(|(edition, _, _)| editions.iter().position(|ed| ed == edition));
+    println!("{:<8} {:<12} Database", "Edition", "Time");
+    for (edition, decision, elapsed) in decisions {
+        let elapsed = format!("{elapsed:.2?}");
+        println!("{:<8} {elapsed:<12} {decision}", edition.to_string());
+    }
 }
 
 // Pretty print utility
+//
+// Returns the timing key and the duration.
 fn pp(
     dict_name: &str,
     first_lang: Lang,
     second_lang: Option<Lang>,
-    time: Instant,
+    duration: Duration,
     stats: &TimingStats,
-) {
-    let duration = time.elapsed();
-
+) -> (String, Duration) {
     let key = match second_lang {
         Some(second_lang) => format!("{dict_name}-{first_lang}-{second_lang}"),
         None => format!("{dict_name}-{first_lang}"),
@@ -162,87 +190,18 @@ fn pp(
     stats.record(key.clone(), duration);
 
     // let label = format!("[{}]", key);
-    // eprintln!("{label:<20} done in {:.2?}", time.elapsed());
-}
+    // eprintln!("{label:<20} done in {duration:.2?}");
 
-fn release_main(rargs: &ReleaseArgs, edition: Edition, stats: &TimingStats) {
-    // Limit only this workload (as opposed to the full logic. IPA and glossaries are completely
-    // fine and will never OOM).
-    let pool = ThreadPoolBuilder::new()
-        // 2 seems fine with a MemoryMax of 20GB (works on my machine TM)
-        // 8 is fine for testing with only English/German/French editions
-        .num_threads(MAX_NUM_THREADS_MAIN)
-        .build()
-        .expect("Failed to build local thread pool");
-
-    pool.install(|| {
-        Lang::all().par_iter().for_each(|source| {
-            let start = Instant::now();
-
-            let langs = match (edition, source) {
-                (Edition::Simple, Lang::Simple) => MainLangs {
-                    source: *source,
-                    target: edition,
-                },
-                (Edition::Simple, _) | (_, Lang::Simple) => return,
-                _ => MainLangs {
-                    source: *source,
-                    target: edition,
-                },
-            };
-
-            let args = MainArgs {
-                langs,
-                dict_name: DictName::default(),
-                options: Options {
-                    quiet: true,
-                    root_dir: rargs.root_dir.clone(),
-                    ..Default::default()
-                },
-            };
-
-            match make_dict_from_db(DMain, args) {
-                Ok(()) => pp("main", *source, Some(edition.into()), start, stats),
-                Err(err) => tracing::error!("[main-{source}-{edition}] ERROR: {err:?}"),
-            }
-        });
-    });
+    (key, duration)
 }
 
-fn release_ipa(rargs: &ReleaseArgs, edition: Edition, stats: &TimingStats) {
-    Lang::all().par_iter().for_each(|source| {
-        let start = Instant::now();
-
-        let langs = match (edition, source) {
-            (Edition::Simple, Lang::Simple) => MainLangs {
-                source: *source,
-                target: edition,
-            },
-            (Edition::Simple, _) | (_, Lang::Simple) => return,
-            _ => MainLangs {
-                source: *source,
-                target: edition,
-            },
-        };
-
-        let args = IpaArgs {
-            langs,
-            dict_name: DictName::default(),
-            options: Options {
-                quiet: true,
-                root_dir: rargs.root_dir.clone(),
-                ..Default::default()
-            },
-        };
-
-        match make_dict_from_db(DIpa, args) {
-            Ok(()) => pp("ipa", *source, Some(edition.into()), start, stats),
-            Err(err) => tracing::error!("[ipa-{source}-{edition}] ERROR: {err:?}"),
-        }
-    });
-}
-
-fn release_ipa_merged(rargs: &ReleaseArgs, target: Lang, stats: &TimingStats) {
+fn release_ipa_merged(
+    rargs: &ReleaseArgs,
+    target: Lang,
+    editions: &[Edition],
+    planner: &Planner,
+    stats: &TimingStats,
+) {
     let start = Instant::now();
 
     let langs = match target {
@@ -250,8 +209,14 @@ fn release_ipa_merged(rargs: &ReleaseArgs, target: Lang, stats: &TimingStats) {
         _ => IpaMergedLangs { target },
     };
 
-    let args = IpaMergedArgs {
-        langs,
+    let job = format!("ipa-merged-{target}");
+    let slices: Vec<_> = editions.iter().map(|edition| (*edition, target)).collect();
+    let Some(mut record) = planner.plan(&job, &slices, stats) else {
+        return;
+    };
+
+    let args = || IpaMergedArgs {
+        langs: langs.clone(),
         dict_name: DictName::default(),
         options: Options {
             quiet: true,
@@ -260,43 +225,22 @@ fn release_ipa_merged(rargs: &ReleaseArgs, target: Lang, stats: &TimingStats) {
         },
     };
 
-    match make_dict_from_db(DIpaMerged, args) {
-        Ok(()) => pp("ipa-merged", target, None, start, stats),
+    let made = make_dict_from_db(DIpaMerged, args())
+        .and_then(|metrics| Ok((PathManager::try_from(args())?.path_dict(), metrics)));
+    match made {
+        Ok((path, metrics)) => {
+            // Nothing is written if there is no IPA for target
+            if path.exists() {
+                let (key, duration) = pp("ipa-merged", target, None, start.elapsed(), stats);
+                stats.record_metrics(key.clone(), metrics.clone());
+                record.push(path, key, duration, metrics);
+            }
+            planner.done(job, record);
+        }
         Err(err) => tracing::error!("[ipa-merged-{target}] ERROR: {err:?}"),
     }
 }
 
-fn release_glossary(rargs: &ReleaseArgs, edition: Edition, stats: &TimingStats) {
-    Lang::all().par_iter().for_each(|target| {
-        let start = Instant::now();
-
-        let langs = match (edition, target) {
-            (Edition::Simple, _) | (_, Lang::Simple) => return,
-            _ if Lang::from(edition) == *target => return,
-            _ => GlossaryLangs {
-                source: edition,
-                target: *target,
-            },
-        };
-
-        let args = GlossaryArgs {
-            langs,
-            dict_name: DictName::default(),
-            options: Options {
-                quiet: true,
-                root_dir: rargs.root_dir.clone(),
-                ..Default::default()
-            },
-        };
-
-        match make_dict_from_db(DGlossary, args) {
-            // Reverse order of main/ipa
-            Ok(()) => pp("glossary", edition.into(), Some(*target), start, stats),
-            Err(err) => tracing::error!("[glossary-{edition}-{target}] ERROR: {err:?}"),
-        }
-    });
-}
-
 #[allow(unused)]
 fn release_glossary_extended(source: Lang, stats: &TimingStats) {
     Lang::all().par_iter().for_each(|target| {
@@ -323,7 +267,10 @@ fn release_glossary_extended(source: Lang, stats: &TimingStats) {
         };
 
         match make_dict_from_db(DGlossaryExtended, args) {
-            Ok(()) => pp("gloss-all", source, Some(*target), start, stats),
+            Ok(metrics) => {
+                let (key, _) = pp("gloss-all", source, Some(*target), start.elapsed(), stats);
+                stats.record_metrics(key, metrics);
+            }
             Err(err) => tracing::error!("[gloss-all-{source}-{target}] ERROR: {err:?}"),
         }
     });
@@ -372,18 +319,25 @@ impl DQuery for DGlossary {
 }
 
 /// Make a dictionary from database made from a Kaikki jsonlines.
-pub fn make_dict_from_db<D: Dictionary + DQuery>(dict: D, raw_args: D::A) -> Result<()> {
+///
+/// Returns the metrics of its making.
+pub fn make_dict_from_db<D: Dictionary + DQuery>(dict: D, raw_args: D::A) -> Result<DictMetrics> {
     let pm: &PathManager = &raw_args.try_into()?;
-    let (_, source_pm, target_pm) = pm.langs();
+    let (edition_pm, source_pm, target_pm) = pm.langs();
     let opts = &pm.opts;
     pm.setup_dirs()?;
 
     tracing::trace!("{pm:#?}");
 
     let mut irs = D::I::default();
+    let mut recorder = Recorder::new(pm.dict_name_expanded(), opts);
 
-    for pair in iter_datasets(pm) {
-        let (edition, _path_jsonl) = pair?;
+    // Only read the databases: the dumps they were made from may be gone, or only gzipped
+    for edition in edition_pm.variants() {
+        if !WiktextractDb::db_path_for(&opts.root_dir, edition).exists() {
+            tracing::debug!("No database for {edition}: skipping it");
+            continue;
+        }
 
         let db = WiktextractDb::open(&opts.root_dir, edition)?;
         let langs = Langs {
@@ -397,7 +351,12 @@ pub fn make_dict_from_db<D: Dictionary + DQuery>(dict: D, raw_args: D::A) -> Res
 
         while let Some(row) = rows.next()? {
             let blob: &[u8] = row.get_ref(0)?.as_blob()?;
-            let mut entry = WiktextractDb::blob_to_word_entry(blob)?;
+            recorder.count(0, blob.len() as u64, 1);
+            recorder.tick(&irs)?;
+            let archived = WiktextractDb::access_entry(blob)?;
+            let Some(mut entry) = dict.from_archived(langs, archived)? else {
+                continue;
+            };
 
             if dict.skip_if(&entry) {
                 continue;
@@ -405,20 +364,23 @@ pub fn make_dict_from_db<D: Dictionary + DQuery>(dict: D, raw_args: D::A) -> Res
 
             dict.preprocess(langs, &mut entry, opts, &mut irs);
             dict.process(langs, &entry, &mut irs);
+            recorder.count(1, 0, 0);
         }
     }
 
+    recorder.ingested(&irs)?;
     if !opts.quiet {
         dict.found_ir_message(pm.langs, &irs);
     }
 
     if irs.is_empty() {
-        return Ok(());
+        return recorder.finish();
     }
 
     dict.postprocess(&mut irs);
 
+    recorder.start_phase(Phase::Write);
     opts.format.write(&dict, pm.langs, opts, pm, &irs)?;
 
-    Ok(())
+    recorder.finish()
 }
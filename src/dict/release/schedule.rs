@@ -0,0 +1,271 @@
+//! Run release jobs under a memory budget.
+//!
+//! Jobs come with an estimate of the memory they use. They are admitted, largest first,
+//! while the estimates of the running jobs fit in the budget, and smaller jobs are packed
+//! in whatever is left. This keeps big jobs from running out of memory together, without
+//! throttling small ones.
+
+use std::{
+    fmt,
+    sync::{
+        Condvar, Mutex, PoisonError,
+        atomic::{AtomicBool, AtomicU64, Ordering},
+    },
+    thread,
+    time::Duration,
+};
+
+use crate::utils::{current_rss, human_size};
+
+/// How often the resident set size is sampled.
+const RSS_SAMPLE_INTERVAL: Duration = Duration::from_millis(200);
+
+pub(super) struct Job<T> {
+    /// Estimated memory usage, in bytes.
+    pub estimate: u64,
+    pub task: T,
+}
+
+struct State<T> {
+    /// Sorted by decreasing estimate.
+    pending: Vec<Job<T>>,
+    /// Sum of the estimates of the running jobs.
+    used: u64,
+    running: usize,
+    peak_used: u64,
+}
+
+impl<T> State<T> {
+    /// The largest pending job that fits in the budget.
+    ///
+    /// A job larger than the whole budget can only run alone.
+    fn admit(&mut self, budget: u64) -> Option<Job<T>> {
+        let used = self.used;
+        let idx = match self
+            .pending
+            .iter()
+            .position(|job| used + job.estimate <= budget)
+        {
+            Some(idx) => idx,
+            None if self.running == 0 && !self.pending.is_empty() => 0,
+            None => return None,
+        };
+
+        let job = self.pending.remove(idx);
+        self.used += job.estimate;
+        self.running += 1;
+        self.peak_used = self.peak_used.max(self.used);
+        Some(job)
+    }
+}
+
+#[derive(Debug)]
+pub(super) struct ScheduleReport {
+    jobs: usize,
+    threads: usize,
+    budget: u64,
+    /// Largest sum of estimates of jobs running at the same time.
+    peak_estimate: u64,
+    /// Largest resident set size sampled while running, if available.
+    peak_rss: Option<u64>,
+}
+
+impl fmt::Display for ScheduleReport {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        write!(
+            f,
+            "Ran {} jobs on {} threads with a budget of {}: peak estimate {}, peak RSS {}",
+            self.jobs,
+            self.threads,
+            human_size(self.budget as f64),
+            human_size(self.peak_estimate as f64),
+            self.peak_rss
+                .map_or_else(|| "?".to_string(), |rss| human_size(rss as f64)),
+        )
+    }
+}
+
+/// A running job. Its estimate is given back when it ends, even if it panicked, so that the
+/// other workers are not left waiting for it.
+struct Running<'a, T> {
+    state: &'a Mutex<State<T>>,
+    admitted: &'a Condvar,
+    estimate: u64,
+}
+
+impl<T> Drop for Running<'_, T> {
+    fn drop(&mut self) {
+        let mut state = self.state.lock().unwrap_or_else(PoisonError::into_inner);
+        state.used -= self.estimate;
+        state.running -= 1;
+        self.admitted.notify_all();
+    }
+}
+
+/// Stop the resident set size sampler when dropped, even if a worker panicked.
+struct StopOnDrop<'a>(&'a AtomicBool);
+
+impl Drop for StopOnDrop<'_> {
+    fn drop(&mut self) {
+        self.0.store(true, Ordering::Relaxed);
+    }
+}
+
+/// Call `run` on the task of every job, on `threads` threads, keeping the estimated memory of
+/// the running jobs under `budget`.
+pub(super) fn run_under_budget<T, F>(
+    mut jobs: Vec<Job<T>>,
+    budget: u64,
+    threads: usize,
+    run: F,
+) -> ScheduleReport
+where
+    T: Send,
+    F: Fn(T) + Sync,
+{
+    let n_jobs = jobs.len();
+    jobs.sort_by_key(|job| std::cmp::Reverse(job.estimate));
+
+    let state = Mutex::new(State {
+        pending: jobs,
+        used: 0,
+        running: 0,
+        peak_used: 0,
+    });
+    let admitted = Condvar::new();
+    let done = AtomicBool::new(false);
+    let peak_rss = AtomicU64::new(0);
+
+    thread::scope(|scope| {
+        let _stop_sampler = StopOnDrop(&done);
+        scope.spawn(|| {
+            while !done.load(Ordering::Relaxed) {
+                if let Some(rss) = current_rss() {
+                    peak_rss.fetch_max(rss, Ordering::Relaxed);
+                }
+                thread::sleep(RSS_SAMPLE_INTERVAL);
+            }
+        });
+
+        let workers: Vec<_> = (0..threads)
+            .map(|_| {
+                scope.spawn(|| {
+                    loop {
+                        let job = {
+                            let mut state = state.lock().unwrap();
+                            loop {
+                                if state.pending.is_empty() {
+                                    return;
+                                }
+                                if let Some(job) = state.admit(budget) {
+                                    break job;
+                                }
+                                state = admitted.wait(state).unwrap();
+                            }
+                        };
+
+                        let _running = Running {
+                            state: &state,
+                            admitted: &admitted,
+                            estimate: job.estimate,
+                        };
+                        run(job.task);
+                    }
+                })
+            })
+            .collect();
+
+        for worker in workers {
+            worker.join().expect("a release worker panicked");
+        }
+    });
+
+    let peak_estimate = state.into_inner().unwrap().peak_used;
+    let peak_rss = match peak_rss.into_inner() {
+        0 => None,
+        rss => Some(rss),
+    };
+
+    ScheduleReport {
+        jobs: n_jobs,
+        threads,
+        budget,
+        peak_estimate,
+        peak_rss,
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn jobs(estimates: &[u64]) -> Vec<Job<u64>> {
+        estimates
+            .iter()
+            .map(|&estimate| Job {
+                estimate,
+                task: estimate,
+            })
+            .collect()
+    }
+
+    #[test]
+    fn admit_packs_small_jobs_around_large_ones() {
+        let mut pending = jobs(&[8, 5, 3, 1]);
+        pending.sort_by_key(|job| std::cmp::Reverse(job.estimate));
+        let mut state = State {
+            pending,
+            used: 0,
+            running: 0,
+            peak_used: 0,
+        };
+
+        assert_eq!(state.admit(10).unwrap().task, 8);
+        // 5 and 3 do not fit next to 8
+        assert_eq!(state.admit(10).unwrap().task, 1);
+        assert!(state.admit(10).is_none());
+        assert_eq!(state.peak_used, 9);
+    }
+
+    #[test]
+    fn admit_oversized_job_alone() {
+        let mut state = State {
+            pending: jobs(&[20]),
+            used: 0,
+            running: 0,
+            peak_used: 0,
+        };
+        assert_eq!(state.admit(10).unwrap().task, 20);
+    }
+
+    #[test]
+    fn run_under_budget_runs_every_job() {
+        let ran = Mutex::new(Vec::new());
+        let report = run_under_budget(jobs(&[4, 3, 20, 1, 2]), 10, 3, |task| {
+            ran.lock().unwrap().push(task);
+        });
+
+        let mut ran = ran.into_inner().unwrap();
+        ran.sort_unstable();
+        assert_eq!(ran, vec![1, 2, 3, 4, 20]);
+        assert_eq!(report.jobs, 5);
+        assert!(report.peak_estimate >= 20);
+    }
+
+    #[test]
+    fn run_under_budget_propagates_panics() {
+        let ran = Mutex::new(Vec::new());
+        let result = std::panic::catch_unwind(std::panic::AssertUnwindSafe(|| {
+            run_under_budget(jobs(&[8, 5, 3, 1]), 10, 2, |task| {
+                assert!(task != 8, "job {task} failed");
+                ran.lock().unwrap().push(task);
+            })
+        }));
+
+        // The other jobs still ran, instead of waiting for the estimate of the failed one
+        assert!(result.is_err());
+        let mut ran = ran.into_inner().unwrap();
+        ran.sort_unstable();
+        assert_eq!(ran, vec![1, 3, 5]);
+    }
+}
@@ -84,7 +84,7 @@ impl WriterFormat {
                 langs.target,
                 opts,
                 pm,
-                dict.to_yomitan(langs, irs),
+                dict.to_yomitan_groups(langs, irs),
             )?,
             Self::Ir => irs.write(pm)?,
             Self::Html => write_html(opts, pm, dict.to_yomitan(langs, irs))?,
@@ -104,12 +104,12 @@ impl WriterFormat {
                 return Ok(());
             }
             Self::TestYomitan => {
-                write_test_yomitan(opts, pm, dict.to_yomitan(langs, irs))?;
+                write_test_yomitan(opts, pm, dict.to_yomitan_groups(langs, irs))?;
                 return Ok(());
             }
             Self::TestYomitanMain => {
                 irs.write(pm)?;
-                write_test_yomitan(opts, pm, dict.to_yomitan(langs, irs))?;
+                write_test_yomitan(opts, pm, dict.to_yomitan_groups(langs, irs))?;
                 return Ok(());
             }
             Self::Skip => return Ok(()),
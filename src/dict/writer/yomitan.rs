@@ -4,48 +4,103 @@
 //! not included here and should be next to their dictionary for visibility.
 
 use std::{
+    fmt,
     fs::{self, File},
-    io::Write,
+    io::{BufWriter, Cursor, Write},
     path::{Path, PathBuf},
+    time::{Duration, Instant},
 };
 
 use anyhow::{Ok, Result};
-use zip::ZipWriter;
+use rayon::prelude::*;
 use zip::write::SimpleFileOptions;
+use zip::{ZipArchive, ZipWriter};
 
 use crate::{
     cli::Options,
     dict::index::get_index,
     lang::Lang,
-    models::yomitan::{YomitanDict, YomitanEntry},
+    models::yomitan::{EntryGroup, YomitanEntry},
     path::PathManager,
-    tags::get_tag_bank_as_tag_info,
-    utils::pretty_print_at_path,
+    tags::tag_bank_json,
+    utils::{human_size, pretty_print_at_path},
 };
 
 const BANK_SIZE: usize = 25_000;
 
+/// Banks compressed at the same time by [`Sink::ZipParallel`].
+///
+/// Every one of them is materialized, and release makes many dictionaries at once: keep it
+/// low, whatever the number of threads.
+const MAX_PARALLEL_BANKS: usize = 4;
+
 const STYLES_CSS: &[u8] = include_bytes!("../../../assets/styles.css");
 const STYLES_CSS_EXPERIMENTAL: &[u8] = include_bytes!("../../../assets/styles_experimental.css");
 
 enum Sink<'a> {
     Disk,
     Zip(&'a mut ZipWriter<File>, SimpleFileOptions),
+    /// Banks are serialized and compressed on the rayon pool, then copied as is to the zip.
+    ZipParallel(&'a mut ZipWriter<File>, SimpleFileOptions),
+}
+
+/// How long it took to write a zip, and how much it was compressed.
+struct ZipReport {
+    elapsed: Duration,
+    /// Sum of the sizes of the files in the zip.
+    size: u64,
+    /// Sum of the compressed sizes of the files in the zip.
+    compressed_size: u64,
+}
+
+impl ZipReport {
+    /// Read the sizes from the central directory of the zip at `path`.
+    fn new(path: &Path, elapsed: Duration) -> Result<Self> {
+        let mut archive = ZipArchive::new(File::open(path)?)?;
+        let mut size = 0;
+        let mut compressed_size = 0;
+        for idx in 0..archive.len() {
+            let file = archive.by_index_raw(idx)?;
+            size += file.size();
+            compressed_size += file.compressed_size();
+        }
+        Ok(Self {
+            elapsed,
+            size,
+            compressed_size,
+        })
+    }
+}
+
+impl fmt::Display for ZipReport {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        write!(
+            f,
+            "Zipped in {:.2?}: {} > {} ({:.1}%)",
+            self.elapsed,
+            human_size(self.size as f64),
+            human_size(self.compressed_size as f64),
+            100.0 * self.compressed_size as f64 / self.size.max(1) as f64,
+        )
+    }
 }
 
 // no metadata - writes to disk
-pub fn write_test_yomitan(opts: &Options, pm: &PathManager, ydict: YomitanDict) -> Result<PathBuf> {
+pub fn write_test_yomitan(
+    opts: &Options,
+    pm: &PathManager,
+    groups: Vec<EntryGroup>,
+) -> Result<PathBuf> {
     let out_dir = pm.dir_temp_dict();
     fs::create_dir_all(&out_dir)?;
 
     let mut bank_index = 0;
-    for group in ydict.into_iter_grouped() {
+    for group in groups {
         write_banks(
             opts.pretty,
             opts.quiet,
-            &group.entries,
+            group,
             &mut bank_index,
-            group.label,
             &out_dir,
             Sink::Disk,
         )?;
@@ -54,21 +109,23 @@ pub fn write_test_yomitan(opts: &Options, pm: &PathManager, ydict: YomitanDict)
     Ok(out_dir)
 }
 
-/// Write a [`YomitanDict`] to a sink (either disk or zip).
+/// Write the groups of a yomitan dictionary to a zip, with its metadata (index, css etc.).
 ///
-/// When zipping, also write metadata (index, css etc.).
+/// Entries are consumed as they are written, so they do not need to be all in memory.
 pub fn write_yomitan(
     source: Lang,
     target: Lang,
     opts: &Options,
     pm: &PathManager,
-    ydict: YomitanDict,
+    groups: Vec<EntryGroup>,
 ) -> Result<PathBuf> {
+    let start = Instant::now();
     let writer_path = pm.path_dict();
     let writer_file = File::create(&writer_path)?;
     let mut zip = ZipWriter::new(writer_file);
-    let zip_opts =
-        SimpleFileOptions::default().compression_method(zip::CompressionMethod::Deflated);
+    let zip_opts = SimpleFileOptions::default()
+        .compression_method(zip::CompressionMethod::Deflated)
+        .compression_level(opts.compression_level);
 
     // Zip index.json
     let index_string = get_index(pm.dict_ty, &pm.dict_name_expanded(), source, target);
@@ -84,84 +141,153 @@ pub fn write_yomitan(
     }
 
     // Zip a (potentially localized) version without aliases of tag_bank_term.json
-    let tag_bank = get_tag_bank_as_tag_info(target);
-    let tag_bank_bytes = serde_json::to_vec_pretty(&tag_bank)?;
     zip.start_file("tag_bank_1.json", zip_opts)?; // it needs to end in _1
-    zip.write_all(&tag_bank_bytes)?;
+    zip.write_all(tag_bank_json(target))?;
 
     let mut bank_index = 0;
-    for group in ydict.into_iter_grouped() {
+    for group in groups {
+        let sink = if opts.parallel_zip {
+            Sink::ZipParallel(&mut zip, zip_opts)
+        } else {
+            Sink::Zip(&mut zip, zip_opts)
+        };
         write_banks(
             opts.pretty,
             opts.quiet,
-            &group.entries,
+            group,
             &mut bank_index,
-            group.label,
             &writer_path,
-            Sink::Zip(&mut zip, zip_opts),
+            sink,
         )?;
     }
 
     zip.finish()?;
 
+    let report = ZipReport::new(&writer_path, start.elapsed())?;
+    tracing::debug!("{report} @ {}", writer_path.display());
+    if !opts.quiet {
+        println!("{report}");
+    }
+
     Ok(writer_path)
 }
 
-/// Writes `yomitan_entries` in banks to a sink (either disk or zip).
+fn write_bank(writer: impl Write, bank: &[YomitanEntry], pretty: bool) -> Result<()> {
+    let mut writer = BufWriter::with_capacity(1 << 16, writer);
+    if pretty {
+        serde_json::to_writer_pretty(&mut writer, bank)?;
+    } else {
+        serde_json::to_writer(&mut writer, bank)?;
+    }
+    writer.flush()?;
+    Ok(())
+}
+
+/// A zip holding only the bank, compressed with `zip_options`.
+///
+/// Its single file can then be copied, without recompressing it, to the dictionary zip.
+fn compress_bank(
+    bank: &[YomitanEntry],
+    bank_name: &str,
+    pretty: bool,
+    zip_options: SimpleFileOptions,
+) -> Result<Vec<u8>> {
+    let mut zip = ZipWriter::new(Cursor::new(Vec::new()));
+    zip.start_file(bank_name, zip_options)?;
+    write_bank(&mut zip, bank, pretty)?;
+    Ok(zip.finish()?.into_inner())
+}
+
+/// Writes the entries of `group` in banks to a sink (either disk or zip).
+///
+/// Banks are made and serialized straight into the sink one at a time or, when compressing
+/// in parallel, up to [`MAX_PARALLEL_BANKS`] at a time.
 #[tracing::instrument(skip_all, level = "DEBUG")]
 fn write_banks(
     pretty: bool,
     quiet: bool,
-    yomitan_entries: &[YomitanEntry],
+    group: EntryGroup,
     bank_index: &mut usize,
-    label: &'static str,
     out_dir: &Path,
     mut sink: Sink,
 ) -> Result<()> {
+    let EntryGroup { label, entries } = group;
+
+    // Only known upfront if the group was materialized
+    let total_bank_num = match entries.size_hint() {
+        (lower, Some(upper)) if lower == upper => Some(lower.div_ceil(BANK_SIZE)),
+        _ => None,
+    };
+
+    let mut entries = entries.peekable();
     // NOTE: this assumes that once a type is passed, all the remaining entries are of same type
-    let bank_name_prefix = match yomitan_entries.first() {
+    let bank_name_prefix = match entries.peek() {
         Some(first) => first.file_prefix(),
         None => return Ok(()),
     };
 
-    let total_bank_num = yomitan_entries.len().div_ceil(BANK_SIZE);
-
-    for (bank_num, bank) in yomitan_entries.chunks(BANK_SIZE).enumerate() {
-        *bank_index += 1;
-
-        let json_bytes = if pretty {
-            serde_json::to_vec_pretty(&bank)?
-        } else {
-            serde_json::to_vec(&bank)?
-        };
+    let banks_at_once = match sink {
+        Sink::ZipParallel(..) => rayon::current_num_threads().min(MAX_PARALLEL_BANKS),
+        Sink::Disk | Sink::Zip(..) => 1,
+    };
 
-        let bank_name = format!("{bank_name_prefix}_{bank_index}.json");
-        let file_path = out_dir.join(&bank_name);
+    let mut bank_num = 0;
+    let mut banks: Vec<(String, Vec<YomitanEntry>)> = Vec::with_capacity(banks_at_once);
+    loop {
+        banks.clear();
+        while banks.len() < banks_at_once {
+            let bank: Vec<_> = entries.by_ref().take(BANK_SIZE).collect();
+            if bank.is_empty() {
+                break;
+            }
+            *bank_index += 1;
+            banks.push((format!("{bank_name_prefix}_{bank_index}.json"), bank));
+        }
+        if banks.is_empty() {
+            break;
+        }
 
         match sink {
             Sink::Disk => {
-                let mut file = File::create(&file_path)?;
-                file.write_all(&json_bytes)?;
+                for (bank_name, bank) in &banks {
+                    write_bank(File::create(out_dir.join(bank_name))?, bank, pretty)?;
+                }
             }
             Sink::Zip(ref mut zip, zip_options) => {
-                zip.start_file(&bank_name, zip_options)?;
-                zip.write_all(&json_bytes)?;
+                for (bank_name, bank) in &banks {
+                    zip.start_file(bank_name, zip_options)?;
+                    write_bank(&mut **zip, bank, pretty)?;
+                }
+            }
+            Sink::ZipParallel(ref mut zip, zip_options) => {
+                let compressed: Vec<_> = banks
+                    .par_iter()
+                    .map(|(bank_name, bank)| compress_bank(bank, bank_name, pretty, zip_options))
+                    .collect();
+                for bytes in compressed {
+                    let mut archive = ZipArchive::new(Cursor::new(bytes?))?;
+                    zip.raw_copy_file(archive.by_index_raw(0)?)?;
+                }
             }
         }
 
-        if !quiet {
-            if bank_num > 0 {
-                print!("\r\x1b[K");
+        for (bank_name, bank) in &banks {
+            if !quiet {
+                if bank_num > 0 {
+                    print!("\r\x1b[K");
+                }
+                let total = total_bank_num.map_or_else(String::new, |total| format!("/{total}"));
+                pretty_print_at_path(
+                    &format!(
+                        "Wrote yomitan {label} bank {}{total} ({} entries)",
+                        bank_num + 1,
+                        bank.len()
+                    ),
+                    out_dir.join(bank_name),
+                );
+                std::io::stdout().flush()?;
             }
-            pretty_print_at_path(
-                &format!(
-                    "Wrote yomitan {label} bank {}/{total_bank_num} ({} entries)",
-                    bank_num + 1,
-                    bank.len()
-                ),
-                file_path,
-            );
-            std::io::stdout().flush()?;
+            bank_num += 1;
         }
     }
 
@@ -171,3 +297,67 @@ fn write_banks(
 
     Ok(())
 }
+
+#[cfg(test)]
+mod tests {
+    use std::io::Read;
+
+    use super::*;
+
+    use crate::models::yomitan::{PhoneticTranscription, TermMeta, TermPhoneticTranscription};
+
+    fn group() -> EntryGroup<'static> {
+        EntryGroup::new(
+            "meta",
+            (0..2 * BANK_SIZE + 1).map(|idx| {
+                YomitanEntry::TermMeta(TermMeta::TermPhoneticTranscription(
+                    TermPhoneticTranscription::new(
+                        format!("term{idx}"),
+                        PhoneticTranscription::default(),
+                    ),
+                ))
+            }),
+        )
+    }
+
+    /// Name and content of every file of the zip at `path`.
+    fn write_and_read(path: &Path, parallel: bool) -> Vec<(String, String)> {
+        let mut zip = ZipWriter::new(File::create(path).unwrap());
+        let zip_opts = SimpleFileOptions::default()
+            .compression_method(zip::CompressionMethod::Deflated)
+            .compression_level(Some(1));
+        let sink = if parallel {
+            Sink::ZipParallel(&mut zip, zip_opts)
+        } else {
+            Sink::Zip(&mut zip, zip_opts)
+        };
+        let mut bank_index = 0;
+        write_banks(false, true, group(), &mut bank_index, path, sink).unwrap();
+        zip.finish().unwrap();
+        assert_eq!(bank_index, 3);
+
+        let mut archive = ZipArchive::new(File::open(path).unwrap()).unwrap();
+        (0..archive.len())
+            .map(|idx| {
+                let mut file = archive.by_index(idx).unwrap();
+                let mut content = String::new();
+                file.read_to_string(&mut content).unwrap();
+                (file.name().to_string(), content)
+            })
+            .collect()
+    }
+
+    #[test]
+    fn parallel_zip_same_banks() {
+        let dir = std::env::temp_dir().join(format!("wty-zip-{}", std::process::id()));
+        fs::create_dir_all(&dir).unwrap();
+
+        let serial = write_and_read(&dir.join("serial.zip"), false);
+        let parallel = write_and_read(&dir.join("parallel.zip"), true);
+        fs::remove_dir_all(&dir).unwrap();
+
+        assert_eq!(serial.len(), 3);
+        assert_eq!(serial[2].0, "term_meta_bank_3.json");
+        assert_eq!(serial, parallel);
+    }
+}
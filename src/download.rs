@@ -1,12 +1,17 @@
 //! Utilities for downloading Kaikki jsonlines.
 
-use std::path::PathBuf;
+use std::{
+    fs::File,
+    io::{BufRead, BufReader},
+    path::{Path, PathBuf},
+};
 
 use anyhow::Result;
 
 use crate::{
     lang::{Edition, Lang},
     path::{PathKind, PathManager},
+    slice,
     utils::skip_because_file_exists,
 };
 
@@ -23,35 +28,127 @@ fn url_jsonl_gz(edition: Edition) -> Result<String> {
 }
 
 /// Try to find the jsonlines in disk, otherwise download it.
+///
+/// If `lang` is given, a fresh slice of the edition for `lang` is preferred (see
+/// [`crate::slice`]). With `--cache-filter`, the slices are cut when missing.
 pub fn find_or_download_jsonl(
     edition: Edition,
     lang: Option<Lang>,
     pm: &PathManager,
 ) -> Result<PathBuf> {
     let paths_candidates = pm.dataset_paths(edition, lang);
-    let kinds_to_check = [PathKind::Unfiltered, PathKind::Filtered];
-    let of_kind = paths_candidates.of_kind(&kinds_to_check);
+    let path_filtered = paths_candidates.of_kind(&[PathKind::Filtered]).pop();
+    let path_unfiltered = paths_candidates
+        .of_kind(&[PathKind::Unfiltered])
+        .pop()
+        .unwrap_or_else(|| {
+            panic!(
+                "No path available, \
+                 for edition={edition:?} and lang={lang:?} | {paths_candidates:?}"
+            )
+        });
+
+    if !pm.opts.redownload {
+        if let Some(path_filtered) = &path_filtered
+            && slice::is_fresh(path_filtered, &path_unfiltered)?
+        {
+            if !pm.opts.quiet {
+                skip_because_file_exists("download", path_filtered);
+            }
+            return Ok(path_filtered.clone());
+        }
 
-    if !pm.opts.redownload
-        && let Some(existing) = of_kind.iter().find(|p| p.exists())
-    {
-        if !pm.opts.quiet {
-            skip_because_file_exists("download", existing);
+        if path_unfiltered.exists() {
+            if !pm.opts.quiet {
+                skip_because_file_exists("download", &path_unfiltered);
+            }
+            return cut_if_asked(edition, lang, path_unfiltered, pm);
         }
-        return Ok(existing.clone());
     }
 
-    let path = &of_kind.into_iter().next_back().unwrap_or_else(|| {
-        panic!(
-            "No path available, \
-             for edition={edition:?} and lang={lang:?} | {paths_candidates:?}"
-        )
-    });
+    #[cfg(feature = "html")]
+    crate::download::download_jsonl(edition, &path_unfiltered, false, pm.opts.redownload)?;
+
+    cut_if_asked(edition, lang, path_unfiltered, pm)
+}
+
+/// Find the whole jsonlines of `edition` in disk, otherwise download it, without
+/// decompressing it: the path of the `.gz` is returned instead.
+///
+/// With `keep_jsonl`, this is the same as [`find_or_download_jsonl`]. Use [`open_dump`] to
+/// read the returned path.
+pub fn find_or_download_dump(
+    edition: Edition,
+    pm: &PathManager,
+    keep_jsonl: bool,
+) -> Result<PathBuf> {
+    let path_unfiltered = pm
+        .dataset_paths(edition, None)
+        .of_kind(&[PathKind::Unfiltered])
+        .pop()
+        .expect("an edition always has an unfiltered path");
+
+    if keep_jsonl || (!pm.opts.redownload && path_unfiltered.exists()) {
+        return find_or_download_jsonl(edition, None, pm);
+    }
 
     #[cfg(feature = "html")]
-    crate::download::download_jsonl(edition, path, false)?;
+    return crate::download::download_jsonl_gz(
+        edition,
+        &path_unfiltered,
+        pm.opts.quiet,
+        pm.opts.redownload,
+    );
 
-    Ok(path.clone())
+    #[cfg(not(feature = "html"))]
+    Ok(path_unfiltered)
+}
+
+/// The Last-Modified date sent by the server for the complete download of the dump at
+/// `path_dump`: either the .gz, or the jsonlines decompressed from it.
+pub fn download_last_modified(path_dump: &Path) -> Option<String> {
+    #[cfg(feature = "html")]
+    return html::last_modified(path_dump);
+
+    #[cfg(not(feature = "html"))]
+    None
+}
+
+/// Open a jsonlines, decompressing it on the fly if it is gzipped.
+pub fn open_dump(path: &Path) -> Result<Box<dyn BufRead + Send>> {
+    let capacity = 256 * (1 << 10);
+    let reader = BufReader::with_capacity(capacity, File::open(path)?);
+    if path.extension().is_some_and(|ext| ext == "gz") {
+        #[cfg(feature = "html")]
+        return Ok(Box::new(BufReader::with_capacity(
+            capacity,
+            flate2::read::GzDecoder::new(reader),
+        )));
+
+        #[cfg(not(feature = "html"))]
+        anyhow::bail!("Reading {} requires the html feature", path.display());
+    }
+    Ok(Box::new(reader))
+}
+
+/// Cut the edition into slices if asked to, and return the path of the jsonlines to read.
+fn cut_if_asked(
+    edition: Edition,
+    lang: Option<Lang>,
+    path_unfiltered: PathBuf,
+    pm: &PathManager,
+) -> Result<PathBuf> {
+    match lang {
+        Some(lang) if pm.opts.cache_filter => {
+            slice::write_slices(edition, lang, &path_unfiltered, pm)?;
+            Ok(pm
+                .dataset_paths(edition, Some(lang))
+                .of_kind(&[PathKind::Filtered])
+                .pop()
+                .expect("a language always has a filtered path"))
+        }
+        _ => Ok(path_unfiltered),
+    }
 }
 
 #[cfg(feature = "html")]
@@ -61,17 +158,113 @@ pub use html::*;
 mod html {
     use super::url_jsonl_gz;
 
-    use anyhow::Result;
+    use anyhow::{Result, bail};
     use flate2::read::GzDecoder;
-    use std::fs::File;
-    use std::io::BufWriter;
-    use std::path::Path;
+    use serde::{Deserialize, Serialize};
+    use std::ffi::OsString;
+    use std::fs::{self, File, OpenOptions};
+    use std::io::{BufReader, BufWriter, Write};
+    use std::path::{Path, PathBuf};
+    use std::time::Duration;
 
     use crate::{
         lang::Edition,
-        utils::{CHECK_C, pretty_println_at_path},
+        utils::{CHECK_C, pretty_println_at_path, skip_because_file_exists},
     };
 
+    /// How many times a download is resumed before giving up.
+    const MAX_ATTEMPTS: u32 = 5;
+
+    /// Wait before resuming a download, doubled after every attempt.
+    const RETRY_BACKOFF: Duration = Duration::from_secs(1);
+
+    /// What we know of a `.gz` download, kept next to it so that it can be resumed.
+    #[derive(Debug, Serialize, Deserialize)]
+    struct DownloadState {
+        url: String,
+        /// Content-Length of the whole file, if the server sent one.
+        size: Option<u64>,
+        last_modified: Option<String>,
+        /// Whether the whole file was downloaded and its size checked.
+        complete: bool,
+    }
+
+    impl DownloadState {
+        /// Ask the server about `url`.
+        fn remote(url: &str) -> Result<Self> {
+            let response = ureq::head(url).call()?;
+            let header = |name: &str| {
+                response
+                    .headers()
+                    .get(name)
+                    .and_then(|value| value.to_str().ok())
+                    .map(str::to_string)
+            };
+            Ok(Self {
+                url: url.to_string(),
+                size: header("content-length").and_then(|size| size.parse().ok()),
+                last_modified: header("last-modified"),
+                complete: false,
+            })
+        }
+
+        /// `data/kaikki/en-extract.jsonl.gz` >> `data/kaikki/en-extract.jsonl.gz.state.json`
+        fn path(path_gz: &Path) -> PathBuf {
+            with_suffix(path_gz, ".state.json")
+        }
+
+        /// The state of the download at `path_gz`, if any. An unreadable state counts as none.
+        fn load(path_gz: &Path) -> Option<Self> {
+            let bytes = fs::read(Self::path(path_gz)).ok()?;
+            serde_json::from_slice(&bytes).ok()
+        }
+
+        fn save(&self, path_gz: &Path) -> Result<()> {
+            fs::write(Self::path(path_gz), serde_json::to_vec(self)?)?;
+            Ok(())
+        }
+
+        /// Whether a download with this state can be continued with `remote`.
+        ///
+        /// Without a size and a modification date, there is no telling if the remote file
+        /// changed since, nor if the download is complete.
+        fn can_resume_with(&self, remote: &Self) -> bool {
+            remote.size.is_some()
+                && remote.last_modified.is_some()
+                && self.url == remote.url
+                && self.size == remote.size
+                && self.last_modified == remote.last_modified
+        }
+    }
+
+    pub(super) fn last_modified(path_dump: &Path) -> Option<String> {
+        let path_gz = if path_dump.extension().is_some_and(|ext| ext == "gz") {
+            path_dump.to_path_buf()
+        } else {
+            // The jsonlines is decompressed once the .gz is complete: if it is older, the
+            // .gz was downloaded again since, and the jsonlines is not from this download
+            let path_gz = with_suffix(path_dump, ".gz");
+            let modified = |path: &Path| fs::metadata(path).and_then(|m| m.modified()).ok();
+            if modified(path_dump)? < modified(&path_gz)? {
+                return None;
+            }
+            path_gz
+        };
+        DownloadState::load(&path_gz)
+            .filter(|state| state.complete)?
+            .last_modified
+    }
+
+    fn with_suffix(path: &Path, suffix: &str) -> PathBuf {
+        let mut name = OsString::from(path.as_os_str());
+        name.push(suffix);
+        PathBuf::from(name)
+    }
+
+    fn file_len(path: &Path) -> u64 {
+        fs::metadata(path).map_or(0, |metadata| metadata.len())
+    }
+
     // In the past, we supported downloading the post-processed, English-edition-only,
     // filtered datasets.
     // Those became deprecated cf. <https://github.com/tatuylonen/wiktextract/issues/1178>
@@ -82,33 +275,263 @@ mod html {
     /// "Raw" means that it does not include extra information, not intended for general use,
     /// that they (kaikki) use for their website generation.
     ///
-    /// Does not write the .gz file to disk.
+    /// The .gz file is kept next to `path_jsonl` (see [`download_gz`]), and only decompressed
+    /// once complete. `path_jsonl` is replaced atomically: it is never left truncated.
+    /// With `redownload`, the .gz is downloaded again even if complete.
     ///
     /// WARN: expects `path_jsonl` to be a valid path (with existing parents etc.)
-    pub fn download_jsonl(edition: Edition, path_jsonl: &Path, quiet: bool) -> Result<()> {
-        let url = url_jsonl_gz(edition)?;
+    pub fn download_jsonl(
+        edition: Edition,
+        path_jsonl: &Path,
+        quiet: bool,
+        redownload: bool,
+    ) -> Result<()> {
+        let path_gz = download_jsonl_gz(edition, path_jsonl, quiet, redownload)?;
+        decompress(&path_gz, path_jsonl)?;
+
         if !quiet {
-            println!("⬇ Downloading {url}");
+            pretty_println_at_path(&format!("{CHECK_C} Downloaded"), path_jsonl);
         }
 
-        let response = ureq::get(url).call()?;
+        Ok(())
+    }
 
-        if let Some(last_modified) = response.headers().get("last-modified") {
+    /// Download the "raw" jsonl of `edition`, like [`download_jsonl`], but do not decompress it.
+    ///
+    /// Returns the path of the .gz, next to `path_jsonl`.
+    pub fn download_jsonl_gz(
+        edition: Edition,
+        path_jsonl: &Path,
+        quiet: bool,
+        redownload: bool,
+    ) -> Result<PathBuf> {
+        let url = url_jsonl_gz(edition)?;
+        let path_gz = with_suffix(path_jsonl, ".gz");
+        download_gz(&url, &path_gz, quiet, redownload)?;
+        Ok(path_gz)
+    }
+
+    /// Download `url` to `path_gz`, resuming a previous download of the same file if any.
+    ///
+    /// The progress is kept in a state file next to `path_gz`. Dropped connections are
+    /// resumed with range requests, and a download is only complete once its size matches
+    /// the Content-Length of the server. A complete download of an unchanged remote file is
+    /// not downloaded again, unless `redownload`: then any previous download is discarded.
+    pub fn download_gz(url: &str, path_gz: &Path, quiet: bool, redownload: bool) -> Result<()> {
+        let remote = DownloadState::remote(url)?;
+        if let Some(last_modified) = &remote.last_modified {
             tracing::info!("Download was last modified: {:?}", last_modified);
         }
 
-        let reader = response.into_body().into_reader();
+        match DownloadState::load(path_gz) {
+            Some(local) if !redownload && local.can_resume_with(&remote) => {
+                if local.complete && Some(file_len(path_gz)) == remote.size {
+                    if !quiet {
+                        skip_because_file_exists("download", path_gz);
+                    }
+                    return Ok(());
+                }
+            }
+            _ => {
+                if path_gz.exists() {
+                    fs::remove_file(path_gz)?;
+                }
+                remote.save(path_gz)?;
+            }
+        }
+
+        if !quiet {
+            match file_len(path_gz) {
+                0 => println!("⬇ Downloading {url}"),
+                downloaded => println!("⬇ Resuming {url} from byte {downloaded}"),
+            }
+        }
+
+        let mut attempt = 1;
+        while let Err(err) = fetch_remaining(url, path_gz, remote.size) {
+            if attempt == MAX_ATTEMPTS {
+                return Err(err.context(format!("Gave up downloading {url}")));
+            }
+            let backoff = RETRY_BACKOFF * (1 << (attempt - 1));
+            tracing::warn!("Download of {url} interrupted ({err}), resuming in {backoff:?}");
+            std::thread::sleep(backoff);
+            attempt += 1;
+        }
+
+        DownloadState {
+            complete: true,
+            ..remote
+        }
+        .save(path_gz)
+    }
+
+    /// Append to `path_gz` the bytes of `url` it does not have yet.
+    ///
+    /// Fails if the connection ends before `size` bytes are there. What was received until
+    /// then is kept.
+    fn fetch_remaining(url: &str, path_gz: &Path, size: Option<u64>) -> Result<()> {
+        let downloaded = file_len(path_gz);
+        let resume_from = match size {
+            Some(size) if downloaded == size => return Ok(()),
+            Some(size) if downloaded < size => downloaded,
+            _ => 0,
+        };
+
+        let mut request = ureq::get(url);
+        if resume_from > 0 {
+            request = request.header("Range", format!("bytes={resume_from}-"));
+        }
+        let response = request.call()?;
+        // The server may ignore the range, and send the whole file
+        let append = resume_from > 0 && response.status().as_u16() == 206;
+
+        let file = OpenOptions::new()
+            .create(true)
+            .write(true)
+            .append(append)
+            .truncate(!append)
+            .open(path_gz)?;
+        let mut writer = BufWriter::with_capacity(1 << 20, file);
         // We can't use gzip's ureq feature because there is no content-encoding in headers
         // https://github.com/tatuylonen/wiktextract/issues/1482
-        let mut decoder = GzDecoder::new(reader);
+        let copied = std::io::copy(&mut response.into_body().into_reader(), &mut writer);
+        // Flush even on error, so that the next attempt resumes after what was received
+        writer.into_inner()?.sync_all()?;
+        copied?;
 
-        let mut writer = BufWriter::new(File::create(path_jsonl)?);
+        let downloaded = file_len(path_gz);
+        if let Some(size) = size
+            && downloaded != size
+        {
+            bail!("Connection closed after {downloaded} of {size} bytes");
+        }
+
+        Ok(())
+    }
+
+    /// Decompress `path_gz` into `path_jsonl`, through a temporary file.
+    fn decompress(path_gz: &Path, path_jsonl: &Path) -> Result<()> {
+        let path_tmp = with_suffix(path_jsonl, ".tmp");
+        let reader = BufReader::with_capacity(1 << 20, File::open(path_gz)?);
+        let mut decoder = GzDecoder::new(reader);
+        let mut writer = BufWriter::new(File::create(&path_tmp)?);
         std::io::copy(&mut decoder, &mut writer)?;
+        writer.into_inner()?.sync_all()?;
+        fs::rename(path_tmp, path_jsonl)?;
+        Ok(())
+    }
 
-        if !quiet {
-            pretty_println_at_path(&format!("{CHECK_C} Downloaded"), path_jsonl);
+    #[cfg(test)]
+    mod tests {
+        use super::*;
+
+        use std::io::{BufRead, Read};
+        use std::net::{TcpListener, TcpStream};
+        use std::sync::{
+            Arc,
+            atomic::{AtomicUsize, Ordering},
+        };
+
+        use flate2::{Compression, write::GzEncoder};
+
+        const LAST_MODIFIED: &str = "Wed, 01 Oct 2025 00:00:00 GMT";
+
+        /// Answer one request to `body`. The first GET is cut halfway through.
+        fn serve(mut stream: TcpStream, body: &[u8], gets: &AtomicUsize) {
+            let mut reader = BufReader::new(stream.try_clone().unwrap());
+            let mut request_line = String::new();
+            reader.read_line(&mut request_line).unwrap();
+            let mut range_start = 0;
+            loop {
+                let mut line = String::new();
+                reader.read_line(&mut line).unwrap();
+                if line.trim().is_empty() {
+                    break;
+                }
+                if let Some(range) = line.to_ascii_lowercase().strip_prefix("range: bytes=") {
+                    range_start = range.trim().trim_end_matches('-').parse().unwrap();
+                }
+            }
+
+            let total = body.len();
+            if request_line.starts_with("HEAD") {
+                write!(
+                    stream,
+                    "HTTP/1.1 200 OK\r\nContent-Length: {total}\r\n\
+                     Last-Modified: {LAST_MODIFIED}\r\nConnection: close\r\n\r\n"
+                )
+                .unwrap();
+                return;
+            }
+
+            let first_get = gets.fetch_add(1, Ordering::SeqCst) == 0;
+            let status = if range_start > 0 {
+                format!(
+                    "206 Partial Content\r\nContent-Range: bytes {range_start}-{}/{total}",
+                    total - 1
+                )
+            } else {
+                "200 OK".to_string()
+            };
+            write!(
+                stream,
+                "HTTP/1.1 {status}\r\nContent-Length: {}\r\nConnection: close\r\n\r\n",
+                total - range_start
+            )
+            .unwrap();
+            let end = if first_get { total / 2 } else { total };
+            let _ = stream.write_all(&body[range_start..end]);
         }
 
-        Ok(())
+        #[test]
+        fn download_resumes_after_dropped_connection() {
+            let jsonl: String = (0..20_000)
+                .map(|idx| format!("{{\"word\": \"word{idx}\"}}\n"))
+                .collect();
+            let mut encoder = GzEncoder::new(Vec::new(), Compression::default());
+            encoder.write_all(jsonl.as_bytes()).unwrap();
+            let body = Arc::new(encoder.finish().unwrap());
+
+            let listener = TcpListener::bind("127.0.0.1:0").unwrap();
+            let url = format!("http://{}/dump.jsonl.gz", listener.local_addr().unwrap());
+            let gets = Arc::new(AtomicUsize::new(0));
+            {
+                let (body, gets) = (body.clone(), gets.clone());
+                std::thread::spawn(move || {
+                    for stream in listener.incoming() {
+                        serve(stream.unwrap(), &body, &gets);
+                    }
+                });
+            }
+
+            let dir = std::env::temp_dir().join(format!("wty-download-{}", std::process::id()));
+            fs::create_dir_all(&dir).unwrap();
+            let path_gz = dir.join("dump.jsonl.gz");
+            let path_jsonl = dir.join("dump.jsonl");
+
+            download_gz(&url, &path_gz, true, false).unwrap();
+            assert_eq!(gets.load(Ordering::SeqCst), 2);
+            assert!(DownloadState::load(&path_gz).unwrap().complete);
+
+            decompress(&path_gz, &path_jsonl).unwrap();
+            let mut decompressed = String::new();
+            File::open(&path_jsonl)
+                .unwrap()
+                .read_to_string(&mut decompressed)
+                .unwrap();
+            assert_eq!(decompressed, jsonl);
+
+            // Complete and unchanged: nothing to download
+            download_gz(&url, &path_gz, true, false).unwrap();
+            assert_eq!(gets.load(Ordering::SeqCst), 2);
+
+            // Unless asked to, f.e. because the .gz is corrupt
+            fs::write(&path_gz, vec![0; body.len()]).unwrap();
+            download_gz(&url, &path_gz, true, true).unwrap();
+            assert_eq!(gets.load(Ordering::SeqCst), 3);
+            assert_eq!(fs::read(&path_gz).unwrap(), *body);
+
+            fs::remove_dir_all(&dir).unwrap();
+        }
     }
 }
@@ -6,9 +6,14 @@ pub mod download;
 pub mod lang;
 pub mod models;
 pub mod path;
+mod slice;
 mod tags;
 mod utils;
 
+// For the benches only
+#[doc(hidden)]
+pub use tags::{find_tag_in_bank, sort_tags};
+
 use fxhash::FxBuildHasher;
 use indexmap::{IndexMap, IndexSet};
 
@@ -11,6 +11,7 @@
 //! Example (el):
 //! <https://github.com/tatuylonen/wiktextract/blob/master/src/wiktextract/extractor/el/models.py>
 
+use rkyv::rancor::Error;
 use serde::{Deserialize, Serialize};
 
 use crate::tags::{BLACKLISTED_FORM_TAGS, IDENTITY_FORM_TAGS};
@@ -240,3 +241,35 @@ impl WordEntry {
         }
     }
 }
+
+// ArchivedWordEntry impls
+//
+// Entries are stored archived in the database. Most dictionaries only read a few fields, so
+// these deserialize only those, and leave the rest empty: senses and examples, by far the
+// largest part of an entry, are never allocated.
+impl ArchivedWordEntry {
+    /// Deserialize every field.
+    pub fn deserialize_all(&self) -> Result<WordEntry, Error> {
+        rkyv::deserialize::<WordEntry, Error>(self)
+    }
+
+    /// Deserialize `word`, `pos`, `lang_code`, and the fields needed to get the reading
+    /// of the word: `forms` and `sounds`.
+    pub fn deserialize_headword(&self) -> Result<WordEntry, Error> {
+        Ok(WordEntry {
+            word: self.word.as_str().to_owned(),
+            pos: self.pos.as_str().to_owned(),
+            lang_code: self.lang_code.as_str().to_owned(),
+            forms: rkyv::deserialize::<Vec<Form>, Error>(&self.forms)?,
+            sounds: rkyv::deserialize::<Vec<Sound>, Error>(&self.sounds)?,
+            ..Default::default()
+        })
+    }
+
+    /// Same as [`Self::deserialize_headword`], with `translations`.
+    pub fn deserialize_translations(&self) -> Result<WordEntry, Error> {
+        let mut entry = self.deserialize_headword()?;
+        entry.translations = rkyv::deserialize::<Vec<Translation>, Error>(&self.translations)?;
+        Ok(entry)
+    }
+}
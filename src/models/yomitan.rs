@@ -57,41 +57,41 @@ impl YomitanDict {
     /// Grouped iterator over type-erased [`YomitanEntry`].
     ///
     /// The label string should only be used to print progress to the CLI.
-    pub fn into_iter_grouped(self) -> Vec<EntryGroup> {
+    pub fn into_iter_grouped(self) -> Vec<EntryGroup<'static>> {
         vec![
             EntryGroup::new(
                 "term",
-                self.term_info
-                    .into_iter()
-                    .map(YomitanEntry::TermInfo)
-                    .collect(),
+                self.term_info.into_iter().map(YomitanEntry::TermInfo),
             ),
             EntryGroup::new(
                 "form",
                 self.term_info_form
                     .into_iter()
-                    .map(YomitanEntry::TermInfoForm)
-                    .collect(),
+                    .map(YomitanEntry::TermInfoForm),
             ),
             EntryGroup::new(
                 "meta",
-                self.term_meta
-                    .into_iter()
-                    .map(YomitanEntry::TermMeta)
-                    .collect(),
+                self.term_meta.into_iter().map(YomitanEntry::TermMeta),
             ),
         ]
     }
 }
 
-pub struct EntryGroup {
+/// Entries of the same kind, made lazily.
+///
+/// Groups are in the order of [`YomitanDict::into_iter_grouped`] (term, form, meta), but
+/// groups that are always empty can be left out.
+pub struct EntryGroup<'a> {
     pub label: &'static str,
-    pub entries: Vec<YomitanEntry>,
+    pub entries: Box<dyn Iterator<Item = YomitanEntry> + 'a>,
 }
 
-impl EntryGroup {
-    const fn new(label: &'static str, entries: Vec<YomitanEntry>) -> Self {
-        Self { label, entries }
+impl<'a> EntryGroup<'a> {
+    pub fn new(label: &'static str, entries: impl Iterator<Item = YomitanEntry> + 'a) -> Self {
+        Self {
+            label,
+            entries: Box::new(entries),
+        }
     }
 }
 
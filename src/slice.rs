@@ -0,0 +1,188 @@
+//! Per-language slices of the Kaikki jsonlines.
+//!
+//! Making a dictionary for one language reads the whole edition, most of which is of
+//! other languages. With `--cache-filter`, the first full read of an edition also
+//! writes every line to the slice of its language, at the [`PathKind::Filtered`] path
+//! (`data/kaikki/{lang}-{edition}-extract.jsonl`). Later runs, for any language, only
+//! read their slice.
+//!
+//! Next to every slice there is a small header recording the size and modification time
+//! of the edition it was cut from, so that slices are ignored once the edition is
+//! downloaded again. Slices without a header (f.e. test fixtures) are always trusted.
+//!
+//! [`PathKind::Filtered`]: crate::path::PathKind::Filtered
+
+use std::{
+    ffi::OsString,
+    fs::{self, File},
+    hash::Hasher,
+    io::{BufRead, BufReader, BufWriter, Write},
+    path::{Path, PathBuf},
+    time::UNIX_EPOCH,
+};
+
+use anyhow::{Context, Result};
+use fxhash::FxHasher64;
+use serde::{Deserialize, Serialize};
+
+use crate::{
+    Map,
+    dict::{LangCodeProbe, LineBatch},
+    download::open_dump,
+    lang::{Edition, Lang},
+    path::{PathKind, PathManager},
+    utils::{CHECK_C, pretty_println_at_path},
+};
+
+/// What a slice was cut from.
+#[derive(Debug, Serialize, Deserialize, PartialEq, Eq)]
+struct SliceHeader {
+    dump_size: u64,
+    /// Nanoseconds since the epoch.
+    dump_mtime: u128,
+}
+
+impl SliceHeader {
+    fn new(path_dump: &Path) -> Result<Self> {
+        let metadata = fs::metadata(path_dump)?;
+        Ok(Self {
+            dump_size: metadata.len(),
+            dump_mtime: metadata.modified()?.duration_since(UNIX_EPOCH)?.as_nanos(),
+        })
+    }
+}
+
+/// `data/kaikki/de-en-extract.jsonl` >> `data/kaikki/de-en-extract.jsonl.header.json`
+fn header_path(path_slice: &Path) -> PathBuf {
+    let mut name = OsString::from(path_slice.as_os_str());
+    name.push(".header.json");
+    PathBuf::from(name)
+}
+
+/// Hash of the lines of a jsonlines.
+///
+/// Lines are hashed one by one, so that the hash does not depend on how the file was
+/// read.
+#[derive(Default)]
+pub(crate) struct LineHasher(FxHasher64);
+
+impl LineHasher {
+    pub fn update(&mut self, line: &[u8]) {
+        self.0.write(line);
+    }
+
+    pub fn finish(&self) -> u64 {
+        self.0.finish()
+    }
+}
+
+/// Hash the lines of the jsonlines at `path_dump`. Gzipped ones are hashed decompressed.
+pub(crate) fn hash_dump(path_dump: &Path) -> Result<u64> {
+    let mut reader = open_dump(path_dump)?;
+    let mut line = Vec::with_capacity(1 << 10);
+    let mut hasher = LineHasher::default();
+    loop {
+        line.clear();
+        if reader.read_until(b'\n', &mut line)? == 0 {
+            break; // EOF
+        }
+        hasher.update(&line);
+    }
+    Ok(hasher.finish())
+}
+
+/// Whether the slice at `path_slice` can be read instead of the dump at `path_dump`.
+///
+/// A slice is stale if the size or the modification time of the dump changed since it
+/// was cut. The content is not hashed: a fast hash may collide, and have a stale slice
+/// read, while a digest costs about as much as cutting again. So the same dump downloaded
+/// again is cut again.
+pub fn is_fresh(path_slice: &Path, path_dump: &Path) -> Result<bool> {
+    if !path_slice.exists() {
+        return Ok(false);
+    }
+
+    let path_header = header_path(path_slice);
+    // Not made by us, or we do not have the dump anymore: nothing to compare against
+    if !path_header.exists() || !path_dump.exists() {
+        return Ok(true);
+    }
+
+    let header: SliceHeader = serde_json::from_slice(&fs::read(&path_header)?)
+        .with_context(|| format!("Error decoding slice header @ {}", path_header.display()))?;
+    Ok(header == SliceHeader::new(path_dump)?)
+}
+
+/// Cut the dump of `edition` at `path_dump` into one slice per language, in one pass.
+///
+/// Every language gets a slice, even if empty, so that none is cut again. Slices are
+/// written to temporary files first, so that an interrupted run does not leave truncated
+/// slices behind.
+pub fn write_slices(
+    edition: Edition,
+    lang: Lang,
+    path_dump: &Path,
+    pm: &PathManager,
+) -> Result<()> {
+    let quiet = pm.opts.quiet;
+    if !quiet {
+        pretty_println_at_path("Cutting into per-language slices", path_dump);
+    }
+
+    let path_slice = |lang: Lang| -> PathBuf {
+        pm.dataset_paths(edition, Some(lang))
+            .of_kind(&[PathKind::Filtered])
+            .pop()
+            .expect("a language always has a filtered path")
+    };
+    let path_tmp = |path: &Path| -> PathBuf {
+        let mut name = OsString::from(path.as_os_str());
+        name.push(".tmp");
+        PathBuf::from(name)
+    };
+
+    let header = SliceHeader::new(path_dump)?;
+    let mut reader = BufReader::with_capacity(256 * (1 << 10), File::open(path_dump)?);
+    let mut writers: Map<Lang, (PathBuf, BufWriter<File>)> = Map::default();
+    let open = |lang: Lang, writers: &mut Map<Lang, (PathBuf, BufWriter<File>)>| {
+        let path = path_slice(lang);
+        let file = File::create(path_tmp(&path))?;
+        writers.insert(lang, (path, BufWriter::new(file)));
+        anyhow::Ok(())
+    };
+
+    let mut batch = LineBatch::default();
+    while batch.fill(&mut reader)? {
+        let langs = batch.map(LangCodeProbe::lang);
+        for (idx, line_lang) in langs.into_iter().enumerate() {
+            let line = batch.line(idx);
+            // Lines of languages we do not support are not needed by any dictionary
+            let Some(line_lang) = line_lang? else {
+                continue;
+            };
+            if !writers.contains_key(&line_lang) {
+                open(line_lang, &mut writers)?;
+            }
+            writers[&line_lang].1.write_all(line)?;
+        }
+    }
+
+    for lang in Lang::all() {
+        if !writers.contains_key(&lang) {
+            open(lang, &mut writers)?;
+        }
+    }
+
+    let header_bytes = serde_json::to_vec(&header)?;
+    for (path, writer) in writers.into_values() {
+        writer.into_inner()?.sync_all()?;
+        fs::rename(path_tmp(&path), &path)?;
+        fs::write(header_path(&path), &header_bytes)?;
+    }
+
+    if !quiet {
+        pretty_println_at_path(&format!("{CHECK_C} Wrote slice"), path_slice(lang));
+    }
+
+    Ok(())
+}
@@ -1,6 +1,6 @@
 mod tags_constants;
 pub use tags_constants::Pos;
-use tags_constants::{TAG_BANK, TAG_ORDER};
+use tags_constants::{TAG_BANK, TAG_BANK_INDEX, TAG_ORDER_RANK};
 
 mod tags_localization;
 pub use tags_localization::*;
@@ -10,7 +10,6 @@ pub use merge::*;
 
 use std::cmp::Ordering;
 
-use crate::lang::Lang;
 use crate::models::kaikki::Tag;
 use crate::models::yomitan::TagInfo;
 
@@ -55,34 +54,27 @@ fn before_sep(s: &str) -> &str {
     s.split_once(TAG_SEP).map_or(s, |(before, _)| before)
 }
 
-// TODO: instead of doing TAG_ORDER.index, rewrite build.py to produce a match
-// statement that returns directly the order.
-//
+/// Position of the tag in the `tag_order.json` file, if any.
+fn tag_order_rank(tag: &str) -> Option<usize> {
+    TAG_ORDER_RANK
+        .binary_search_by_key(&tag, |&(t, _)| t)
+        .ok()
+        .map(|i| TAG_ORDER_RANK[i].1)
+}
+
 /// Sort tags by their position in the `tag_order.json` file.
 ///
 /// If a tag contains `TAG_SEP`, the substring before `TAG_SEP` is used instead.
 /// This is done so we can sort merged tags: nominative/accusative etc.
 ///
+/// Tags that are not found are sorted after the ones that are found, and keep their
+/// relative order (the sort is stable).
+///
 /// Expects (but does not check) tags WITHOUT spaces.
 pub fn sort_tags(tags: &mut [&str]) {
     debug_assert!(tags.iter().all(|tag| !tag.contains(' ')));
 
-    tags.sort_by(|a, b| {
-        let bef_a = before_sep(a);
-        let bef_b = before_sep(b);
-
-        let index_a = TAG_ORDER.iter().position(|&x| x == bef_a);
-        let index_b = TAG_ORDER.iter().position(|&x| x == bef_b);
-
-        match (index_a, index_b) {
-            (Some(i), Some(j)) => i.cmp(&j),   // both found → compare positions
-            (Some(_), None) => Ordering::Less, // found beats not-found
-            (None, Some(_)) => Ordering::Greater,
-            // This seems better but it's different from the original
-            // (None, None) => a.cmp(b),        // neither found → alphabetical fallback
-            (None, None) => Ordering::Equal, // neither found → do nothing
-        }
-    });
+    tags.sort_by_key(|tag| tag_order_rank(before_sep(tag)).unwrap_or(usize::MAX));
 }
 
 /// Sort tags by word-by-word lexicographical similarity, grouping tags that
@@ -150,52 +142,19 @@ fn tags_are_subset(a: &str, b: &str) -> bool {
         .all(|a_word| b.split(' ').any(|b_word| b_word == a_word))
 }
 
-// Note that while target is an Edition for the main dictionary, it can be any Lang
-// for the glossary dictionary, which also uses tags.
-//
-/// Return a Vec<[`TagInfo`]> from `TAG_BANK` (`tag_bank_terms.json`).
-pub fn get_tag_bank_as_tag_info(target: Lang) -> Vec<TagInfo> {
-    if has_locale(target) {
-        TAG_BANK
-            .iter()
-            .map(
-                |&(short_tag, category, sort_order, long_tag_aliases, popularity_score)| {
-                    let (short_tag_loc, long_tag_loc) = match localize_tag(target, short_tag) {
-                        Some((short, long)) => (short, long),
-                        // This short_tag hasn't been localized yet, use the English version
-                        None => (short_tag, long_tag_aliases[0]),
-                    };
-
-                    TagInfo {
-                        short_tag: short_tag_loc.to_string(),
-                        category: category.to_string(),
-                        sort_order,
-                        long_tag: long_tag_loc.to_string(),
-                        popularity_score,
-                    }
-                },
-            )
-            .collect()
-    } else {
-        TAG_BANK.iter().map(TagInfo::new).collect()
-    }
-}
-
 /// Find the tag in `TAG_BANK` (`tag_bank_terms.json`) and return the `TagInformation` if any.
 ///
 /// Expects the long version of the tag.
 pub fn find_tag_in_bank(tag: &str) -> Option<TagInfo> {
-    TAG_BANK.iter().find_map(|entry| {
-        if entry.3.contains(&tag) {
-            Some(TagInfo::new(entry))
-        } else {
-            None
-        }
-    })
+    TAG_BANK_INDEX
+        .binary_search_by_key(&tag, |&(alias, _)| alias)
+        .ok()
+        .map(|i| TagInfo::new(&TAG_BANK[TAG_BANK_INDEX[i].1]))
 }
 
 #[cfg(test)]
 mod tests {
+    use super::tags_constants::TAG_ORDER;
     use super::*;
 
     fn to_string_vec(str_vec: &[&str]) -> Vec<String> {
@@ -231,6 +190,28 @@ mod tests {
         assert_eq!(received, expected);
     }
 
+    #[test]
+    fn tag_order_rank_matches_position() {
+        for tag in TAG_ORDER {
+            let position = TAG_ORDER.iter().position(|&x| x == tag);
+            assert_eq!(tag_order_rank(tag), position);
+        }
+    }
+
+    #[test]
+    fn find_tag_in_bank_matches_linear_search() {
+        for entry in &TAG_BANK {
+            for alias in entry.3 {
+                let expected = TAG_BANK
+                    .iter()
+                    .find(|entry| entry.3.contains(alias))
+                    .map(TagInfo::new);
+                assert_eq!(find_tag_in_bank(alias), expected);
+            }
+        }
+        assert_eq!(find_tag_in_bank("__sentinel"), None);
+    }
+
     #[test]
     fn sort_tags_with_separator() {
         let tag1 = "genitive/dative";
@@ -329,6 +310,28 @@ mod tests {
 
     use crate::{lang::Lang, models::yomitan::TagInfo};
 
+    /// Return a Vec<[`TagInfo`]> from `TAG_BANK` (`tag_bank_terms.json`).
+    ///
+    /// This is what `tag_bank_json` serializes at build time.
+    fn get_tag_bank_as_tag_info(target: Lang) -> Vec<TagInfo> {
+        TAG_BANK
+            .iter()
+            .map(|entry| {
+                let mut tag_info = TagInfo::new(entry);
+                localize_tag_info(target, &mut tag_info);
+                tag_info
+            })
+            .collect()
+    }
+
+    #[test]
+    fn tag_bank_json_matches_tag_info() {
+        for lang in [Lang::En, Lang::De, Lang::El, Lang::Ja, Lang::Fr] {
+            let expected = serde_json::to_vec_pretty(&get_tag_bank_as_tag_info(lang)).unwrap();
+            assert_eq!(tag_bank_json(lang), expected.as_slice(), "{lang:?}");
+        }
+    }
+
     #[test]
     fn locale_ja_tag_bank() {
         let tag_bank = get_tag_bank_as_tag_info(Lang::Ja);
@@ -462,6 +462,504 @@ pub static TAG_BANK: [(&str, &str, i32, &[&str], i32); 372] = [
     ("non-lemma", "", 10, &["non-lemma"], -10),
 ];
 
+/// `TAG_ORDER` sorted by tag, with the position of every tag in `TAG_ORDER`.
+pub static TAG_ORDER_RANK: [(&str, usize); 82] = [
+    ("ablative", 7),
+    ("accusative", 5),
+    ("active", 52),
+    ("adjective", 62),
+    ("adverbial", 65),
+    ("animate", 31),
+    ("aorist", 43),
+    ("archaic", 73),
+    ("augmentative", 72),
+    ("combined-form", 81),
+    ("common-gender", 29),
+    ("comparative", 32),
+    ("conditional", 45),
+    ("conditional-i", 46),
+    ("conditional-ii", 47),
+    ("dative", 4),
+    ("definite", 24),
+    ("diminutive", 68),
+    ("emphatic", 66),
+    ("feminine", 27),
+    ("first", 15),
+    ("first-person", 12),
+    ("first-person-semantically", 18),
+    ("formal", 1),
+    ("future", 38),
+    ("future-i", 39),
+    ("future-ii", 40),
+    ("genitive", 3),
+    ("gerund", 49),
+    ("hortative", 57),
+    ("imperative", 48),
+    ("imperfect", 44),
+    ("imperfective", 50),
+    ("inanimate", 30),
+    ("indefinite", 25),
+    ("indicative", 56),
+    ("infinitive", 64),
+    ("informal", 0),
+    ("instrumental", 10),
+    ("interrogative", 58),
+    ("locative", 8),
+    ("masculine", 26),
+    ("mixed", 61),
+    ("negative", 80),
+    ("neuter", 28),
+    ("nominative", 2),
+    ("non-past", 37),
+    ("noun-from-verb", 63),
+    ("object-first-person", 75),
+    ("object-plural", 79),
+    ("object-second-person", 76),
+    ("object-singular", 78),
+    ("object-third-person", 77),
+    ("participle", 54),
+    ("partitive", 9),
+    ("passive", 53),
+    ("past", 36),
+    ("perfect", 41),
+    ("perfective", 51),
+    ("pluperfect", 42),
+    ("plural", 22),
+    ("plural-only", 23),
+    ("poetic", 69),
+    ("positive", 33),
+    ("prepositional", 11),
+    ("present", 35),
+    ("rare", 71),
+    ("regional", 70),
+    ("relational", 67),
+    ("second", 16),
+    ("second-person", 13),
+    ("second-person-semantically", 19),
+    ("singular", 21),
+    ("strong", 60),
+    ("subjunctive", 55),
+    ("superlative", 34),
+    ("third", 17),
+    ("third-person", 14),
+    ("third-person-semantically", 20),
+    ("vocative", 6),
+    ("weak", 59),
+    ("with-genitive", 74),
+];
+
+/// Every long tag alias of `TAG_BANK`, sorted, with the index of its entry.
+pub static TAG_BANK_INDEX: [(&str, usize); 408] = [
+    ("Africa", 350),
+    ("Alemannic", 249),
+    ("Algeria", 304),
+    ("Argentina", 268),
+    ("Australia", 272),
+    ("Austria", 270),
+    ("Austrian German", 270),
+    ("BDSM", 109),
+    ("Bahrain", 274),
+    ("Bavaria", 297),
+    ("Bavarian", 250),
+    ("Belize", 288),
+    ("Bolivia", 275),
+    ("Bosnia", 273),
+    ("Brazil", 276),
+    ("Buddhism", 210),
+    ("Caipira", 277),
+    ("Canada", 289),
+    ("Catholicism", 111),
+    ("Central", 287),
+    ("Chakavian", 264),
+    ("Chile", 291),
+    ("Christian", 216),
+    ("Christianity", 216),
+    ("Classical-Persian", 258),
+    ("Colombia", 292),
+    ("Costa Rica", 293),
+    ("Croatia", 314),
+    ("Cuba", 294),
+    ("Cypriot", 295),
+    ("Dari", 266),
+    ("Dominican Republic", 303),
+    ("East Germany", 298),
+    ("Ecuador", 305),
+    ("Egypt", 306),
+    ("Ekavian", 259),
+    ("El Salvador", 342),
+    ("Europe", 308),
+    ("Fluminense", 278),
+    ("France", 309),
+    ("French", 309),
+    ("Gaúcho", 279),
+    ("General-Australian", 272),
+    ("Germany", 296),
+    ("Gheg", 251),
+    ("Greek", 311),
+    ("Greek mythology", 154),
+    ("Guatemala", 312),
+    ("Hinduism", 112),
+    ("Honduras", 313),
+    ("Huế", 254),
+    ("Hà-Nội", 253),
+    ("Hồ-Chí-Minh-City", 252),
+    ("Ijekavian", 261),
+    ("Ikavian", 260),
+    ("Internet", 174),
+    ("Internet slang", 97),
+    ("Iran", 317),
+    ("Iraq", 316),
+    ("Ireland", 315),
+    ("Irish", 315),
+    ("Islam", 211),
+    ("Jordan", 319),
+    ("Judaism", 217),
+    ("Kabuli", 267),
+    ("Kajkavian", 262),
+    ("Kuwait", 321),
+    ("LGBT", 113),
+    ("Latin America", 351),
+    ("Lebanon", 322),
+    ("Libya", 324),
+    ("Liechtenstein", 323),
+    ("Lviv", 355),
+    ("Mexico", 327),
+    ("Minas-Gerais", 281),
+    ("Mineiro", 280),
+    ("Montenegro", 326),
+    ("Morocco", 325),
+    ("Mozambique", 328),
+    ("New-Zealand", 330),
+    ("Nicaragua", 329),
+    ("North German", 300),
+    ("North-Brazil", 285),
+    ("Northeast-Brazil", 284),
+    ("Northern Germany", 300),
+    ("Northern-Germany", 300),
+    ("Oman", 331),
+    ("Panama", 332),
+    ("Paraguay", 337),
+    ("Peru", 333),
+    ("Philippines", 334),
+    ("Portugal", 336),
+    ("Poznań", 354),
+    ("Protestant", 115),
+    ("Protestantism", 115),
+    ("Puerto Rico", 335),
+    ("Qatar", 338),
+    ("Received-Pronunciation", 352),
+    ("Rio-de-Janeiro", 282),
+    ("Roman Catholicism", 110),
+    ("Roman mythology", 193),
+    ("Russia", 340),
+    ("Río de la Plata", 269),
+    ("Saudi Arabia", 341),
+    ("Scotland", 353),
+    ("Scottish", 353),
+    ("Serbia", 339),
+    ("South Brazil", 286),
+    ("South German", 301),
+    ("South Korea", 320),
+    ("South-German", 301),
+    ("Southern German", 301),
+    ("Spain", 307),
+    ("Swabian", 255),
+    ("Swiss Standard German", 290),
+    ("Switzerland", 290),
+    ("Syria", 343),
+    ("São-Paulo", 283),
+    ("Tajik", 344),
+    ("Tehrani", 318),
+    ("Tosk", 256),
+    ("Tunisia", 345),
+    ("UK", 310),
+    ("US", 346),
+    ("United Arab Emirates", 265),
+    ("Uruguay", 347),
+    ("Venezuela", 348),
+    ("Vienna", 271),
+    ("Warsaw", 356),
+    ("Western", 299),
+    ("X-SAMPA", 24),
+    ("Yemen", 349),
+    ("abbrev", 25),
+    ("abbreviation", 25),
+    ("adj", 49),
+    ("adj_noun", 50),
+    ("adjective", 49),
+    ("adnominal", 51),
+    ("adv", 52),
+    ("adverb", 52),
+    ("agriculture", 116),
+    ("anatomy", 117),
+    ("animate", 0),
+    ("anthropology", 118),
+    ("archaeology", 119),
+    ("archaic", 2),
+    ("architecture", 120),
+    ("arithmetic", 121),
+    ("art", 122),
+    ("article", 53),
+    ("astrology", 123),
+    ("astronomy", 225),
+    ("astrophysics", 124),
+    ("augmentative", 26),
+    ("automotive", 125),
+    ("auxiliary", 233),
+    ("auxiliary verb", 234),
+    ("aviation", 126),
+    ("banking", 127),
+    ("biblical", 128),
+    ("biochemistry", 129),
+    ("biology", 130),
+    ("botany", 218),
+    ("business", 221),
+    ("calligraphy", 215),
+    ("card games", 131),
+    ("cardinal number", 46),
+    ("cardiology", 232),
+    ("character", 54),
+    ("chemistry", 132),
+    ("chess", 133),
+    ("childish", 81),
+    ("circumfix", 27),
+    ("circumpos", 28),
+    ("colloquial", 82),
+    ("common", 239),
+    ("computer science", 135),
+    ("computing", 134),
+    ("conj", 55),
+    ("conjunction", 55),
+    ("construction", 220),
+    ("contraction", 29),
+    ("cooking", 136),
+    ("copulative", 235),
+    ("cot-caught-merger", 257),
+    ("countable", 18),
+    ("counter", 56),
+    ("criminal slang", 83),
+    ("cytology", 137),
+    ("dated", 3),
+    ("deferential", 84),
+    ("definite", 13),
+    ("derogatory", 85),
+    ("det", 57),
+    ("determiner", 57),
+    ("dialect", 240),
+    ("dialectal", 240),
+    ("diminutive", 30),
+    ("ditransitive", 75),
+    ("ditransitive verb", 75),
+    ("ecclesiastical", 138),
+    ("ecology", 139),
+    ("economics", 140),
+    ("education", 141),
+    ("electronics", 142),
+    ("engineering", 143),
+    ("entomology", 144),
+    ("ethnic slur", 86),
+    ("euphemistic", 241),
+    ("familiar", 87),
+    ("fandom slang", 88),
+    ("feminine", 15),
+    ("figurative", 242),
+    ("figuratively", 242),
+    ("film", 145),
+    ("finance", 146),
+    ("firearms", 147),
+    ("formal", 89),
+    ("fractional number", 47),
+    ("genetics", 228),
+    ("geography", 149),
+    ("geology", 150),
+    ("geometry", 151),
+    ("godan", 357),
+    ("golf", 152),
+    ("grammar", 153),
+    ("gymnastics", 155),
+    ("heraldry", 156),
+    ("higher register", 90),
+    ("historical", 157),
+    ("history", 158),
+    ("humorous", 91),
+    ("hunting", 159),
+    ("hypocoristic", 31),
+    ("ichidan", 358),
+    ("idiom", 244),
+    ("idiomatic", 243),
+    ("immunology", 160),
+    ("imperfective", 7),
+    ("imperfective only", 8),
+    ("impersonal", 236),
+    ("impolite", 92),
+    ("in the plural", 39),
+    ("in the singular", 40),
+    ("inanimate", 1),
+    ("indeclinable", 32),
+    ("indefinite", 14),
+    ("infix", 33),
+    ("informal", 93),
+    ("initialism", 34),
+    ("inorganic chemistry", 161),
+    ("interfix", 35),
+    ("interjection", 58),
+    ("interrogative", 19),
+    ("intj", 58),
+    ("intransitive", 76),
+    ("intransitive verb", 76),
+    ("irregular", 36),
+    ("jargon", 94),
+    ("jocular", 91),
+    ("journalism", 224),
+    ("kamiichidan", 359),
+    ("law", 162),
+    ("linguistics", 163),
+    ("literal", 245),
+    ("literally", 245),
+    ("literary", 95),
+    ("literature", 223),
+    ("logic", 164),
+    ("masculine", 16),
+    ("mathematics", 165),
+    ("mechanics", 166),
+    ("medicine", 167),
+    ("metallurgy", 168),
+    ("meteorology", 169),
+    ("military", 170),
+    ("military slang", 96),
+    ("mineralogy", 231),
+    ("mining", 213),
+    ("mixed", 360),
+    ("modern Italianate Ecclesiastical", 214),
+    ("music", 171),
+    ("mycology", 172),
+    ("mythology", 173),
+    ("name", 79),
+    ("nautical", 226),
+    ("neologism", 37),
+    ("neuter", 17),
+    ("nidan", 361),
+    ("no-plural", 41),
+    ("non-lemma", 371),
+    ("nonstandard", 246),
+    ("northern and central Germany", 302),
+    ("not comparable", 20),
+    ("not-comparable", 20),
+    ("noun", 59),
+    ("num", 60),
+    ("numeral", 60),
+    ("numismatics", 230),
+    ("object-oriented programming", 114),
+    ("obsolete", 4),
+    ("offensive", 98),
+    ("onomatopoeic", 362),
+    ("ordinal number", 48),
+    ("organic chemistry", 175),
+    ("ornithology", 176),
+    ("outdated", 5),
+    ("paleontology", 177),
+    ("participle", 71),
+    ("particle", 70),
+    ("pathology", 178),
+    ("pejorative", 99),
+    ("perfective", 9),
+    ("perfective only", 10),
+    ("personal", 237),
+    ("pharmacology", 179),
+    ("philosophy", 180),
+    ("phonetics", 181),
+    ("phonology", 182),
+    ("photography", 183),
+    ("phrase", 61),
+    ("physics", 184),
+    ("physiology", 185),
+    ("place", 370),
+    ("plural", 42),
+    ("plural only", 43),
+    ("plural-only", 43),
+    ("poetic", 100),
+    ("poetry", 186),
+    ("poker", 187),
+    ("polite", 101),
+    ("politics", 188),
+    ("pos-root", 62),
+    ("possessive", 38),
+    ("postp", 63),
+    ("postposition", 63),
+    ("prefix", 64),
+    ("prep", 65),
+    ("prep_phrase", 66),
+    ("preposition", 65),
+    ("prepositional phrase", 66),
+    ("programming", 189),
+    ("pron", 67),
+    ("pronoun", 67),
+    ("proper noun", 68),
+    ("proper-noun", 68),
+    ("proverb", 69),
+    ("psychology", 190),
+    ("punct", 363),
+    ("rail transport", 191),
+    ("rare", 6),
+    ("reflexive", 77),
+    ("reflexive verb", 77),
+    ("regional", 247),
+    ("relational", 21),
+    ("relative", 22),
+    ("religion", 227),
+    ("religious slur", 102),
+    ("rhetoric", 192),
+    ("root", 72),
+    ("school", 194),
+    ("science fiction", 195),
+    ("shimoichidan", 364),
+    ("shimonidan", 365),
+    ("singular", 44),
+    ("singular only", 45),
+    ("singular-only", 45),
+    ("slang", 103),
+    ("soccer", 212),
+    ("sociology", 196),
+    ("software", 197),
+    ("software engineering", 198),
+    ("sports", 199),
+    ("standard", 263),
+    ("statistics", 200),
+    ("strong", 366),
+    ("suffix", 73),
+    ("sumo", 201),
+    ("surgery", 202),
+    ("surname", 80),
+    ("symbol", 367),
+    ("takes a reflexive pronoun", 238),
+    ("taxonomy", 207),
+    ("technical", 104),
+    ("technology", 203),
+    ("television", 206),
+    ("tennis", 219),
+    ("text messaging", 105),
+    ("textiles", 229),
+    ("theater", 204),
+    ("theology", 205),
+    ("transitive", 78),
+    ("transitive verb", 78),
+    ("trigonometry", 222),
+    ("uncommon", 248),
+    ("uncountable", 23),
+    ("vehicles", 208),
+    ("verb", 74),
+    ("vernacular", 106),
+    ("video games", 148),
+    ("vulgar", 107),
+    ("weak", 368),
+    ("western Germany", 299),
+    ("with-accusative", 11),
+    ("with-dative", 12),
+    ("yodan", 369),
+    ("youth slang", 108),
+    ("zoology", 209),
+];
+
 #[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
 pub enum Pos {
     Adjective,
@@ -4,19 +4,34 @@
 use crate::lang::Lang;
 use crate::models::yomitan::TagInfo;
 
+/// A localized (short_tag, long_tag) for every entry of `TAG_BANK`, at the same index.
+type LocaleTable = [Option<(&'static str, &'static str)>; 372];
+
 pub const fn has_locale(lang: Lang) -> bool {
     matches!(lang, Lang::De | Lang::El | Lang::Ja)
 }
 
-pub fn localize_tag(lang: Lang, short_tag: &str) -> Option<(&'static str, &'static str)> {
+const fn locale_table(lang: Lang) -> Option<&'static LocaleTable> {
     match lang {
-        Lang::De => localize_tag_de(short_tag),
-        Lang::El => localize_tag_el(short_tag),
-        Lang::Ja => localize_tag_ja(short_tag),
+        Lang::De => Some(&TAG_LOCALE_DE),
+        Lang::El => Some(&TAG_LOCALE_EL),
+        Lang::Ja => Some(&TAG_LOCALE_JA),
         _ => None,
     }
 }
 
+/// Index in `TAG_BANK` of a short tag.
+fn short_tag_index(short_tag: &str) -> Option<usize> {
+    TAG_BANK_SHORT_INDEX
+        .binary_search_by_key(&short_tag, |&(short, _)| short)
+        .ok()
+        .map(|i| TAG_BANK_SHORT_INDEX[i].1)
+}
+
+pub fn localize_tag(lang: Lang, short_tag: &str) -> Option<(&'static str, &'static str)> {
+    locale_table(lang)?[short_tag_index(short_tag)?]
+}
+
 pub fn localize_tag_info(lang: Lang, tag_info: &mut TagInfo) {
     if let Some((short, long)) = localize_tag(lang, tag_info.short_tag.as_str()) {
         tag_info.short_tag = short.to_string();
@@ -24,183 +39,1521 @@ pub fn localize_tag_info(lang: Lang, tag_info: &mut TagInfo) {
     }
 }
 
-/// Coverage: 67/372 tags (18.0%)
-fn localize_tag_de(short_tag: &str) -> Option<(&'static str, &'static str)> {
-    match short_tag {
-        "arch" => Some(("veraltet", "veraltet")),
-        "dated" => Some(("altmod", "altmodisch")),
-        "out" => Some(("veralt", "veraltende Bedeutung")),
-        "impf" => Some(("imperf", "imperfektiv")),
-        "pf" => Some(("perf", "perfektiv")),
-        "acc" => Some(("Akk", "mit Akkusativ")),
-        "dat" => Some(("Dat", "mit Dativ")),
-        "fem" => Some(("Fem", "Femininum")),
-        "masc" => Some(("Mask", "Maskulinum")),
-        "neut" => Some(("Neut", "Neutrum")),
-        "contr" => Some(("Abkz", "Abkürzung")),
-        "irreg" => Some(("unreg", "unregelmäßig")),
-        "no-pl" => Some(("k-Pl", "kein Plural")),
-        "pl-only" => Some(("n-Pl", "nur Plural")),
-        "sg" => Some(("Sing", "Singular")),
-        "adj" => Some(("Adj", "Adjektiv")),
-        "adv" => Some(("Adv", "Adverb")),
-        "artic" => Some(("Artik", "Artikel")),
-        "conj" => Some(("Konj", "Konjunktion")),
-        "intj" => Some(("Int", "Interjektion")),
-        "n" => Some(("S", "Substantiv")),
-        "num" => Some(("Num", "Numerale")),
-        "phrase" => Some(("Wortverbindung", "Wortverbindung")),
-        "pref" => Some(("Präf", "Präfix")),
-        "prep" => Some(("Präp", "Präposition")),
-        "pron" => Some(("Pron", "Pronomen")),
-        "ptcl" => Some(("Ptkl", "Partikel")),
-        "suf" => Some(("Suf", "Suffix")),
-        "v" => Some(("V", "Verb")),
-        "vi" => Some(("Vi", "intransitives Verb")),
-        "vr" => Some(("Vr", "reflexives Verb")),
-        "vt" => Some(("Vt", "transitives Verb")),
-        "name" => Some(("Vorn", "Vorname")),
-        "col" => Some(("ums", "umgangssprachlich")),
-        "derog" => Some(("abwert", "abwertend")),
-        "jar" => Some(("Fachspr", "Fachsprache")),
-        "lit" => Some(("liter", "literarisch")),
-        "vulg" => Some(("vulgär", "vulgär")),
-        "agr" => Some(("Landwirt", "Landwirtschaft")),
-        "anat" => Some(("Anat", "Anatomie")),
-        "biol" => Some(("Bio", "Biologie")),
-        "chem" => Some(("Chem", "Chemie")),
-        "comp" => Some(("Infor", "Informatik")),
-        "ecc" => Some(("kirchl", "kirchlich")),
-        "eco" => Some(("Ökol", "Ökologie")),
-        "econ" => Some(("Wirt", "Wirtschaft")),
-        "electr" => Some(("Elek", "Elektronik")),
-        "geo" => Some(("Geogr", "Geografie")),
-        "geol" => Some(("Geol", "Geologie")),
-        "hist" => Some(("hist", "historisch")),
-        "history" => Some(("Gesch", "Geschichte")),
-        "law" => Some(("Recht", "Recht")),
-        "ling" => Some(("Ling", "Linguistik")),
-        "math" => Some(("Math", "Mathematik")),
-        "med" => Some(("Med", "Medizin")),
-        "mil" => Some(("Mil", "Militär")),
-        "myth" => Some(("Myth", "Mythologie")),
-        "philos" => Some(("Phil", "Philosophie")),
-        "physics" => Some(("Phys", "Physik")),
-        "polit" => Some(("Pol", "Politik")),
-        "psych" => Some(("Psy", "Psychologie")),
-        "sports" => Some(("Sport", "Sport")),
-        "tech" => Some(("Tech", "Technik")),
-        "zoo" => Some(("Zoo", "Zoologie")),
-        "aux" => Some(("Hvb", "Hilfsverb")),
-        "fig" => Some(("übertragen", "übertragen")),
-        "literal" => Some(("wörtlich", "wörtlich")),
-        _ => None,
+/// The (potentially localized) `tag_bank_1.json` of a dictionary, without aliases.
+///
+/// Serialized at build time, so that writers can copy it as is.
+pub const fn tag_bank_json(lang: Lang) -> &'static [u8] {
+    match lang {
+        Lang::De => include_bytes!("../../assets/tags/bank/tag_bank_1_de.json"),
+        Lang::El => include_bytes!("../../assets/tags/bank/tag_bank_1_el.json"),
+        Lang::Ja => include_bytes!("../../assets/tags/bank/tag_bank_1_ja.json"),
+        _ => include_bytes!("../../assets/tags/bank/tag_bank_1.json"),
     }
 }
 
+/// Every short tag of `TAG_BANK`, sorted, with the index of its entry.
+static TAG_BANK_SHORT_INDEX: [(&str, usize); 372] = [
+    ("Alemannic", 249),
+    ("BDSM", 109),
+    ("Bavarian", 250),
+    ("Cath", 110),
+    ("Cath✝️", 111),
+    ("Gheg", 251),
+    ("HCM", 252),
+    ("Hanoi", 253),
+    ("Hind🛕", 112),
+    ("Hue", 254),
+    ("LGBT", 113),
+    ("OOP", 114),
+    ("Prot✝️", 115),
+    ("Swabian", 255),
+    ("Tosk", 256),
+    ("XS", 24),
+    ("abbv", 25),
+    ("acc", 11),
+    ("adj", 49),
+    ("adj_noun", 50),
+    ("adn", 51),
+    ("adv", 52),
+    ("agr", 116),
+    ("anat", 117),
+    ("animate", 0),
+    ("anthro", 118),
+    ("arch", 2),
+    ("archae", 119),
+    ("archit", 120),
+    ("arithm", 121),
+    ("art", 122),
+    ("artic", 53),
+    ("astrol", 123),
+    ("astrophys", 124),
+    ("aug", 26),
+    ("auto", 125),
+    ("aux", 233),
+    ("aux-v", 234),
+    ("avio", 126),
+    ("bank", 127),
+    ("bible", 128),
+    ("biochem", 129),
+    ("biol", 130),
+    ("card-num", 46),
+    ("cards", 131),
+    ("ccm", 257),
+    ("char", 54),
+    ("chem", 132),
+    ("chess", 133),
+    ("child", 81),
+    ("circumfix", 27),
+    ("circumpos", 28),
+    ("classic", 258),
+    ("cmn", 239),
+    ("col", 82),
+    ("comp", 134),
+    ("comp-sci", 135),
+    ("conj", 55),
+    ("contr", 29),
+    ("cook", 136),
+    ("cop", 235),
+    ("count", 18),
+    ("counter", 56),
+    ("crim-sl", 83),
+    ("cyto", 137),
+    ("dat", 12),
+    ("dated", 3),
+    ("def", 13),
+    ("defer", 84),
+    ("derog", 85),
+    ("det", 57),
+    ("dialect", 240),
+    ("dim", 30),
+    ("e", 259),
+    ("ecc", 138),
+    ("eco", 139),
+    ("econ", 140),
+    ("edu", 141),
+    ("electr", 142),
+    ("eng", 143),
+    ("entom", 144),
+    ("ethn-slr", 86),
+    ("euph", 241),
+    ("fam", 87),
+    ("fan-sl", 88),
+    ("fem", 15),
+    ("fig", 242),
+    ("film", 145),
+    ("fin", 146),
+    ("firearm", 147),
+    ("formal", 89),
+    ("frac-num", 47),
+    ("game", 148),
+    ("geo", 149),
+    ("geol", 150),
+    ("geom", 151),
+    ("godan", 357),
+    ("golf", 152),
+    ("gramm", 153),
+    ("greek-myth", 154),
+    ("gymn", 155),
+    ("herald", 156),
+    ("high-reg", 90),
+    ("hist", 157),
+    ("history", 158),
+    ("humor", 91),
+    ("hunt", 159),
+    ("hypo", 31),
+    ("i", 260),
+    ("ichidan", 358),
+    ("idio", 243),
+    ("idiom", 244),
+    ("ije", 261),
+    ("immun", 160),
+    ("imp", 92),
+    ("impers", 236),
+    ("impf", 7),
+    ("impf-only", 8),
+    ("in-pl", 39),
+    ("in-sg", 40),
+    ("inanim", 1),
+    ("indecl", 32),
+    ("indef", 14),
+    ("inf", 93),
+    ("infix", 33),
+    ("init", 34),
+    ("inorg-chem", 161),
+    ("interfix", 35),
+    ("interr", 19),
+    ("intj", 58),
+    ("irreg", 36),
+    ("jar", 94),
+    ("kaj", 262),
+    ("kamiichidan", 359),
+    ("law", 162),
+    ("ling", 163),
+    ("lit", 95),
+    ("literal", 245),
+    ("log", 164),
+    ("masc", 16),
+    ("math", 165),
+    ("mech", 166),
+    ("med", 167),
+    ("metal", 168),
+    ("meteo", 169),
+    ("mil", 170),
+    ("mil-sl", 96),
+    ("mix", 360),
+    ("music", 171),
+    ("myco", 172),
+    ("myth", 173),
+    ("n", 59),
+    ("name", 79),
+    ("neol", 37),
+    ("net", 174),
+    ("net-sl", 97),
+    ("neut", 17),
+    ("nidan", 361),
+    ("no-pl", 41),
+    ("non-lemma", 371),
+    ("non-std", 246),
+    ("not-comp", 20),
+    ("num", 60),
+    ("obs", 4),
+    ("offens", 98),
+    ("onoma", 362),
+    ("ord-num", 48),
+    ("org-chem", 175),
+    ("ornit", 176),
+    ("out", 5),
+    ("paleo", 177),
+    ("path", 178),
+    ("pej", 99),
+    ("pers", 237),
+    ("pf", 9),
+    ("pf-only", 10),
+    ("pharma", 179),
+    ("philos", 180),
+    ("phonet", 181),
+    ("phonol", 182),
+    ("photo", 183),
+    ("phrase", 61),
+    ("physics", 184),
+    ("physio", 185),
+    ("pl", 42),
+    ("pl-only", 43),
+    ("poet", 100),
+    ("poetry", 186),
+    ("poker", 187),
+    ("polit", 188),
+    ("polite", 101),
+    ("pos-r", 62),
+    ("poss", 38),
+    ("postp", 63),
+    ("pref", 64),
+    ("prep", 65),
+    ("prep-phrase", 66),
+    ("program", 189),
+    ("pron", 67),
+    ("prop-n", 68),
+    ("prov", 69),
+    ("psych", 190),
+    ("ptcl", 70),
+    ("ptcpl", 71),
+    ("punct", 363),
+    ("r", 72),
+    ("rail", 191),
+    ("rare", 6),
+    ("ref-pron", 238),
+    ("regio", 247),
+    ("reltnl", 21),
+    ("reltv", 22),
+    ("rhet", 192),
+    ("rlg-slr", 102),
+    ("rome-myth", 193),
+    ("school", 194),
+    ("sci-fi", 195),
+    ("sg", 44),
+    ("sg-only", 45),
+    ("shimoichidan", 364),
+    ("shimonidan", 365),
+    ("sl", 103),
+    ("socio", 196),
+    ("soft", 197),
+    ("soft-eng", 198),
+    ("sports", 199),
+    ("stat", 200),
+    ("std", 263),
+    ("strong", 366),
+    ("suf", 73),
+    ("sumo", 201),
+    ("surg", 202),
+    ("surn", 80),
+    ("symb", 367),
+    ("tech", 203),
+    ("techncl", 104),
+    ("theater", 204),
+    ("theo", 205),
+    ("tv", 206),
+    ("txnmy", 207),
+    ("txt-msg", 105),
+    ("uncmmn", 248),
+    ("uncount", 23),
+    ("v", 74),
+    ("vdt", 75),
+    ("vehic", 208),
+    ("vern", 106),
+    ("vi", 76),
+    ("vr", 77),
+    ("vt", 78),
+    ("vulg", 107),
+    ("weak", 368),
+    ("yodan", 369),
+    ("youth-sl", 108),
+    ("zoo", 209),
+    ("ča", 264),
+    ("ૐ", 210),
+    ("☪️", 211),
+    ("⚽", 212),
+    ("⛏️", 213),
+    ("⛪", 214),
+    ("✒️", 215),
+    ("✝️", 216),
+    ("✡️", 217),
+    ("🇦🇪", 265),
+    ("🇦🇫", 266),
+    ("🇦🇫KA", 267),
+    ("🇦🇷", 268),
+    ("🇦🇷🇺🇾", 269),
+    ("🇦🇹", 270),
+    ("🇦🇹VI", 271),
+    ("🇦🇺", 272),
+    ("🇧🇦", 273),
+    ("🇧🇭", 274),
+    ("🇧🇴", 275),
+    ("🇧🇷", 276),
+    ("🇧🇷C", 277),
+    ("🇧🇷F", 278),
+    ("🇧🇷G", 279),
+    ("🇧🇷M", 280),
+    ("🇧🇷M-G", 281),
+    ("🇧🇷RdJ", 282),
+    ("🇧🇷SP", 283),
+    ("🇧🇷↗️", 284),
+    ("🇧🇷⬆️", 285),
+    ("🇧🇷⬇️", 286),
+    ("🇧🇷🎯", 287),
+    ("🇧🇿", 288),
+    ("🇨🇦", 289),
+    ("🇨🇭", 290),
+    ("🇨🇱", 291),
+    ("🇨🇴", 292),
+    ("🇨🇷", 293),
+    ("🇨🇺", 294),
+    ("🇨🇾", 295),
+    ("🇩🇪", 296),
+    ("🇩🇪BY", 297),
+    ("🇩🇪➡️", 298),
+    ("🇩🇪⬅️", 299),
+    ("🇩🇪⬆️", 300),
+    ("🇩🇪⬇️", 301),
+    ("🇩🇪🎯⬆️", 302),
+    ("🇩🇴", 303),
+    ("🇩🇿", 304),
+    ("🇪🇨", 305),
+    ("🇪🇬", 306),
+    ("🇪🇸", 307),
+    ("🇪🇺", 308),
+    ("🇫🇷", 309),
+    ("🇬🇧", 310),
+    ("🇬🇷", 311),
+    ("🇬🇹", 312),
+    ("🇭🇳", 313),
+    ("🇭🇷", 314),
+    ("🇮🇪", 315),
+    ("🇮🇶", 316),
+    ("🇮🇷", 317),
+    ("🇮🇷TE", 318),
+    ("🇯🇴", 319),
+    ("🇰🇷", 320),
+    ("🇰🇼", 321),
+    ("🇱🇧", 322),
+    ("🇱🇮", 323),
+    ("🇱🇾", 324),
+    ("🇲🇦", 325),
+    ("🇲🇪", 326),
+    ("🇲🇽", 327),
+    ("🇲🇿", 328),
+    ("🇳🇮", 329),
+    ("🇳🇿", 330),
+    ("🇴🇲", 331),
+    ("🇵🇦", 332),
+    ("🇵🇪", 333),
+    ("🇵🇭", 334),
+    ("🇵🇷", 335),
+    ("🇵🇹", 336),
+    ("🇵🇾", 337),
+    ("🇶🇦", 338),
+    ("🇷🇸", 339),
+    ("🇷🇺", 340),
+    ("🇸🇦", 341),
+    ("🇸🇻", 342),
+    ("🇸🇾", 343),
+    ("🇹🇯", 344),
+    ("🇹🇳", 345),
+    ("🇺🇸", 346),
+    ("🇺🇾", 347),
+    ("🇻🇪", 348),
+    ("🇾🇪", 349),
+    ("🌍", 370),
+    ("🌍AF", 350),
+    ("🌎", 351),
+    ("🌿", 218),
+    ("🎾", 219),
+    ("🏴󠁧󠁢󠁥󠁮󠁧󠁿", 352),
+    ("🏴󠁧󠁢󠁳󠁣󠁴󠁿", 353),
+    ("🐐", 354),
+    ("👷", 220),
+    ("💼", 221),
+    ("📐", 222),
+    ("📚", 223),
+    ("📰", 224),
+    ("🔭", 225),
+    ("🚢", 226),
+    ("🛐", 227),
+    ("🦁", 355),
+    ("🧜‍♀️", 356),
+    ("🧬", 228),
+    ("🧵", 229),
+    ("🪙", 230),
+    ("🪨", 231),
+    ("🫀", 232),
+];
+
+/// Coverage: 67/372 tags (18.0%)
+#[rustfmt::skip]
+static TAG_LOCALE_DE: LocaleTable = [
+    None, // animate
+    None, // inanim
+    Some(("veraltet", "veraltet")), // arch
+    Some(("altmod", "altmodisch")), // dated
+    None, // obs
+    Some(("veralt", "veraltende Bedeutung")), // out
+    None, // rare
+    Some(("imperf", "imperfektiv")), // impf
+    None, // impf-only
+    Some(("perf", "perfektiv")), // pf
+    None, // pf-only
+    Some(("Akk", "mit Akkusativ")), // acc
+    Some(("Dat", "mit Dativ")), // dat
+    None, // def
+    None, // indef
+    Some(("Fem", "Femininum")), // fem
+    Some(("Mask", "Maskulinum")), // masc
+    Some(("Neut", "Neutrum")), // neut
+    None, // count
+    None, // interr
+    None, // not-comp
+    None, // reltnl
+    None, // reltv
+    None, // uncount
+    None, // XS
+    None, // abbv
+    None, // aug
+    None, // circumfix
+    None, // circumpos
+    Some(("Abkz", "Abkürzung")), // contr
+    None, // dim
+    None, // hypo
+    None, // indecl
+    None, // infix
+    None, // init
+    None, // interfix
+    Some(("unreg", "unregelmäßig")), // irreg
+    None, // neol
+    None, // poss
+    None, // in-pl
+    None, // in-sg
+    Some(("k-Pl", "kein Plural")), // no-pl
+    None, // pl
+    Some(("n-Pl", "nur Plural")), // pl-only
+    Some(("Sing", "Singular")), // sg
+    None, // sg-only
+    None, // card-num
+    None, // frac-num
+    None, // ord-num
+    Some(("Adj", "Adjektiv")), // adj
+    None, // adj_noun
+    None, // adn
+    Some(("Adv", "Adverb")), // adv
+    Some(("Artik", "Artikel")), // artic
+    None, // char
+    Some(("Konj", "Konjunktion")), // conj
+    None, // counter
+    None, // det
+    Some(("Int", "Interjektion")), // intj
+    Some(("S", "Substantiv")), // n
+    Some(("Num", "Numerale")), // num
+    Some(("Wortverbindung", "Wortverbindung")), // phrase
+    None, // pos-r
+    None, // postp
+    Some(("Präf", "Präfix")), // pref
+    Some(("Präp", "Präposition")), // prep
+    None, // prep-phrase
+    Some(("Pron", "Pronomen")), // pron
+    None, // prop-n
+    None, // prov
+    Some(("Ptkl", "Partikel")), // ptcl
+    None, // ptcpl
+    None, // r
+    Some(("Suf", "Suffix")), // suf
+    Some(("V", "Verb")), // v
+    None, // vdt
+    Some(("Vi", "intransitives Verb")), // vi
+    Some(("Vr", "reflexives Verb")), // vr
+    Some(("Vt", "transitives Verb")), // vt
+    Some(("Vorn", "Vorname")), // name
+    None, // surn
+    None, // child
+    Some(("ums", "umgangssprachlich")), // col
+    None, // crim-sl
+    None, // defer
+    Some(("abwert", "abwertend")), // derog
+    None, // ethn-slr
+    None, // fam
+    None, // fan-sl
+    None, // formal
+    None, // high-reg
+    None, // humor
+    None, // imp
+    None, // inf
+    Some(("Fachspr", "Fachsprache")), // jar
+    Some(("liter", "literarisch")), // lit
+    None, // mil-sl
+    None, // net-sl
+    None, // offens
+    None, // pej
+    None, // poet
+    None, // polite
+    None, // rlg-slr
+    None, // sl
+    None, // techncl
+    None, // txt-msg
+    None, // vern
+    Some(("vulgär", "vulgär")), // vulg
+    None, // youth-sl
+    None, // BDSM
+    None, // Cath
+    None, // Cath✝️
+    None, // Hind🛕
+    None, // LGBT
+    None, // OOP
+    None, // Prot✝️
+    Some(("Landwirt", "Landwirtschaft")), // agr
+    Some(("Anat", "Anatomie")), // anat
+    None, // anthro
+    None, // archae
+    None, // archit
+    None, // arithm
+    None, // art
+    None, // astrol
+    None, // astrophys
+    None, // auto
+    None, // avio
+    None, // bank
+    None, // bible
+    None, // biochem
+    Some(("Bio", "Biologie")), // biol
+    None, // cards
+    Some(("Chem", "Chemie")), // chem
+    None, // chess
+    Some(("Infor", "Informatik")), // comp
+    None, // comp-sci
+    None, // cook
+    None, // cyto
+    Some(("kirchl", "kirchlich")), // ecc
+    Some(("Ökol", "Ökologie")), // eco
+    Some(("Wirt", "Wirtschaft")), // econ
+    None, // edu
+    Some(("Elek", "Elektronik")), // electr
+    None, // eng
+    None, // entom
+    None, // film
+    None, // fin
+    None, // firearm
+    None, // game
+    Some(("Geogr", "Geografie")), // geo
+    Some(("Geol", "Geologie")), // geol
+    None, // geom
+    None, // golf
+    None, // gramm
+    None, // greek-myth
+    None, // gymn
+    None, // herald
+    Some(("hist", "historisch")), // hist
+    Some(("Gesch", "Geschichte")), // history
+    None, // hunt
+    None, // immun
+    None, // inorg-chem
+    Some(("Recht", "Recht")), // law
+    Some(("Ling", "Linguistik")), // ling
+    None, // log
+    Some(("Math", "Mathematik")), // math
+    None, // mech
+    Some(("Med", "Medizin")), // med
+    None, // metal
+    None, // meteo
+    Some(("Mil", "Militär")), // mil
+    None, // music
+    None, // myco
+    Some(("Myth", "Mythologie")), // myth
+    None, // net
+    None, // org-chem
+    None, // ornit
+    None, // paleo
+    None, // path
+    None, // pharma
+    Some(("Phil", "Philosophie")), // philos
+    None, // phonet
+    None, // phonol
+    None, // photo
+    Some(("Phys", "Physik")), // physics
+    None, // physio
+    None, // poetry
+    None, // poker
+    Some(("Pol", "Politik")), // polit
+    None, // program
+    Some(("Psy", "Psychologie")), // psych
+    None, // rail
+    None, // rhet
+    None, // rome-myth
+    None, // school
+    None, // sci-fi
+    None, // socio
+    None, // soft
+    None, // soft-eng
+    Some(("Sport", "Sport")), // sports
+    None, // stat
+    None, // sumo
+    None, // surg
+    Some(("Tech", "Technik")), // tech
+    None, // theater
+    None, // theo
+    None, // tv
+    None, // txnmy
+    None, // vehic
+    Some(("Zoo", "Zoologie")), // zoo
+    None, // ૐ
+    None, // ☪️
+    None, // ⚽
+    None, // ⛏️
+    None, // ⛪
+    None, // ✒️
+    None, // ✝️
+    None, // ✡️
+    None, // 🌿
+    None, // 🎾
+    None, // 👷
+    None, // 💼
+    None, // 📐
+    None, // 📚
+    None, // 📰
+    None, // 🔭
+    None, // 🚢
+    None, // 🛐
+    None, // 🧬
+    None, // 🧵
+    None, // 🪙
+    None, // 🪨
+    None, // 🫀
+    Some(("Hvb", "Hilfsverb")), // aux
+    None, // aux-v
+    None, // cop
+    None, // impers
+    None, // pers
+    None, // ref-pron
+    None, // cmn
+    None, // dialect
+    None, // euph
+    Some(("übertragen", "übertragen")), // fig
+    None, // idio
+    None, // idiom
+    Some(("wörtlich", "wörtlich")), // literal
+    None, // non-std
+    None, // regio
+    None, // uncmmn
+    None, // Alemannic
+    None, // Bavarian
+    None, // Gheg
+    None, // HCM
+    None, // Hanoi
+    None, // Hue
+    None, // Swabian
+    None, // Tosk
+    None, // ccm
+    None, // classic
+    None, // e
+    None, // i
+    None, // ije
+    None, // kaj
+    None, // std
+    None, // ča
+    None, // 🇦🇪
+    None, // 🇦🇫
+    None, // 🇦🇫KA
+    None, // 🇦🇷
+    None, // 🇦🇷🇺🇾
+    None, // 🇦🇹
+    None, // 🇦🇹VI
+    None, // 🇦🇺
+    None, // 🇧🇦
+    None, // 🇧🇭
+    None, // 🇧🇴
+    None, // 🇧🇷
+    None, // 🇧🇷C
+    None, // 🇧🇷F
+    None, // 🇧🇷G
+    None, // 🇧🇷M
+    None, // 🇧🇷M-G
+    None, // 🇧🇷RdJ
+    None, // 🇧🇷SP
+    None, // 🇧🇷↗️
+    None, // 🇧🇷⬆️
+    None, // 🇧🇷⬇️
+    None, // 🇧🇷🎯
+    None, // 🇧🇿
+    None, // 🇨🇦
+    None, // 🇨🇭
+    None, // 🇨🇱
+    None, // 🇨🇴
+    None, // 🇨🇷
+    None, // 🇨🇺
+    None, // 🇨🇾
+    None, // 🇩🇪
+    None, // 🇩🇪BY
+    None, // 🇩🇪➡️
+    None, // 🇩🇪⬅️
+    None, // 🇩🇪⬆️
+    None, // 🇩🇪⬇️
+    None, // 🇩🇪🎯⬆️
+    None, // 🇩🇴
+    None, // 🇩🇿
+    None, // 🇪🇨
+    None, // 🇪🇬
+    None, // 🇪🇸
+    None, // 🇪🇺
+    None, // 🇫🇷
+    None, // 🇬🇧
+    None, // 🇬🇷
+    None, // 🇬🇹
+    None, // 🇭🇳
+    None, // 🇭🇷
+    None, // 🇮🇪
+    None, // 🇮🇶
+    None, // 🇮🇷
+    None, // 🇮🇷TE
+    None, // 🇯🇴
+    None, // 🇰🇷
+    None, // 🇰🇼
+    None, // 🇱🇧
+    None, // 🇱🇮
+    None, // 🇱🇾
+    None, // 🇲🇦
+    None, // 🇲🇪
+    None, // 🇲🇽
+    None, // 🇲🇿
+    None, // 🇳🇮
+    None, // 🇳🇿
+    None, // 🇴🇲
+    None, // 🇵🇦
+    None, // 🇵🇪
+    None, // 🇵🇭
+    None, // 🇵🇷
+    None, // 🇵🇹
+    None, // 🇵🇾
+    None, // 🇶🇦
+    None, // 🇷🇸
+    None, // 🇷🇺
+    None, // 🇸🇦
+    None, // 🇸🇻
+    None, // 🇸🇾
+    None, // 🇹🇯
+    None, // 🇹🇳
+    None, // 🇺🇸
+    None, // 🇺🇾
+    None, // 🇻🇪
+    None, // 🇾🇪
+    None, // 🌍AF
+    None, // 🌎
+    None, // 🏴󠁧󠁢󠁥󠁮󠁧󠁿
+    None, // 🏴󠁧󠁢󠁳󠁣󠁴󠁿
+    None, // 🐐
+    None, // 🦁
+    None, // 🧜‍♀️
+    None, // godan
+    None, // ichidan
+    None, // kamiichidan
+    None, // mix
+    None, // nidan
+    None, // onoma
+    None, // punct
+    None, // shimoichidan
+    None, // shimonidan
+    None, // strong
+    None, // symb
+    None, // weak
+    None, // yodan
+    None, // 🌍
+    None, // non-lemma
+];
+
 /// Coverage: 26/372 tags (7.0%)
-fn localize_tag_el(short_tag: &str) -> Option<(&'static str, &'static str)> {
-    match short_tag {
-        "arch" => Some(("απαρχ", "απαρχαιωμένο")),
-        "dated" => Some(("ξεπερ", "ξεπερασμένο")),
-        "rare" => Some(("σπάνιο", "σπάνιο")),
-        "fem" => Some(("θηλ", "θηλυκό")),
-        "masc" => Some(("αρ", "αρσενικό")),
-        "neut" => Some(("ουδ", "ουδέτερο")),
-        "pl" => Some(("πλ", "πληθυντικό")),
-        "adj" => Some(("επίθ", "επίθετο")),
-        "n" => Some(("ουσ", "ουσιαστικό")),
-        "v" => Some(("ρ", "ρήμα")),
-        "vi" => Some(("ρ.αμ", "αμετάβατο ρήμα")),
-        "vt" => Some(("ρ.μετ", "μεταβατικό ρήμα")),
-        "name" => Some(("όνομα", "όνομα")),
-        "col" => Some(("καθομιλουμένη", "καθομιλουμένη")),
-        "fam" => Some(("οικείο", "οικείο")),
-        "formal" => Some(("επίσημο", "επίσημο")),
-        "inf" => Some(("ανεπίσημο", "ανεπίσημο")),
-        "lit" => Some(("λόγιο", "λόγιο")),
-        "offens" => Some(("προσβλητικό", "προσβλητικό")),
-        "sl" => Some(("αργκό", "αργκό")),
-        "vulg" => Some(("χυδαίο", "χυδαίο")),
-        "chem" => Some(("χημεία", "χημεία")),
-        "gramm" => Some(("γραμ", "γραμματική")),
-        "physics" => Some(("φυσική", "φυσική")),
-        "fig" => Some(("μτφ", "μεταφορικά")),
-        "literal" => Some(("κυρ", "κυριολεξία")),
-        _ => None,
-    }
-}
+#[rustfmt::skip]
+static TAG_LOCALE_EL: LocaleTable = [
+    None, // animate
+    None, // inanim
+    Some(("απαρχ", "απαρχαιωμένο")), // arch
+    Some(("ξεπερ", "ξεπερασμένο")), // dated
+    None, // obs
+    None, // out
+    Some(("σπάνιο", "σπάνιο")), // rare
+    None, // impf
+    None, // impf-only
+    None, // pf
+    None, // pf-only
+    None, // acc
+    None, // dat
+    None, // def
+    None, // indef
+    Some(("θηλ", "θηλυκό")), // fem
+    Some(("αρ", "αρσενικό")), // masc
+    Some(("ουδ", "ουδέτερο")), // neut
+    None, // count
+    None, // interr
+    None, // not-comp
+    None, // reltnl
+    None, // reltv
+    None, // uncount
+    None, // XS
+    None, // abbv
+    None, // aug
+    None, // circumfix
+    None, // circumpos
+    None, // contr
+    None, // dim
+    None, // hypo
+    None, // indecl
+    None, // infix
+    None, // init
+    None, // interfix
+    None, // irreg
+    None, // neol
+    None, // poss
+    None, // in-pl
+    None, // in-sg
+    None, // no-pl
+    Some(("πλ", "πληθυντικό")), // pl
+    None, // pl-only
+    None, // sg
+    None, // sg-only
+    None, // card-num
+    None, // frac-num
+    None, // ord-num
+    Some(("επίθ", "επίθετο")), // adj
+    None, // adj_noun
+    None, // adn
+    None, // adv
+    None, // artic
+    None, // char
+    None, // conj
+    None, // counter
+    None, // det
+    None, // intj
+    Some(("ουσ", "ουσιαστικό")), // n
+    None, // num
+    None, // phrase
+    None, // pos-r
+    None, // postp
+    None, // pref
+    None, // prep
+    None, // prep-phrase
+    None, // pron
+    None, // prop-n
+    None, // prov
+    None, // ptcl
+    None, // ptcpl
+    None, // r
+    None, // suf
+    Some(("ρ", "ρήμα")), // v
+    None, // vdt
+    Some(("ρ.αμ", "αμετάβατο ρήμα")), // vi
+    None, // vr
+    Some(("ρ.μετ", "μεταβατικό ρήμα")), // vt
+    Some(("όνομα", "όνομα")), // name
+    None, // surn
+    None, // child
+    Some(("καθομιλουμένη", "καθομιλουμένη")), // col
+    None, // crim-sl
+    None, // defer
+    None, // derog
+    None, // ethn-slr
+    Some(("οικείο", "οικείο")), // fam
+    None, // fan-sl
+    Some(("επίσημο", "επίσημο")), // formal
+    None, // high-reg
+    None, // humor
+    None, // imp
+    Some(("ανεπίσημο", "ανεπίσημο")), // inf
+    None, // jar
+    Some(("λόγιο", "λόγιο")), // lit
+    None, // mil-sl
+    None, // net-sl
+    Some(("προσβλητικό", "προσβλητικό")), // offens
+    None, // pej
+    None, // poet
+    None, // polite
+    None, // rlg-slr
+    Some(("αργκό", "αργκό")), // sl
+    None, // techncl
+    None, // txt-msg
+    None, // vern
+    Some(("χυδαίο", "χυδαίο")), // vulg
+    None, // youth-sl
+    None, // BDSM
+    None, // Cath
+    None, // Cath✝️
+    None, // Hind🛕
+    None, // LGBT
+    None, // OOP
+    None, // Prot✝️
+    None, // agr
+    None, // anat
+    None, // anthro
+    None, // archae
+    None, // archit
+    None, // arithm
+    None, // art
+    None, // astrol
+    None, // astrophys
+    None, // auto
+    None, // avio
+    None, // bank
+    None, // bible
+    None, // biochem
+    None, // biol
+    None, // cards
+    Some(("χημεία", "χημεία")), // chem
+    None, // chess
+    None, // comp
+    None, // comp-sci
+    None, // cook
+    None, // cyto
+    None, // ecc
+    None, // eco
+    None, // econ
+    None, // edu
+    None, // electr
+    None, // eng
+    None, // entom
+    None, // film
+    None, // fin
+    None, // firearm
+    None, // game
+    None, // geo
+    None, // geol
+    None, // geom
+    None, // golf
+    Some(("γραμ", "γραμματική")), // gramm
+    None, // greek-myth
+    None, // gymn
+    None, // herald
+    None, // hist
+    None, // history
+    None, // hunt
+    None, // immun
+    None, // inorg-chem
+    None, // law
+    None, // ling
+    None, // log
+    None, // math
+    None, // mech
+    None, // med
+    None, // metal
+    None, // meteo
+    None, // mil
+    None, // music
+    None, // myco
+    None, // myth
+    None, // net
+    None, // org-chem
+    None, // ornit
+    None, // paleo
+    None, // path
+    None, // pharma
+    None, // philos
+    None, // phonet
+    None, // phonol
+    None, // photo
+    Some(("φυσική", "φυσική")), // physics
+    None, // physio
+    None, // poetry
+    None, // poker
+    None, // polit
+    None, // program
+    None, // psych
+    None, // rail
+    None, // rhet
+    None, // rome-myth
+    None, // school
+    None, // sci-fi
+    None, // socio
+    None, // soft
+    None, // soft-eng
+    None, // sports
+    None, // stat
+    None, // sumo
+    None, // surg
+    None, // tech
+    None, // theater
+    None, // theo
+    None, // tv
+    None, // txnmy
+    None, // vehic
+    None, // zoo
+    None, // ૐ
+    None, // ☪️
+    None, // ⚽
+    None, // ⛏️
+    None, // ⛪
+    None, // ✒️
+    None, // ✝️
+    None, // ✡️
+    None, // 🌿
+    None, // 🎾
+    None, // 👷
+    None, // 💼
+    None, // 📐
+    None, // 📚
+    None, // 📰
+    None, // 🔭
+    None, // 🚢
+    None, // 🛐
+    None, // 🧬
+    None, // 🧵
+    None, // 🪙
+    None, // 🪨
+    None, // 🫀
+    None, // aux
+    None, // aux-v
+    None, // cop
+    None, // impers
+    None, // pers
+    None, // ref-pron
+    None, // cmn
+    None, // dialect
+    None, // euph
+    Some(("μτφ", "μεταφορικά")), // fig
+    None, // idio
+    None, // idiom
+    Some(("κυρ", "κυριολεξία")), // literal
+    None, // non-std
+    None, // regio
+    None, // uncmmn
+    None, // Alemannic
+    None, // Bavarian
+    None, // Gheg
+    None, // HCM
+    None, // Hanoi
+    None, // Hue
+    None, // Swabian
+    None, // Tosk
+    None, // ccm
+    None, // classic
+    None, // e
+    None, // i
+    None, // ije
+    None, // kaj
+    None, // std
+    None, // ča
+    None, // 🇦🇪
+    None, // 🇦🇫
+    None, // 🇦🇫KA
+    None, // 🇦🇷
+    None, // 🇦🇷🇺🇾
+    None, // 🇦🇹
+    None, // 🇦🇹VI
+    None, // 🇦🇺
+    None, // 🇧🇦
+    None, // 🇧🇭
+    None, // 🇧🇴
+    None, // 🇧🇷
+    None, // 🇧🇷C
+    None, // 🇧🇷F
+    None, // 🇧🇷G
+    None, // 🇧🇷M
+    None, // 🇧🇷M-G
+    None, // 🇧🇷RdJ
+    None, // 🇧🇷SP
+    None, // 🇧🇷↗️
+    None, // 🇧🇷⬆️
+    None, // 🇧🇷⬇️
+    None, // 🇧🇷🎯
+    None, // 🇧🇿
+    None, // 🇨🇦
+    None, // 🇨🇭
+    None, // 🇨🇱
+    None, // 🇨🇴
+    None, // 🇨🇷
+    None, // 🇨🇺
+    None, // 🇨🇾
+    None, // 🇩🇪
+    None, // 🇩🇪BY
+    None, // 🇩🇪➡️
+    None, // 🇩🇪⬅️
+    None, // 🇩🇪⬆️
+    None, // 🇩🇪⬇️
+    None, // 🇩🇪🎯⬆️
+    None, // 🇩🇴
+    None, // 🇩🇿
+    None, // 🇪🇨
+    None, // 🇪🇬
+    None, // 🇪🇸
+    None, // 🇪🇺
+    None, // 🇫🇷
+    None, // 🇬🇧
+    None, // 🇬🇷
+    None, // 🇬🇹
+    None, // 🇭🇳
+    None, // 🇭🇷
+    None, // 🇮🇪
+    None, // 🇮🇶
+    None, // 🇮🇷
+    None, // 🇮🇷TE
+    None, // 🇯🇴
+    None, // 🇰🇷
+    None, // 🇰🇼
+    None, // 🇱🇧
+    None, // 🇱🇮
+    None, // 🇱🇾
+    None, // 🇲🇦
+    None, // 🇲🇪
+    None, // 🇲🇽
+    None, // 🇲🇿
+    None, // 🇳🇮
+    None, // 🇳🇿
+    None, // 🇴🇲
+    None, // 🇵🇦
+    None, // 🇵🇪
+    None, // 🇵🇭
+    None, // 🇵🇷
+    None, // 🇵🇹
+    None, // 🇵🇾
+    None, // 🇶🇦
+    None, // 🇷🇸
+    None, // 🇷🇺
+    None, // 🇸🇦
+    None, // 🇸🇻
+    None, // 🇸🇾
+    None, // 🇹🇯
+    None, // 🇹🇳
+    None, // 🇺🇸
+    None, // 🇺🇾
+    None, // 🇻🇪
+    None, // 🇾🇪
+    None, // 🌍AF
+    None, // 🌎
+    None, // 🏴󠁧󠁢󠁥󠁮󠁧󠁿
+    None, // 🏴󠁧󠁢󠁳󠁣󠁴󠁿
+    None, // 🐐
+    None, // 🦁
+    None, // 🧜‍♀️
+    None, // godan
+    None, // ichidan
+    None, // kamiichidan
+    None, // mix
+    None, // nidan
+    None, // onoma
+    None, // punct
+    None, // shimoichidan
+    None, // shimonidan
+    None, // strong
+    None, // symb
+    None, // weak
+    None, // yodan
+    None, // 🌍
+    None, // non-lemma
+];
 
 /// Coverage: 67/372 tags (18.0%)
-fn localize_tag_ja(short_tag: &str) -> Option<(&'static str, &'static str)> {
-    match short_tag {
-        "arch" => Some(("古語", "古語")),
-        "dated" => Some(("古風", "古風")),
-        "obs" => Some(("廃語", "廃語")),
-        "rare" => Some(("まれ", "まれ")),
-        "abbv" => Some(("略", "略語")),
-        "contr" => Some(("縮約", "縮約形")),
-        "adj" => Some(("形", "形容詞")),
-        "adj_noun" => Some(("形容動詞", "形容動詞")),
-        "adn" => Some(("連体詞", "連体詞")),
-        "adv" => Some(("副", "副詞")),
-        "artic" => Some(("定", "定冠詞")),
-        "conj" => Some(("接続", "接続詞")),
-        "counter" => Some(("助数詞", "助数詞")),
-        "intj" => Some(("感動詞", "感動詞")),
-        "n" => Some(("名", "名詞")),
-        "num" => Some(("数詞", "数詞")),
-        "pref" => Some(("接頭辞", "接頭辞")),
-        "prep" => Some(("前", "前置詞")),
-        "pron" => Some(("代", "代名詞")),
-        "prov" => Some(("ことわざ", "ことわざ")),
-        "ptcl" => Some(("助", "助詞")),
-        "suf" => Some(("接尾辞", "接尾辞")),
-        "v" => Some(("動", "動詞")),
-        "vi" => Some(("自動", "自動詞")),
-        "vt" => Some(("他動", "他動詞")),
-        "name" => Some(("名前", "固有名詞")),
-        "child" => Some(("幼児語", "幼児語")),
-        "humor" => Some(("滑稽", "滑稽")),
-        "inf" => Some(("非形式的", "非形式的")),
-        "lit" => Some(("文語", "文語")),
-        "offens" => Some(("蔑称", "蔑称")),
-        "pej" => Some(("軽蔑的", "軽蔑的")),
-        "sl" => Some(("俗", "俗語")),
-        "vulg" => Some(("卑語", "卑語")),
-        "anat" => Some(("解剖学", "解剖学")),
-        "archit" => Some(("建築", "建築")),
-        "cook" => Some(("調理", "調理")),
-        "econ" => Some(("経済", "経済")),
-        "edu" => Some(("教育", "教育")),
-        "electr" => Some(("電子工学", "電子工学")),
-        "geo" => Some(("地理", "地理")),
-        "gramm" => Some(("文法", "文法")),
-        "hist" => Some(("歴史", "歴史")),
-        "ling" => Some(("言語学", "言語学")),
-        "log" => Some(("論理学", "論理学")),
-        "math" => Some(("数学", "数学")),
-        "mil" => Some(("軍事", "軍事")),
-        "philos" => Some(("哲学", "哲学")),
-        "phonet" => Some(("音声学", "音声学")),
-        "physics" => Some(("物理学", "物理学")),
-        "polit" => Some(("政治", "政治")),
-        "program" => Some(("プログラミング", "プログラミング")),
-        "psych" => Some(("心理学", "心理学")),
-        "sumo" => Some(("相撲", "相撲")),
-        "aux-v" => Some(("助動", "助動詞")),
-        "dialect" => Some(("方言", "方言")),
-        "euph" => Some(("婉曲", "婉曲")),
-        "fig" => Some(("比喩", "比喩")),
-        "idiom" => Some(("成句", "成句")),
-        "godan" => Some(("五段", "五段活用")),
-        "ichidan" => Some(("一段", "一段活用")),
-        "kamiichidan" => Some(("上一段", "上一段活用")),
-        "nidan" => Some(("二段", "二段活用")),
-        "onoma" => Some(("オノマ", "オノマトペ")),
-        "shimoichidan" => Some(("下一段", "下一段活用")),
-        "shimonidan" => Some(("下二段", "下二段活用")),
-        "yodan" => Some(("四段", "四段活用")),
-        _ => None,
-    }
-}
+#[rustfmt::skip]
+static TAG_LOCALE_JA: LocaleTable = [
+    None, // animate
+    None, // inanim
+    Some(("古語", "古語")), // arch
+    Some(("古風", "古風")), // dated
+    Some(("廃語", "廃語")), // obs
+    None, // out
+    Some(("まれ", "まれ")), // rare
+    None, // impf
+    None, // impf-only
+    None, // pf
+    None, // pf-only
+    None, // acc
+    None, // dat
+    None, // def
+    None, // indef
+    None, // fem
+    None, // masc
+    None, // neut
+    None, // count
+    None, // interr
+    None, // not-comp
+    None, // reltnl
+    None, // reltv
+    None, // uncount
+    None, // XS
+    Some(("略", "略語")), // abbv
+    None, // aug
+    None, // circumfix
+    None, // circumpos
+    Some(("縮約", "縮約形")), // contr
+    None, // dim
+    None, // hypo
+    None, // indecl
+    None, // infix
+    None, // init
+    None, // interfix
+    None, // irreg
+    None, // neol
+    None, // poss
+    None, // in-pl
+    None, // in-sg
+    None, // no-pl
+    None, // pl
+    None, // pl-only
+    None, // sg
+    None, // sg-only
+    None, // card-num
+    None, // frac-num
+    None, // ord-num
+    Some(("形", "形容詞")), // adj
+    Some(("形容動詞", "形容動詞")), // adj_noun
+    Some(("連体詞", "連体詞")), // adn
+    Some(("副", "副詞")), // adv
+    Some(("定", "定冠詞")), // artic
+    None, // char
+    Some(("接続", "接続詞")), // conj
+    Some(("助数詞", "助数詞")), // counter
+    None, // det
+    Some(("感動詞", "感動詞")), // intj
+    Some(("名", "名詞")), // n
+    Some(("数詞", "数詞")), // num
+    None, // phrase
+    None, // pos-r
+    None, // postp
+    Some(("接頭辞", "接頭辞")), // pref
+    Some(("前", "前置詞")), // prep
+    None, // prep-phrase
+    Some(("代", "代名詞")), // pron
+    None, // prop-n
+    Some(("ことわざ", "ことわざ")), // prov
+    Some(("助", "助詞")), // ptcl
+    None, // ptcpl
+    None, // r
+    Some(("接尾辞", "接尾辞")), // suf
+    Some(("動", "動詞")), // v
+    None, // vdt
+    Some(("自動", "自動詞")), // vi
+    None, // vr
+    Some(("他動", "他動詞")), // vt
+    Some(("名前", "固有名詞")), // name
+    None, // surn
+    Some(("幼児語", "幼児語")), // child
+    None, // col
+    None, // crim-sl
+    None, // defer
+    None, // derog
+    None, // ethn-slr
+    None, // fam
+    None, // fan-sl
+    None, // formal
+    None, // high-reg
+    Some(("滑稽", "滑稽")), // humor
+    None, // imp
+    Some(("非形式的", "非形式的")), // inf
+    None, // jar
+    Some(("文語", "文語")), // lit
+    None, // mil-sl
+    None, // net-sl
+    Some(("蔑称", "蔑称")), // offens
+    Some(("軽蔑的", "軽蔑的")), // pej
+    None, // poet
+    None, // polite
+    None, // rlg-slr
+    Some(("俗", "俗語")), // sl
+    None, // techncl
+    None, // txt-msg
+    None, // vern
+    Some(("卑語", "卑語")), // vulg
+    None, // youth-sl
+    None, // BDSM
+    None, // Cath
+    None, // Cath✝️
+    None, // Hind🛕
+    None, // LGBT
+    None, // OOP
+    None, // Prot✝️
+    None, // agr
+    Some(("解剖学", "解剖学")), // anat
+    None, // anthro
+    None, // archae
+    Some(("建築", "建築")), // archit
+    None, // arithm
+    None, // art
+    None, // astrol
+    None, // astrophys
+    None, // auto
+    None, // avio
+    None, // bank
+    None, // bible
+    None, // biochem
+    None, // biol
+    None, // cards
+    None, // chem
+    None, // chess
+    None, // comp
+    None, // comp-sci
+    Some(("調理", "調理")), // cook
+    None, // cyto
+    None, // ecc
+    None, // eco
+    Some(("経済", "経済")), // econ
+    Some(("教育", "教育")), // edu
+    Some(("電子工学", "電子工学")), // electr
+    None, // eng
+    None, // entom
+    None, // film
+    None, // fin
+    None, // firearm
+    None, // game
+    Some(("地理", "地理")), // geo
+    None, // geol
+    None, // geom
+    None, // golf
+    Some(("文法", "文法")), // gramm
+    None, // greek-myth
+    None, // gymn
+    None, // herald
+    Some(("歴史", "歴史")), // hist
+    None, // history
+    None, // hunt
+    None, // immun
+    None, // inorg-chem
+    None, // law
+    Some(("言語学", "言語学")), // ling
+    Some(("論理学", "論理学")), // log
+    Some(("数学", "数学")), // math
+    None, // mech
+    None, // med
+    None, // metal
+    None, // meteo
+    Some(("軍事", "軍事")), // mil
+    None, // music
+    None, // myco
+    None, // myth
+    None, // net
+    None, // org-chem
+    None, // ornit
+    None, // paleo
+    None, // path
+    None, // pharma
+    Some(("哲学", "哲学")), // philos
+    Some(("音声学", "音声学")), // phonet
+    None, // phonol
+    None, // photo
+    Some(("物理学", "物理学")), // physics
+    None, // physio
+    None, // poetry
+    None, // poker
+    Some(("政治", "政治")), // polit
+    Some(("プログラミング", "プログラミング")), // program
+    Some(("心理学", "心理学")), // psych
+    None, // rail
+    None, // rhet
+    None, // rome-myth
+    None, // school
+    None, // sci-fi
+    None, // socio
+    None, // soft
+    None, // soft-eng
+    None, // sports
+    None, // stat
+    Some(("相撲", "相撲")), // sumo
+    None, // surg
+    None, // tech
+    None, // theater
+    None, // theo
+    None, // tv
+    None, // txnmy
+    None, // vehic
+    None, // zoo
+    None, // ૐ
+    None, // ☪️
+    None, // ⚽
+    None, // ⛏️
+    None, // ⛪
+    None, // ✒️
+    None, // ✝️
+    None, // ✡️
+    None, // 🌿
+    None, // 🎾
+    None, // 👷
+    None, // 💼
+    None, // 📐
+    None, // 📚
+    None, // 📰
+    None, // 🔭
+    None, // 🚢
+    None, // 🛐
+    None, // 🧬
+    None, // 🧵
+    None, // 🪙
+    None, // 🪨
+    None, // 🫀
+    None, // aux
+    Some(("助動", "助動詞")), // aux-v
+    None, // cop
+    None, // impers
+    None, // pers
+    None, // ref-pron
+    None, // cmn
+    Some(("方言", "方言")), // dialect
+    Some(("婉曲", "婉曲")), // euph
+    Some(("比喩", "比喩")), // fig
+    None, // idio
+    Some(("成句", "成句")), // idiom
+    None, // literal
+    None, // non-std
+    None, // regio
+    None, // uncmmn
+    None, // Alemannic
+    None, // Bavarian
+    None, // Gheg
+    None, // HCM
+    None, // Hanoi
+    None, // Hue
+    None, // Swabian
+    None, // Tosk
+    None, // ccm
+    None, // classic
+    None, // e
+    None, // i
+    None, // ije
+    None, // kaj
+    None, // std
+    None, // ča
+    None, // 🇦🇪
+    None, // 🇦🇫
+    None, // 🇦🇫KA
+    None, // 🇦🇷
+    None, // 🇦🇷🇺🇾
+    None, // 🇦🇹
+    None, // 🇦🇹VI
+    None, // 🇦🇺
+    None, // 🇧🇦
+    None, // 🇧🇭
+    None, // 🇧🇴
+    None, // 🇧🇷
+    None, // 🇧🇷C
+    None, // 🇧🇷F
+    None, // 🇧🇷G
+    None, // 🇧🇷M
+    None, // 🇧🇷M-G
+    None, // 🇧🇷RdJ
+    None, // 🇧🇷SP
+    None, // 🇧🇷↗️
+    None, // 🇧🇷⬆️
+    None, // 🇧🇷⬇️
+    None, // 🇧🇷🎯
+    None, // 🇧🇿
+    None, // 🇨🇦
+    None, // 🇨🇭
+    None, // 🇨🇱
+    None, // 🇨🇴
+    None, // 🇨🇷
+    None, // 🇨🇺
+    None, // 🇨🇾
+    None, // 🇩🇪
+    None, // 🇩🇪BY
+    None, // 🇩🇪➡️
+    None, // 🇩🇪⬅️
+    None, // 🇩🇪⬆️
+    None, // 🇩🇪⬇️
+    None, // 🇩🇪🎯⬆️
+    None, // 🇩🇴
+    None, // 🇩🇿
+    None, // 🇪🇨
+    None, // 🇪🇬
+    None, // 🇪🇸
+    None, // 🇪🇺
+    None, // 🇫🇷
+    None, // 🇬🇧
+    None, // 🇬🇷
+    None, // 🇬🇹
+    None, // 🇭🇳
+    None, // 🇭🇷
+    None, // 🇮🇪
+    None, // 🇮🇶
+    None, // 🇮🇷
+    None, // 🇮🇷TE
+    None, // 🇯🇴
+    None, // 🇰🇷
+    None, // 🇰🇼
+    None, // 🇱🇧
+    None, // 🇱🇮
+    None, // 🇱🇾
+    None, // 🇲🇦
+    None, // 🇲🇪
+    None, // 🇲🇽
+    None, // 🇲🇿
+    None, // 🇳🇮
+    None, // 🇳🇿
+    None, // 🇴🇲
+    None, // 🇵🇦
+    None, // 🇵🇪
+    None, // 🇵🇭
+    None, // 🇵🇷
+    None, // 🇵🇹
+    None, // 🇵🇾
+    None, // 🇶🇦
+    None, // 🇷🇸
+    None, // 🇷🇺
+    None, // 🇸🇦
+    None, // 🇸🇻
+    None, // 🇸🇾
+    None, // 🇹🇯
+    None, // 🇹🇳
+    None, // 🇺🇸
+    None, // 🇺🇾
+    None, // 🇻🇪
+    None, // 🇾🇪
+    None, // 🌍AF
+    None, // 🌎
+    None, // 🏴󠁧󠁢󠁥󠁮󠁧󠁿
+    None, // 🏴󠁧󠁢󠁳󠁣󠁴󠁿
+    None, // 🐐
+    None, // 🦁
+    None, // 🧜‍♀️
+    Some(("五段", "五段活用")), // godan
+    Some(("一段", "一段活用")), // ichidan
+    Some(("上一段", "上一段活用")), // kamiichidan
+    None, // mix
+    Some(("二段", "二段活用")), // nidan
+    Some(("オノマ", "オノマトペ")), // onoma
+    None, // punct
+    Some(("下一段", "下一段活用")), // shimoichidan
+    Some(("下二段", "下二段活用")), // shimonidan
+    None, // strong
+    None, // symb
+    None, // weak
+    Some(("四段", "四段活用")), // yodan
+    None, // 🌍
+    None, // non-lemma
+];
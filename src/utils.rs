@@ -34,6 +34,24 @@ pub fn human_size(size_bytes: f64) -> String {
     format!("{size:.1} GB")
 }
 
+/// A memory field of `/proc/self/status`, in bytes. Only available on Linux.
+fn proc_status_bytes(field: &str) -> Option<u64> {
+    let status = fs::read_to_string("/proc/self/status").ok()?;
+    let line = status.lines().find(|line| line.starts_with(field))?;
+    let kb: u64 = line.split_whitespace().nth(1)?.parse().ok()?;
+    Some(kb * 1024)
+}
+
+/// Peak resident set size of the process, in bytes.
+pub fn peak_rss() -> Option<u64> {
+    proc_status_bytes("VmHWM:")
+}
+
+/// Resident set size of the process, in bytes.
+pub fn current_rss() -> Option<u64> {
+    proc_status_bytes("VmRSS:")
+}
+
 pub fn human_time(ms: u128) -> String {
     format!("{:.1} s", ms as f64 / 1000.0)
 }